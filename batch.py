@@ -0,0 +1,54 @@
+"""
+Headless batch reports: python batch.py <input_dir> <output_dir> [--workers N]
+
+Every protocol document or ProtocolMetadata JSON file in <input_dir> is run
+through extraction, cohort build and comparison, and gets a PDF report and
+PPTX deck under <output_dir>/<file stem>/ (with the extension appended when
+two inputs share a stem).  A manifest.json with per-stage timings is written
+alongside.
+"""
+
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from trial_design_explorer.services.batch_service import run_batch
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate protocol reports for a directory of protocols.")
+    parser.add_argument("input_dir", help="directory of protocol documents or metadata JSON files")
+    parser.add_argument("output_dir", help="directory for reports, decks and manifest.json")
+    parser.add_argument("--workers", type=int, default=2, help="worker processes (default: 2)")
+    parser.add_argument("--no-pubmed", action="store_true", help="skip the PubMed evidence search")
+    parser.add_argument("--no-slides", action="store_true", help="write PDF reports only")
+    args = parser.parse_args(argv)
+
+    manifest = run_batch(
+        args.input_dir,
+        args.output_dir,
+        max_workers=args.workers,
+        include_pubmed=not args.no_pubmed,
+        include_slides=not args.no_slides,
+    )
+    for job in manifest["jobs"]:
+        stages = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in job["stage_seconds"].items())
+        line = f"{job['status']:<9} {job['name']}  ({stages})"
+        if job["error"]:
+            line += f"  {job['failed_stage']}: {job['error']}"
+        print(line)
+        for warning in job["warnings"]:
+            print(f"          warning: {warning}")
+    print(
+        f"{manifest['completed']} completed ({manifest['with_warnings']} with warnings), "
+        f"{manifest['failed']} failed in "
+        f"{manifest['total_seconds']:.1f}s — manifest: {args.output_dir}/manifest.json"
+    )
+    return 1 if manifest["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
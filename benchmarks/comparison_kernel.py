@@ -0,0 +1,125 @@
+"""
+Benchmark: cohort comparison on large synthetic registry cohorts.
+
+    python benchmarks/comparison_kernel.py [--trials 10000] [--repeat 5]
+    python -m benchmarks.comparison_kernel [--trials 10000] [--repeat 5]
+
+The repository root is put on sys.path, so the uninstalled
+trial_design_explorer package resolves either way.
+
+Builds a deterministic synthetic ClinicalTrials.gov response, parses it with
+parse_trials_to_df, then times the typed-column derivation, the aggregation
+kernel, build_protocol_comparison_metrics and build_comparison_result.
+No network access is needed.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from trial_design_explorer.domain import ProtocolMetadata
+from trial_design_explorer.services.clinical_trials_service import parse_trials_to_df
+from trial_design_explorer.services.comparison_service import (
+    CohortAggregates,
+    build_comparison_result,
+    build_protocol_comparison_metrics,
+    cohort_typed_columns,
+)
+
+STATUSES = ["COMPLETED", "TERMINATED", "RECRUITING", "WITHDRAWN", "ACTIVE_NOT_RECRUITING", "SUSPENDED", "UNKNOWN"]
+PHASES = [["PHASE1"], ["PHASE2"], ["PHASE3"], ["PHASE2", "PHASE3"], ["PHASE4"], []]
+OUTCOMES = [
+    "28-day all-cause mortality",
+    "Incidence of serious adverse events",
+    "Change in SOFA score",
+    "Quality of life (EQ-5D)",
+    "ICU length of stay",
+    "Serum lactate clearance",
+]
+COUNTRIES = ["United States", "France", "China", "Brazil", "Germany", "Egypt", "India", "Canada"]
+DATES = ["2012", "2015-03", "2016-07-15", "2018-01-01", "2019-11", "2021-09", "2023-02-11", "2024-06-30", None]
+SPONSORS = ["Pfizer", "Harvard University", "Novartis", "Peking University Hospital", "Assistance Publique"]
+
+
+def synthetic_response(n_trials: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    studies = []
+    for index in range(n_trials):
+        status = {"overallStatus": rng.choice(STATUSES)}
+        for key in ("startDateStruct", "completionDateStruct"):
+            date = rng.choice(DATES)
+            if date:
+                status[key] = {"date": date}
+        locations = [
+            {"facility": f"Site {rng.randint(1, 500)}", "city": f"City {rng.randint(1, 40)}", "country": rng.choice(COUNTRIES)}
+            for _ in range(rng.randint(0, 8))
+        ]
+        studies.append({"protocolSection": {
+            "identificationModule": {"nctId": f"NCT{index:08d}", "briefTitle": f"Synthetic trial {index}"},
+            "statusModule": status,
+            "designModule": {
+                "studyType": rng.choice(["INTERVENTIONAL", "OBSERVATIONAL"]),
+                "phases": rng.choice(PHASES),
+                "enrollmentInfo": {"count": rng.choice([None, 24, 60, 120, 300, 800, 2500])},
+                "designInfo": {
+                    "allocation": rng.choice(["RANDOMIZED", "NON_RANDOMIZED", "NA"]),
+                    "interventionModel": rng.choice(["PARALLEL", "SINGLE_GROUP", "CROSSOVER"]),
+                    "primaryPurpose": rng.choice(["TREATMENT", "PREVENTION", "DIAGNOSTIC"]),
+                    "maskingInfo": {"masking": rng.choice(["NONE", "SINGLE", "DOUBLE", "QUADRUPLE"])},
+                },
+            },
+            "sponsorCollaboratorsModule": {"leadSponsor": {"name": rng.choice(SPONSORS)}},
+            "outcomesModule": {"primaryOutcomes": [{"measure": rng.choice(OUTCOMES)}]},
+            "conditionsModule": {"conditions": ["Sepsis"]},
+            "contactsLocationsModule": {"locations": locations},
+        }})
+    return {"studies": studies}
+
+
+def _time(func, repeat: int) -> float:
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trials", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    trials_df = parse_trials_to_df(synthetic_response(args.trials))
+    protocol = ProtocolMetadata(
+        condition="Sepsis",
+        phase="Phase 3",
+        study_type="Interventional",
+        allocation="Randomized",
+        masking="Double",
+        intervention_model="Parallel",
+        primary_purpose="Treatment",
+        sample_size="600",
+        endpoint_focus="Efficacy",
+        start_date="2025-01",
+        completion_date="2027-06",
+    )
+    print(f"{len(trials_df)} trials, median of {args.repeat} runs")
+    for label, func in (
+        ("cohort_typed_columns", lambda: cohort_typed_columns(trials_df)),
+        ("CohortAggregates", lambda: CohortAggregates(protocol, trials_df)),
+        ("build_protocol_comparison_metrics", lambda: build_protocol_comparison_metrics(protocol, trials_df)),
+        ("build_comparison_result", lambda: build_comparison_result(protocol, trials_df)),
+    ):
+        print(f"  {label:<36} {_time(func, args.repeat):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
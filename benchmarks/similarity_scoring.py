@@ -0,0 +1,253 @@
+"""
+Benchmark: five-domain design similarity scoring on synthetic registry cohorts.
+
+    python benchmarks/similarity_scoring.py [--trials 10000] [--repeat 5] [--check-rows 2000]
+                                            [--sizes 5000,10000,25000,50000]
+    python -m benchmarks.similarity_scoring [same options]
+
+Builds a deterministic synthetic ClinicalTrials.gov response and first checks
+that the vectorized scorer (score_domain_frame) reproduces the row scorer
+(score_domain_breakdown / score_trial_design_similarity) exactly, for every
+domain and the overall score, on ``--check-rows`` trials and several protocol
+profiles, and that select_similar_trials picks the same trials as full
+scoring.  It then times the row scorer, build_trial_features, the vectorized
+pass and the selection used by build_design_similar_cohort, and reports how
+many trials each selection mode token-matched, so the top-k early exit can be
+seen doing less work than the full pass.  Finally it repeats the feature,
+scoring and selection timings for each cohort size in ``--sizes`` with the
+time per trial, so linear scaling can be checked.  Exits non-zero on any
+mismatch.  No network access is needed.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from trial_design_explorer.domain import ProtocolMetadata
+from trial_design_explorer.services.clinical_trials_service import (
+    parse_trials_to_df,
+    score_domain_breakdown,
+    score_trial_design_similarity,
+)
+from trial_design_explorer.services import similarity_service
+from trial_design_explorer.services.similarity_service import (
+    DOMAIN_COLUMNS,
+    build_trial_features,
+    score_domain_frame,
+    select_similar_trials,
+)
+
+STATUSES = ["COMPLETED", "TERMINATED", "RECRUITING", "WITHDRAWN", "ACTIVE_NOT_RECRUITING", "UNKNOWN"]
+PHASES = [["PHASE1"], ["PHASE2"], ["PHASE3"], ["PHASE2", "PHASE3"], ["PHASE4"], []]
+OUTCOMES = [
+    "28-day all-cause mortality",
+    "Incidence of serious adverse events",
+    "Change in SOFA score from baseline",
+    "Quality of life (EQ-5D)",
+    "ICU length of stay",
+    "Serum lactate clearance at 6 hours",
+]
+CONDITIONS = [["Sepsis"], ["Septic Shock"], ["Sepsis", "Pneumonia"], ["Acute Kidney Injury"], []]
+INTERVENTIONS = [
+    ("DRUG", "Hydrocortisone"), ("DRUG", "Vasopressin"), ("BIOLOGICAL", "Monoclonal antibody"),
+    ("DEVICE", "Hemoperfusion cartridge"), ("BEHAVIORAL", "Early mobilisation"), ("OTHER", "Placebo"),
+]
+AGES = ["18 Years", "12 Years", "65 Years", None]
+DATES = ["2012", "2015-03", "2016-07-15", "2018-01-01", "2019-11", "2021-09", "2023-02-11", "2024-06-30", None]
+TITLES = ["Second-line therapy in refractory sepsis", "First-line treatment of septic shock", "Sepsis outcomes study"]
+
+
+def synthetic_response(n_trials: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    studies = []
+    for index in range(n_trials):
+        status = {"overallStatus": rng.choice(STATUSES)}
+        for key in ("startDateStruct", "completionDateStruct"):
+            date = rng.choice(DATES)
+            if date:
+                status[key] = {"date": date}
+        interventions = rng.sample(INTERVENTIONS, rng.randint(0, 3))
+        studies.append({"protocolSection": {
+            "identificationModule": {"nctId": f"NCT{index:08d}", "briefTitle": rng.choice(TITLES)},
+            "statusModule": status,
+            "designModule": {
+                "studyType": rng.choice(["INTERVENTIONAL", "OBSERVATIONAL"]),
+                "phases": rng.choice(PHASES),
+                "enrollmentInfo": {"count": rng.choice([None, 24, 60, 120, 300, 800])},
+                "designInfo": {
+                    "allocation": rng.choice(["RANDOMIZED", "NON_RANDOMIZED", "NA"]),
+                    "interventionModel": rng.choice(["PARALLEL", "SINGLE_GROUP", "CROSSOVER"]),
+                    "primaryPurpose": rng.choice(["TREATMENT", "PREVENTION", "DIAGNOSTIC"]),
+                    "maskingInfo": {"masking": rng.choice(["NONE", "SINGLE", "DOUBLE", "QUADRUPLE"])},
+                },
+            },
+            "armsInterventionsModule": {
+                "armGroups": [{} for _ in range(rng.randint(0, 3))],
+                "interventions": [{"type": kind, "name": name} for kind, name in interventions],
+            },
+            "eligibilityModule": {"minimumAge": rng.choice(AGES), "maximumAge": rng.choice(["75 Years", "80 Years", None])},
+            "outcomesModule": {"primaryOutcomes": [{"measure": m} for m in rng.sample(OUTCOMES, rng.randint(0, 2))]},
+            "conditionsModule": {"conditions": rng.choice(CONDITIONS)},
+            "sponsorCollaboratorsModule": {"leadSponsor": {"name": "Sponsor"}},
+        }})
+    return {"studies": studies}
+
+
+PROTOCOLS = [
+    ProtocolMetadata(
+        condition="Sepsis", phase="Phase 3", study_type="Interventional", allocation="Randomized",
+        masking="Double", intervention_model="Parallel", primary_purpose="Treatment",
+        primary_endpoints="28-day all-cause mortality", intervention_description="Hydrocortisone drug",
+        comparator="Placebo", target_population="Adults 18 to 75 years with septic shock, second-line",
+        start_date="2025-01", completion_date="2027-06",
+    ),
+    ProtocolMetadata(condition="Sepsis"),
+    ProtocolMetadata(
+        condition="Acute Kidney Injury", phase="Phase 2", masking="None",
+        primary_endpoints="Change in SOFA score", intervention_description="Hemoperfusion device",
+        comparator="Standard of care", start_date="2024-03-01", completion_date="2025-09",
+    ),
+]
+
+
+def check_equivalence(trials_df, rows: int) -> int:
+    """Mismatching (protocol, trial, domain) cells between the vectorized and row scorers."""
+    sample = trials_df.head(rows)
+    records = sample.to_dict("records")
+    mismatches = 0
+    for protocol in PROTOCOLS:
+        frame = score_domain_frame(protocol, sample, features=build_trial_features(sample))
+        for position, record in enumerate(records):
+            expected = score_domain_breakdown(protocol, record)
+            for domain, column in DOMAIN_COLUMNS.items():
+                mismatches += frame[column].iat[position] != expected[domain]
+            mismatches += (
+                frame["design_similarity_score"].iat[position] != score_trial_design_similarity(protocol, record)
+            )
+    return int(mismatches)
+
+
+def check_selection(trials_df) -> int:
+    """Selections (protocol, mode) that differ from full scoring plus the cohort rule."""
+    mismatches = 0
+    for protocol in PROTOCOLS:
+        totals = score_domain_frame(protocol, trials_df)["design_similarity_score"].to_numpy()
+        ranked = np.lexsort((np.arange(len(totals)), -totals))
+        for min_similarity, min_cohort_size, top_k in ((0.25, 30, None), (0.6, 30, None), (0.6, 30, 50), (0.9, 30, 500)):
+            expected = ranked
+            if (totals >= min_similarity).sum() >= min_cohort_size:
+                expected = ranked[totals[ranked] >= min_similarity]
+            if top_k is not None:
+                expected = expected[:top_k]
+            selected, _ = select_similar_trials(protocol, trials_df, min_similarity, min_cohort_size, top_k=top_k)
+            mismatches += not np.array_equal(selected, expected)
+    return int(mismatches)
+
+
+def text_matched(func) -> int:
+    """Trials whose token-matching parts were scored while running ``func``."""
+    scored = 0
+    text_parts = similarity_service._text_parts
+
+    def counting(protocol_meta, cohort, positions=None):
+        nonlocal scored
+        scored += len(cohort.features) if positions is None else len(positions)
+        return text_parts(protocol_meta, cohort, positions)
+
+    similarity_service._text_parts = counting
+    try:
+        func()
+    finally:
+        similarity_service._text_parts = text_parts
+    return scored
+
+
+def _time(func, repeat: int) -> float:
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def print_scaling(sizes: list[int], repeat: int) -> None:
+    """Features, scoring and selection time per cohort size, total and per trial."""
+    protocol = PROTOCOLS[0]
+    print(f"scaling, median of {repeat} runs (ms total / µs per trial)")
+    print(f"  {'trials':>8} {'features':>18} {'score_domain_frame':>20} {'select_similar_trials':>22}")
+    for size in sizes:
+        trials_df = parse_trials_to_df(synthetic_response(size))
+        timings = [
+            _time(func, repeat) for func in (
+                lambda: build_trial_features(trials_df),
+                lambda: score_domain_frame(protocol, trials_df),
+                lambda: select_similar_trials(protocol, trials_df, 0.25, 30),
+            )
+        ]
+        cells = [f"{ms:8.1f} / {ms * 1000 / size:5.2f}" for ms in timings]
+        print(f"  {size:>8} {cells[0]:>18} {cells[1]:>20} {cells[2]:>22}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trials", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check-rows", type=int, default=2_000)
+    parser.add_argument(
+        "--sizes", default="5000,10000,25000,50000",
+        help="comma-separated cohort sizes for the scaling table; empty skips it",
+    )
+    args = parser.parse_args()
+
+    trials_df = parse_trials_to_df(synthetic_response(args.trials))
+    mismatches = check_equivalence(trials_df, args.check_rows)
+    checked = min(args.check_rows, len(trials_df))
+    print(f"equivalence: {checked} trials x {len(PROTOCOLS)} protocols, {mismatches} mismatching scores")
+    selection_mismatches = check_selection(trials_df)
+    print(f"selection: {selection_mismatches} early-exit selections differ from full scoring")
+    mismatches += selection_mismatches
+
+    protocol = PROTOCOLS[0]
+    records = trials_df.to_dict("records")
+    print(f"{len(trials_df)} trials, median of {args.repeat} runs")
+    for label, func in (
+        ("score_trial_design_similarity (rows)", lambda: [score_trial_design_similarity(protocol, r) for r in records]),
+        ("build_trial_features", lambda: build_trial_features(trials_df)),
+        ("score_domain_frame", lambda: score_domain_frame(protocol, trials_df)),
+        ("select_similar_trials", lambda: select_similar_trials(protocol, trials_df, 0.25, 30)),
+        ("select_similar_trials top_k=50", lambda: select_similar_trials(protocol, trials_df, 0.25, 30, top_k=50)),
+    ):
+        repeat = 1 if label.endswith("(rows)") else args.repeat
+        print(f"  {label:<38} {_time(func, repeat):8.1f} ms")
+
+    print("trials token-matched per selection")
+    for label, kwargs in (
+        ("full pass", {}),
+        ("min_similarity=0.6", {"min_similarity": 0.6}),
+        ("top_k=50", {"top_k": 50}),
+        ("top_k=500", {"top_k": 500}),
+    ):
+        options = {"min_similarity": 0.25, "min_cohort_size": 30, **kwargs}
+        if label == "full pass":
+            call = lambda: score_domain_frame(protocol, trials_df)
+        else:
+            call = lambda options=options: select_similar_trials(protocol, trials_df, **options)
+        print(f"  {label:<38} {text_matched(call):8d} of {len(trials_df)}")
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    if sizes:
+        print_scaling(sizes, args.repeat)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
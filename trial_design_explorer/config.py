@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_API_URL = "https://clinicaltrials.gov/api/v2/studies"
@@ -14,6 +15,12 @@ APP_SUBTITLE = (
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 ASSETS_DIR = ROOT_DIR / "assets"
+CACHE_DIR = Path(os.getenv("TDE_CACHE_DIR", ROOT_DIR / ".cache"))
+
+# Local ClinicalTrials.gov cache: entries older than the TTL are refreshed by
+# re-pulling only studies whose lastUpdatePostDate changed.  TTL 0 disables it.
+REGISTRY_CACHE_TTL_SECONDS = int(os.getenv("TDE_REGISTRY_CACHE_TTL", 24 * 3600))
+REGISTRY_CACHE_MAX_BYTES = int(os.getenv("TDE_REGISTRY_CACHE_MAX_BYTES", 512 * 1024 * 1024))
 
 COMMON_CONDITIONS = [
     "Sepsis",
@@ -69,6 +76,63 @@ COMMON_CONDITIONS = [
     "Respiratory Syncytial Virus",
 ]
 
+# Federated cohort search: extra registry queries per condition (lower-case keys).
+# Narrower COMMON_CONDITIONS entries containing the condition are added automatically.
+CONDITION_SYNONYMS = {
+    "ards": ["Acute Respiratory Distress Syndrome"],
+    "sepsis": ["Septic Shock"],
+    "stroke": ["Cerebrovascular Accident"],
+    "myocardial infarction": ["Acute Coronary Syndrome", "Heart Attack"],
+    "chronic obstructive pulmonary disease": ["COPD"],
+    "acute kidney injury": ["Acute Renal Failure"],
+    "renal failure": ["Kidney Failure"],
+    "heart failure": ["Cardiac Failure"],
+    "traumatic brain injury": ["TBI"],
+    "multiple organ dysfunction syndrome": ["Multiple Organ Failure"],
+    "deep vein thrombosis": ["Venous Thromboembolism"],
+    "pulmonary embolism": ["Venous Thromboembolism"],
+    "hiv": ["HIV Infections"],
+    "icu delirium": ["Delirium"],
+    "clostridium difficile infection": ["Clostridioides difficile Infection"],
+    "respiratory syncytial virus": ["RSV Infection"],
+    "covid-19": ["SARS-CoV-2 Infection"],
+}
+FEDERATED_SEARCH_WORKERS = 4
+FEDERATED_SEARCH_MAX_QUERIES = 6
+
+# PubMed E-utilities client: NCBI allows 3 requests/s, or 10 with NCBI_API_KEY.
+PUBMED_MAX_WORKERS = 3
+PUBMED_EFETCH_BATCH_SIZE = 200
+# Local PubMed cache: query → PMID lists expire after the TTL; parsed articles
+# are kept until cleared.  TTL 0 disables the cache.
+PUBMED_QUERY_CACHE_TTL_SECONDS = int(os.getenv("TDE_PUBMED_QUERY_TTL", 24 * 3600))
+
+# Shared OpenAI client: at most this many requests in flight (and pooled
+# keep-alive connections) per process, and the default per-request timeout.
+OPENAI_MAX_CONCURRENCY = int(os.getenv("TDE_OPENAI_MAX_CONCURRENCY", 8))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("TDE_OPENAI_TIMEOUT", 120))
+
+# Worker processes used to render the export chart set; 1 renders in-process.
+CHART_RENDER_WORKERS = int(os.getenv("TDE_CHART_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+# Embed PDF report charts as vector drawings (needs svglib; PNG otherwise).
+REPORT_VECTOR_CHARTS = os.getenv("TDE_REPORT_VECTOR_CHARTS", "1") != "0"
+
+# Approximate token budget (≈4 chars per token) for the workspace context sent
+# with each assistant question.
+ASSISTANT_CONTEXT_TOKEN_BUDGET = 1200
+
+# Local cache of LLM protocol-extraction responses, keyed by content hash.
+# Least-recently-used entries beyond the cap are evicted; 0 disables it.
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("TDE_LLM_CACHE_MAX_ENTRIES", 2000))
+
+# Saved protocol workspace runs (SQLite index + parquet cohorts + export files).
+PROJECT_STORE_DIR = Path(os.getenv("TDE_PROJECT_DIR", CACHE_DIR / "projects"))
+PROJECT_STORE_LIST_LIMIT = 25
+
+# Registry explorer panel frames and figures memoized per cohort fingerprint
+# across Streamlit reruns; 0 disables the cache.
+REGISTRY_PANEL_CACHE_SIZE = int(os.getenv("TDE_REGISTRY_PANEL_CACHE_SIZE", 64))
+
 REGISTRY_TABS = [
     "Overview",
     "Durations",
@@ -452,6 +452,11 @@ class ProjectRun:
     status: str
     timestamp: str
     notes: str | None = None
+    run_id: str | None = None
+    title: str | None = None
+    condition: str | None = None
+    cohort_size: int = 0
+    artifacts: list[str] = field(default_factory=list)
 
     def to_dict(self) -> dict[str, Any]:
         return asdict(self)
@@ -1,9 +1,17 @@
 from .audit_service import build_audit_event, current_utc_timestamp
+from .batch_service import discover_inputs, run_batch
 from .clinical_trials_service import (
+    RegistryFetchError,
     build_design_similar_cohort,
     classify_similarity,
     cohort_selection_summary,
+    concat_trial_frames,
+    expand_condition_queries,
     fetch_trials_by_condition,
+    iter_trial_frames,
+    iter_trial_pages,
+    load_federated_trials_df,
+    load_trials_df,
     parse_trials_to_df,
     score_domain_breakdown,
     score_trial_design_similarity,
@@ -23,13 +31,23 @@ from .comparison_service import (
     recommendations_to_dataframe,
 )
 from .document_service import extract_text_from_uploaded_file
+from .llm_cache_service import LLMCache, get_llm_cache
+from .project_store_service import ProjectStore, get_project_store
 from .protocol_service import (
     extract_protocol_metadata_from_text,
     grounded_assistant_response,
     protocol_metadata_from_session,
+    stream_grounded_assistant_response,
+)
+from .pubmed_cache_service import PubMedCache, get_pubmed_cache
+from .pubmed_service import (
+    articles_to_evidence_rows,
+    get_pubmed_client,
+    search_pubmed_evidence,
+    search_pubmed_evidence_many,
 )
-from .pubmed_service import search_pubmed_evidence, articles_to_evidence_rows
 from .report_service import generate_protocol_report_pdf
+from .registry_cache_service import RegistryCache, get_registry_cache
 from .slides_service import generate_slides_pptx
 
 __all__ = [
@@ -50,16 +68,36 @@ __all__ = [
     "build_protocol_recommendations",
     "build_trial_exemplar_table",
     "compare_protocol_to_trials",
+    "concat_trial_frames",
     "current_utc_timestamp",
+    "discover_inputs",
+    "expand_condition_queries",
     "extract_protocol_metadata_from_text",
     "extract_text_from_uploaded_file",
     "fetch_trials_by_condition",
     "generate_protocol_report_pdf",
     "generate_slides_pptx",
+    "get_llm_cache",
+    "get_project_store",
+    "get_pubmed_cache",
+    "get_pubmed_client",
+    "get_registry_cache",
     "grounded_assistant_response",
+    "iter_trial_frames",
+    "iter_trial_pages",
+    "load_federated_trials_df",
+    "load_trials_df",
+    "LLMCache",
     "metrics_to_dataframe",
     "parse_trials_to_df",
+    "ProjectStore",
     "protocol_metadata_from_session",
+    "PubMedCache",
     "recommendations_to_dataframe",
+    "RegistryCache",
+    "RegistryFetchError",
+    "run_batch",
     "search_pubmed_evidence",
+    "search_pubmed_evidence_many",
+    "stream_grounded_assistant_response",
 ]
@@ -0,0 +1,257 @@
+"""
+Assistant context service — compact, budgeted workspace context for chat.
+
+The grounded assistant used to receive the full protocol profile, every
+comparison metric and every recommendation as JSON on each turn.  This module
+condenses them into short plain-text lines instead:
+
+static part   protocol profile, cohort headline and comparison summary; built
+              once per comparison and cached across turns
+ranked part   metric groups, design-domain rows and recommendations, ordered by
+              word overlap with the question (recommendation priority breaks
+              ties) and added until the token budget is spent
+
+Token counts are estimated at four characters per token.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from trial_design_explorer.config import ASSISTANT_CONTEXT_TOKEN_BUDGET
+from trial_design_explorer.domain import ProtocolMetadata
+
+_CACHE_SIZE = 16
+_TEXT_FIELD_CHARS = 300
+_SUMMARY_CHARS = 1200
+
+_PROFILE_SKIP = {"provenance", "confirmation_status"}
+_PRIORITY_WEIGHT = {"High": 1.5, "Medium": 1.0, "Monitor": 0.5, "Preserve": 0.0}
+
+_STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "for", "on", "is", "are", "be",
+    "this", "that", "it", "my", "our", "we", "i", "should", "what", "which", "how",
+    "why", "does", "do", "can", "with", "vs", "versus", "trial", "protocol", "study",
+}
+# Question words that refer to a metric without sharing its wording.
+_ALIASES = {
+    "recruit": "enrollment", "accrual": "enrollment", "sample": "enrollment", "size": "enrollment",
+    "long": "duration", "length": "duration", "timeline": "duration", "time": "duration",
+    "blind": "masking", "blinding": "masking", "placebo": "comparator",
+    "random": "allocation", "randomised": "allocation", "randomized": "allocation",
+    "outcome": "endpoint", "outcomes": "endpoint",
+    "geography": "sites", "countries": "sites", "country": "sites", "site": "sites",
+    "terminate": "disrupted", "terminated": "disrupted", "withdrawn": "disrupted",
+    "fail": "disrupted", "failure": "disrupted", "risk": "disrupted",
+    "sponsor": "sponsors", "industry": "sponsors", "academic": "sponsors",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+def _words(text: str) -> set[str]:
+    words = set()
+    for word in re.findall(r"[a-z0-9]+", str(text or "").lower()):
+        if word in _STOPWORDS or len(word) < 3:
+            continue
+        words.add(word[:6])
+        if word in _ALIASES:
+            words.add(_ALIASES[word][:6])
+    return words
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def _pairs(metrics: dict, keys: list[tuple[str, str]]) -> str:
+    return "; ".join(
+        f"{label} {_fmt(metrics[key])}" for key, label in keys if metrics.get(key) is not None
+    )
+
+
+def _distribution(values: dict | None) -> str:
+    return ", ".join(f"{name} {_fmt(share)}%" for name, share in (values or {}).items())
+
+
+@dataclass(slots=True)
+class _ContextItem:
+    text: str
+    words: set[str]
+    weight: float
+    tokens: int
+
+
+def _item(text: str, keywords: str, weight: float = 0.0) -> _ContextItem:
+    return _ContextItem(text, _words(keywords + " " + text), weight, estimate_tokens(text) + 1)
+
+
+def _static_context(protocol_meta: ProtocolMetadata, trial_summary: str, metrics: dict) -> str:
+    profile = [
+        f"{key.replace('_', ' ')}: {_clip(value, _TEXT_FIELD_CHARS)}"
+        for key, value in protocol_meta.to_display_dict().items()
+        if key not in _PROFILE_SKIP and value not in (None, "")
+    ]
+    lines = ["Protocol profile: " + " | ".join(profile) if profile else "Protocol profile: not available"]
+    headline = _pairs(metrics, [
+        ("cohort_size", "matched trials"),
+        ("completed_cohort_size", "completed"),
+        ("disrupted_cohort_size", "disrupted"),
+        ("active_cohort_size", "active"),
+        ("evidence_strength", "evidence strength"),
+        ("precedent_posture", "posture"),
+        ("design_alignment_index", "design alignment index"),
+    ])
+    if headline:
+        lines.append("Cohort: " + headline)
+    if trial_summary:
+        lines.append("Comparison summary: " + _clip(trial_summary, _SUMMARY_CHARS))
+    return "\n".join(lines)
+
+
+def _ranked_items(metrics: dict, recommendations: list) -> list[_ContextItem]:
+    items: list[_ContextItem] = []
+    groups = [
+        ("Enrollment", "enrollment", [
+            ("enrollment_target", "target"), ("enrollment_percentile", "percentile"),
+            ("enrollment_median", "median"), ("enrollment_p25", "p25"), ("enrollment_p75", "p75"),
+            ("completed_enrollment_median", "completed median"),
+            ("disrupted_enrollment_median", "disrupted median"),
+        ]),
+        ("Duration (months)", "duration", [
+            ("protocol_duration_months", "protocol"), ("duration_median_months", "median"),
+            ("duration_p25_months", "p25"), ("duration_p75_months", "p75"),
+            ("completed_duration_median_months", "completed median"),
+            ("disrupted_duration_median_months", "disrupted median"),
+        ]),
+        ("Design fit", "design alignment disrupted completed precedent", [
+            ("completed_design_fit_pct", "completed fit %"), ("disrupted_design_fit_pct", "disrupted fit %"),
+            ("precedent_gap_pct", "precedent gap %"),
+        ]),
+        ("Sites", "sites operational feasibility", [
+            ("site_count_median", "median sites"), ("country_count_median", "median countries"),
+        ]),
+        ("Status", "status disrupted completed recruiting", [
+            ("risk_status_share_pct", "disrupted share %"), ("completed_share_pct", "completed share %"),
+            ("recruiting_share_pct", "recruiting share %"),
+        ]),
+        ("Sponsors", "sponsors", [
+            ("industry_share_pct", "industry %"), ("academic_share_pct", "academic %"),
+        ]),
+    ]
+    for label, keywords, keys in groups:
+        body = _pairs(metrics, keys)
+        if body:
+            items.append(_item(f"{label}: {body}", keywords, weight=1.0))
+
+    for label, key in [
+        ("Status distribution", "status_distribution"),
+        ("Endpoint categories", "endpoint_category_distribution"),
+        ("Completed-trial endpoints", "completed_endpoint_distribution"),
+        ("Disrupted-trial endpoints", "disrupted_endpoint_distribution"),
+    ]:
+        body = _distribution(metrics.get(key))
+        if body:
+            items.append(_item(f"{label}: {body}", "endpoint status", weight=0.5))
+
+    for row in metrics.get("alignment_by_domain") or []:
+        text = (
+            f"Domain {row.get('Domain')}: protocol {row.get('Protocol Choice')}; "
+            + _pairs(row, [
+                ("Overall Match (%)", "overall %"), ("Completed Match (%)", "completed %"),
+                ("Disrupted Match (%)", "disrupted %"), ("Net Gap (%)", "net gap %"),
+            ])
+            + f"; {row.get('Signal', '')}"
+        )
+        items.append(_item(text, f"{row.get('Domain')} {row.get('Why It Matters', '')}", weight=0.75))
+
+    if metrics.get("missing_core_fields"):
+        items.append(_item(
+            "Missing protocol fields: " + ", ".join(metrics["missing_core_fields"]), "missing", weight=0.5
+        ))
+
+    for rec in recommendations or []:
+        text = (
+            f"[{rec.get('Priority', '')}] {rec.get('Category', '')}: "
+            f"{_clip(rec.get('Recommendation', ''), 240)} "
+            f"Rationale: {_clip(rec.get('Rationale', ''), 200)} "
+            f"Evidence: {_clip(rec.get('Evidence', ''), 160)}"
+        )
+        items.append(_item(
+            text, f"{rec.get('Category', '')} recommendation",
+            weight=_PRIORITY_WEIGHT.get(rec.get("Priority"), 0.5),
+        ))
+    return items
+
+
+_CACHE: "OrderedDict[str, tuple[str, list[_ContextItem]]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _comparison_key(protocol_meta, trial_summary, metrics, recommendations) -> str:
+    payload = json.dumps(
+        [protocol_meta.to_display_dict(), trial_summary, metrics, recommendations],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _comparison_context(protocol_meta, trial_summary, metrics, recommendations):
+    key = _comparison_key(protocol_meta, trial_summary, metrics, recommendations)
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+    built = (
+        _static_context(protocol_meta, trial_summary, metrics),
+        _ranked_items(metrics, recommendations),
+    )
+    with _CACHE_LOCK:
+        _CACHE[key] = built
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return built
+
+
+def build_assistant_context(
+    user_question: str,
+    protocol_meta: ProtocolMetadata,
+    trial_summary: str,
+    comparison_metrics: dict | None = None,
+    recommendations: list | None = None,
+    token_budget: int = ASSISTANT_CONTEXT_TOKEN_BUDGET,
+) -> str:
+    """Compact context for one assistant question, within ``token_budget`` tokens."""
+    static, items = _comparison_context(
+        protocol_meta, trial_summary or "", comparison_metrics or {}, recommendations or []
+    )
+    remaining = token_budget - estimate_tokens(static)
+    question_words = _words(user_question)
+    ranked = sorted(
+        items,
+        key=lambda item: len(question_words & item.words) * 2 + item.weight,
+        reverse=True,
+    )
+    selected = []
+    for item in ranked:
+        if item.tokens <= remaining:
+            selected.append(item.text)
+            remaining -= item.tokens
+    if not selected:
+        return static
+    return static + "\nRelevant findings:\n" + "\n".join(f"- {text}" for text in selected)
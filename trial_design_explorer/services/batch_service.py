@@ -0,0 +1,370 @@
+"""
+Batch service — headless protocol → report pipeline for a portfolio of protocols.
+
+Each input is a protocol document (.pdf, .docx, .txt, .rtf) or a saved
+ProtocolMetadata JSON file.  A batch runs in four phases:
+
+1. extract   protocol profiles are extracted in a process pool
+2. warm      each distinct condition is pulled into the registry cache once,
+             so jobs sharing an indication never download it twice
+3. pubmed    one evidence search per distinct (condition, endpoint focus),
+             run in the parent process so every request shares one NCBI rate
+             limit instead of each worker spending the full limit
+4. report    cohort build → build_comparison_result → PDF / PPTX, again in a
+             process pool
+
+The registry, PubMed and LLM caches are SQLite files under CACHE_DIR, so every
+worker process shares them.  A manifest.json in the output directory records
+each job's status, outputs and per-stage timings.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from trial_design_explorer.config import FEDERATED_SEARCH_WORKERS
+from trial_design_explorer.domain import ProtocolMetadata
+from trial_design_explorer.services.audit_service import build_audit_event, current_utc_timestamp
+
+DOCUMENT_SUFFIXES = (".pdf", ".docx", ".txt", ".rtf")
+METADATA_SUFFIX = ".json"
+
+
+@dataclass(slots=True)
+class BatchJob:
+    input_path: str
+    name: str
+    status: str = "pending"
+    condition: str | None = None
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    outputs: dict[str, str] = field(default_factory=dict)
+    cohort_size: int | None = None
+    error: str | None = None
+    failed_stage: str | None = None
+    warnings: list[str] = field(default_factory=list)
+
+
+def _record_failure(job: BatchJob, stage: str, exc: BaseException) -> BatchJob:
+    job.status = "failed"
+    job.failed_stage = stage
+    job.error = f"{type(exc).__name__}: {exc}"
+    return job
+
+
+class _StageTimer:
+    def __init__(self, job: BatchJob):
+        self.job = job
+
+    def __call__(self, stage: str):
+        self.stage = stage
+        return self
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.job.stage_seconds[self.stage] = round(time.perf_counter() - self.started, 3)
+        if exc is not None:
+            _record_failure(self.job, self.stage, exc)
+        return False
+
+
+def discover_inputs(input_dir: Path | str) -> list[Path]:
+    """Protocol documents and metadata JSON files directly inside ``input_dir``."""
+    return sorted(
+        path for path in Path(input_dir).iterdir()
+        if path.is_file() and path.suffix.lower() in (*DOCUMENT_SUFFIXES, METADATA_SUFFIX)
+    )
+
+
+def _job_names(paths: list[Path]) -> list[str]:
+    """
+    Output directory name for each input, unique within the batch.
+
+    A file keeps its stem unless another input shares it (``trial.pdf`` and
+    ``trial.json``), in which case the extension is appended (``trial-pdf``,
+    ``trial-json``); any remaining clash gets a numeric suffix.  Names are
+    compared case-insensitively, as on case-insensitive filesystems.
+    """
+    stem_counts = Counter(path.stem.lower() for path in paths)
+    names = [
+        path.stem if stem_counts[path.stem.lower()] == 1
+        else f"{path.stem}-{path.suffix.lstrip('.').lower()}"
+        for path in paths
+    ]
+    taken = {name.lower() for path, name in zip(paths, names) if stem_counts[path.stem.lower()] == 1}
+    for position, path in enumerate(paths):
+        if stem_counts[path.stem.lower()] == 1:
+            continue
+        name, copy = names[position], 2
+        while name.lower() in taken:
+            name, copy = f"{names[position]}-{copy}", copy + 1
+        taken.add(name.lower())
+        names[position] = name
+    return names
+
+
+def _worker_init() -> None:
+    # Jobs already run one per process; charts render in-process inside each.
+    from trial_design_explorer.services import chart_service
+
+    chart_service.CHART_RENDER_WORKERS = 1
+
+
+def _load_protocol(path: Path) -> ProtocolMetadata:
+    from trial_design_explorer.services.document_service import extract_text_from_uploaded_file
+    from trial_design_explorer.services.protocol_service import (
+        extract_protocol_metadata_from_text,
+        protocol_metadata_from_session,
+    )
+
+    if path.suffix.lower() == METADATA_SUFFIX:
+        return protocol_metadata_from_session(json.loads(path.read_text(encoding="utf-8")))
+    with path.open("rb") as handle:
+        text = extract_text_from_uploaded_file(handle)
+    if not text.strip():
+        raise ValueError("no text could be extracted from the document")
+    return extract_protocol_metadata_from_text(text)
+
+
+def _extract_job(job: BatchJob) -> tuple[BatchJob, dict | None]:
+    timer = _StageTimer(job)
+    try:
+        with timer("extract"):
+            protocol = _load_protocol(Path(job.input_path))
+            # The workspace falls back to DEFAULT_CONDITION with the user
+            # confirming the label; a headless run must not benchmark an
+            # unrelated indication unseen.
+            if not (protocol.condition or "").strip():
+                raise ValueError(
+                    "no condition was extracted from the protocol; supply it in a "
+                    "ProtocolMetadata JSON file to benchmark this protocol"
+                )
+    except Exception:
+        return job, None
+    job.condition = protocol.condition.strip()
+    return job, protocol.to_dict()
+
+
+def _warm_condition(condition: str) -> dict:
+    from trial_design_explorer.services.clinical_trials_service import load_trials_df
+
+    started = time.perf_counter()
+    entry: dict = {"condition": condition}
+    try:
+        entry["trials"] = len(load_trials_df(condition))
+    except Exception as exc:
+        # Jobs for this condition still run; their cohort stage retries the
+        # download and records its own failure.
+        entry["error"] = f"{type(exc).__name__}: {exc}"
+    entry["seconds"] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+def _search_pubmed(searches: list[tuple[str, str | None]]) -> tuple[list[dict], list[list[dict]]]:
+    """(manifest entries, article dicts) for each (condition, endpoint focus) search."""
+    from trial_design_explorer.services.pubmed_service import search_pubmed_evidence_many
+
+    entries = [{"condition": condition, "endpoint_focus": focus} for condition, focus in searches]
+    started = time.perf_counter()
+    try:
+        results = search_pubmed_evidence_many([dict(entry) for entry in entries], max_results=8)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        results = [None] * len(entries)
+        for entry in entries:
+            entry["error"] = error
+    seconds = round(time.perf_counter() - started, 3)
+    articles = [[article.to_dict() for article in result or []] for result in results]
+    for entry, found in zip(entries, articles):
+        entry["articles"] = len(found)
+        entry["seconds"] = seconds
+    return entries, articles
+
+
+def _pubmed_warning(entry: dict) -> str | None:
+    if "error" in entry:
+        return f"pubmed: search failed ({entry['error']}); the report has no literature evidence"
+    if entry["articles"] == 0:
+        return (
+            "pubmed: no articles retrieved (no matches, or requests were rejected); "
+            "the report has no literature evidence"
+        )
+    return None
+
+
+def _report_job(job: BatchJob, protocol_payload: dict, output_dir: str,
+                pubmed_articles: list[dict], include_slides: bool) -> BatchJob:
+    from trial_design_explorer.services.clinical_trials_service import (
+        build_design_similar_cohort,
+        load_trials_df,
+    )
+    from trial_design_explorer.services.comparison_service import (
+        build_comparison_result,
+        compare_protocol_to_trials,
+    )
+    from trial_design_explorer.services.protocol_service import protocol_metadata_from_session
+    from trial_design_explorer.services.report_service import generate_protocol_report_pdf
+    from trial_design_explorer.services.slides_service import generate_slides_pptx
+
+    timer = _StageTimer(job)
+    try:
+        with timer("prepare"):
+            protocol = protocol_metadata_from_session(protocol_payload)
+            job_dir = Path(output_dir) / job.name
+            job_dir.mkdir(parents=True, exist_ok=True)
+            audit_log = [build_audit_event(
+                "batch_extract_protocol", f"Protocol profile loaded from {Path(job.input_path).name}.",
+                artifact_type="protocol", artifact_id=job.name,
+            )]
+        with timer("cohort"):
+            all_trials_df = load_trials_df(job.condition)
+            trials_df = build_design_similar_cohort(protocol, all_trials_df)
+            job.cohort_size = len(trials_df)
+        with timer("comparison"):
+            result = build_comparison_result(protocol, trials_df)
+            metrics = result.to_metrics_dict()
+            recommendations = result.to_recommendations_list()
+            notes = compare_protocol_to_trials(protocol, trials_df)
+        audit_log.append(build_audit_event(
+            "batch_build_comparison",
+            f"Compared against {len(trials_df)} design-similar trials for '{job.condition}'.",
+            artifact_type="comparison_cohort",
+            metadata={"condition": job.condition, "cohort_size": len(trials_df)},
+        ))
+        with timer("pdf"):
+            pdf_path = job_dir / f"{job.name}_report.pdf"
+            generate_protocol_report_pdf(
+                str(pdf_path), protocol, notes, audit_log, trials_df,
+                [], metrics, recommendations, pubmed_articles=pubmed_articles,
+            )
+            job.outputs["pdf"] = str(pdf_path)
+        if include_slides:
+            with timer("pptx"):
+                pptx_path = job_dir / f"{job.name}_slides.pptx"
+                generate_slides_pptx(
+                    str(pptx_path), protocol, metrics, recommendations, audit_log, trials_df,
+                    pubmed_articles=pubmed_articles,
+                )
+                job.outputs["pptx"] = str(pptx_path)
+    except Exception:
+        return job
+    job.status = "completed"
+    return job
+
+
+def run_batch(
+    input_dir: Path | str,
+    output_dir: Path | str,
+    max_workers: int = 2,
+    include_pubmed: bool = True,
+    include_slides: bool = True,
+) -> dict:
+    """
+    Run every protocol in ``input_dir`` through the report pipeline.
+
+    A job that fails at any stage, or whose worker process dies, is recorded
+    as failed without stopping the others.  Returns the manifest, which is
+    also written to ``output_dir/manifest.json`` even if the batch itself is
+    interrupted.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    started_at = current_utc_timestamp()
+    batch_started = time.perf_counter()
+    paths = discover_inputs(input_dir)
+    jobs = [BatchJob(input_path=str(path), name=name) for path, name in zip(paths, _job_names(paths))]
+    phase_seconds: dict[str, float] = {}
+    registry_warm: list[dict] = []
+    pubmed_searches: list[dict] = []
+
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, max_workers), initializer=_worker_init) as pool:
+            phase_started = time.perf_counter()
+            payloads: dict[str, dict] = {}
+            futures = {job.name: pool.submit(_extract_job, job) for job in jobs}
+            for position, job in enumerate(jobs):
+                try:
+                    jobs[position], payload = futures[job.name].result()
+                except Exception as exc:
+                    _record_failure(job, "extract", exc)
+                    continue
+                if payload is not None:
+                    payloads[job.name] = payload
+            phase_seconds["extract"] = round(time.perf_counter() - phase_started, 3)
+
+            phase_started = time.perf_counter()
+            conditions = list(dict.fromkeys(job.condition for job in jobs if job.name in payloads))
+            with ThreadPoolExecutor(max_workers=max(1, FEDERATED_SEARCH_WORKERS)) as fetchers:
+                registry_warm.extend(fetchers.map(_warm_condition, conditions))
+            phase_seconds["warm"] = round(time.perf_counter() - phase_started, 3)
+
+            evidence: dict[str, list[dict]] = {name: [] for name in payloads}
+            if include_pubmed:
+                phase_started = time.perf_counter()
+                search_of = {
+                    job.name: (job.condition, payloads[job.name].get("endpoint_focus") or None)
+                    for job in jobs if job.name in payloads
+                }
+                searches = list(dict.fromkeys(search_of.values()))
+                entries, articles = _search_pubmed(searches)
+                pubmed_searches.extend(entries)
+                results = dict(zip(searches, zip(entries, articles)))
+                for job in jobs:
+                    if job.name not in search_of:
+                        continue
+                    entry, evidence[job.name] = results[search_of[job.name]]
+                    warning = _pubmed_warning(entry)
+                    if warning:
+                        job.warnings.append(warning)
+                phase_seconds["pubmed"] = round(time.perf_counter() - phase_started, 3)
+
+            phase_started = time.perf_counter()
+            futures = {
+                job.name: pool.submit(
+                    _report_job, job, payloads[job.name], str(output_dir), evidence[job.name], include_slides
+                )
+                for job in jobs if job.name in payloads
+            }
+            for position, job in enumerate(jobs):
+                if job.name not in futures:
+                    continue
+                try:
+                    jobs[position] = futures[job.name].result()
+                except Exception as exc:
+                    _record_failure(job, "report", exc)
+            phase_seconds["report"] = round(time.perf_counter() - phase_started, 3)
+    finally:
+        manifest = _write_manifest(
+            output_dir, input_dir, jobs, started_at, batch_started, max_workers,
+            phase_seconds, registry_warm, pubmed_searches,
+        )
+    return manifest
+
+
+def _write_manifest(output_dir: Path, input_dir, jobs: list[BatchJob], started_at: str,
+                    batch_started: float, max_workers: int, phase_seconds: dict,
+                    registry_warm: list[dict], pubmed_searches: list[dict]) -> dict:
+    manifest = {
+        "started_at": started_at,
+        "finished_at": current_utc_timestamp(),
+        "input_dir": str(input_dir),
+        "output_dir": str(output_dir),
+        "workers": max_workers,
+        "total_seconds": round(time.perf_counter() - batch_started, 3),
+        "phase_seconds": phase_seconds,
+        "registry_warm": registry_warm,
+        "pubmed_searches": pubmed_searches,
+        "completed": sum(1 for job in jobs if job.status == "completed"),
+        "with_warnings": sum(1 for job in jobs if job.warnings),
+        "failed": sum(1 for job in jobs if job.status == "failed"),
+        "jobs": [asdict(job) for job in jobs],
+    }
+    (output_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
@@ -1,15 +1,26 @@
 """
 Chart service: decision-informed matplotlib visualisations for PDF reports and slides.
 
-All functions return a BytesIO object containing a PNG image so they can be
-embedded directly into ReportLab PDFs or python-pptx slides without writing
-temporary files to disk.
+All functions return a BytesIO object containing a PNG image (or an SVG
+document with fmt="svg") so they can be embedded directly into ReportLab PDFs
+or python-pptx slides without writing temporary files to disk.  The PDF report
+uses SVG when svglib is installed, so its charts stay vector drawings.
+
+The exporters do not call the generators directly: render_chart_set() renders
+every chart the PDF and the deck need for one metrics dict in a process pool,
+and chart_buffer() hands out the memoized PNGs, keyed by metrics hash, chart
+name and size, so exporting both formats renders each figure once.
 """
 
 from __future__ import annotations
 
+import hashlib
 import io
+import json
 import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
 
 import matplotlib
@@ -19,6 +30,8 @@ import matplotlib.patches as mpatches
 import matplotlib.ticker as mticker
 import numpy as np
 
+from trial_design_explorer.config import CHART_RENDER_WORKERS, REPORT_VECTOR_CHARTS
+
 # ── Brand colours matching the report ─────────────────────────────────────────
 C_COMPLETED = "#1F5B7A"   # dark teal  – successful precedent
 C_DISRUPTED = "#C0563D"   # muted red  – risk / disrupted precedent
@@ -28,10 +41,16 @@ C_HEADER    = "#15324A"   # navy       – axes / titles
 C_SOFT      = "#EDF3F7"   # light blue-grey – backgrounds
 
 
-def _save(fig) -> io.BytesIO:
+def _save(fig, fmt: str = "png") -> io.BytesIO:
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight",
-                facecolor=fig.get_facecolor())
+    if fmt == "svg":
+        # Keep text as <text> rather than glyph outlines: several times smaller
+        # and faster for svglib to convert; it renders in the report's Helvetica.
+        with plt.rc_context({"svg.fonttype": "none"}):
+            fig.savefig(buf, format="svg", bbox_inches="tight", facecolor=fig.get_facecolor())
+    else:
+        fig.savefig(buf, format="png", dpi=150, bbox_inches="tight",
+                    facecolor=fig.get_facecolor())
     plt.close(fig)
     buf.seek(0)
     return buf
@@ -39,14 +58,17 @@ def _save(fig) -> io.BytesIO:
 
 # ── 1. Radar / spider chart — design alignment across domains ─────────────────
 
-def generate_radar_chart(metrics: dict, width_in: float = 5.5, height_in: float = 5.0) -> io.BytesIO:
+def generate_radar_chart(metrics: dict,
+                         width_in: float = 5.5,
+                         height_in: float = 5.0,
+                         fmt: str = "png") -> io.BytesIO:
     """
     Radar chart comparing protocol alignment with completed vs disrupted precedent
     across all design domains.  Each axis is a 0–100% alignment score.
     """
     rows = metrics.get("alignment_by_domain", [])
     if not rows:
-        return _empty_chart("No alignment data available", width_in, height_in)
+        return _empty_chart("No alignment data available", width_in, height_in, fmt)
 
     labels = [r["Domain"] for r in rows]
     completed_vals = [float(r.get("Completed Match (%)") or 0) for r in rows]
@@ -78,14 +100,15 @@ def generate_radar_chart(metrics: dict, width_in: float = 5.5, height_in: float
               framealpha=0.9, edgecolor=C_NEUTRAL)
     ax.grid(color=C_NEUTRAL, linestyle="--", linewidth=0.5, alpha=0.5)
     fig.tight_layout()
-    return _save(fig)
+    return _save(fig, fmt)
 
 
 # ── 2. Enrollment benchmark — box-and-whisker with protocol target line ────────
 
 def generate_enrollment_benchmark_chart(metrics: dict,
                                          width_in: float = 6.0,
-                                         height_in: float = 4.0) -> io.BytesIO:
+                                         height_in: float = 4.0,
+                                         fmt: str = "png") -> io.BytesIO:
     """
     Box-and-whisker plot showing completed and disrupted enrollment distributions,
     with the protocol's planned enrollment as a vertical reference line.
@@ -99,7 +122,7 @@ def generate_enrollment_benchmark_chart(metrics: dict,
     target = metrics.get("enrollment_target")
 
     if c_med is None and d_med is None:
-        return _empty_chart("Enrollment benchmark data not available", width_in, height_in)
+        return _empty_chart("Enrollment benchmark data not available", width_in, height_in, fmt)
 
     fig, ax = plt.subplots(figsize=(width_in, height_in), facecolor="white")
     ax.set_facecolor(C_SOFT)
@@ -143,14 +166,15 @@ def generate_enrollment_benchmark_chart(metrics: dict,
     ax.legend(fontsize=8, loc="lower right", framealpha=0.9, edgecolor=C_NEUTRAL)
     ax.spines[["top", "right"]].set_visible(False)
     fig.tight_layout()
-    return _save(fig)
+    return _save(fig, fmt)
 
 
 # ── 3. Duration comparison — stacked reference ranges ─────────────────────────
 
 def generate_duration_comparison_chart(metrics: dict,
                                         width_in: float = 6.0,
-                                        height_in: float = 3.5) -> io.BytesIO:
+                                        height_in: float = 3.5,
+                                        fmt: str = "png") -> io.BytesIO:
     """
     Horizontal range bar showing completed vs disrupted median trial duration
     with the protocol's planned duration as a marker.
@@ -164,7 +188,7 @@ def generate_duration_comparison_chart(metrics: dict,
     proto = metrics.get("protocol_duration_months")
 
     if c_med is None and d_med is None:
-        return _empty_chart("Duration data not available", width_in, height_in)
+        return _empty_chart("Duration data not available", width_in, height_in, fmt)
 
     fig, ax = plt.subplots(figsize=(width_in, height_in), facecolor="white")
     ax.set_facecolor(C_SOFT)
@@ -198,21 +222,22 @@ def generate_duration_comparison_chart(metrics: dict,
     ax.legend(fontsize=8, loc="lower right", framealpha=0.9, edgecolor=C_NEUTRAL)
     ax.spines[["top", "right"]].set_visible(False)
     fig.tight_layout()
-    return _save(fig)
+    return _save(fig, fmt)
 
 
 # ── 4. Risk signal heatmap — alignment score colour table ─────────────────────
 
 def generate_alignment_heatmap(metrics: dict,
                                 width_in: float = 7.0,
-                                height_in: float = 3.5) -> io.BytesIO:
+                                height_in: float = 3.5,
+                                fmt: str = "png") -> io.BytesIO:
     """
     Colour-coded heatmap table of alignment scores per design domain.
     Green = strong completed alignment; red = closer to disrupted precedent.
     """
     rows = metrics.get("alignment_by_domain", [])
     if not rows:
-        return _empty_chart("No alignment data available", width_in, height_in)
+        return _empty_chart("No alignment data available", width_in, height_in, fmt)
 
     domains = [r["Domain"] for r in rows]
     completed = [float(r.get("Completed Match (%)") or 0) for r in rows]
@@ -274,7 +299,7 @@ def generate_alignment_heatmap(metrics: dict,
     ax.set_title("Design Alignment Risk Signal Summary",
                  fontsize=10, color=C_HEADER, fontweight="bold", pad=12)
     fig.tight_layout()
-    return _save(fig)
+    return _save(fig, fmt)
 
 
 def _pct_to_color(value: float, reverse: bool = False) -> str:
@@ -300,7 +325,8 @@ def _gap_color(gap: float) -> str:
 
 def generate_endpoint_distribution_chart(metrics: dict,
                                           width_in: float = 6.5,
-                                          height_in: float = 4.0) -> io.BytesIO:
+                                          height_in: float = 4.0,
+                                          fmt: str = "png") -> io.BytesIO:
     """
     Grouped bar chart showing endpoint category distribution in completed vs
     disrupted trials.  Protocol's endpoint focus is highlighted.
@@ -308,7 +334,7 @@ def generate_endpoint_distribution_chart(metrics: dict,
     c_dist = metrics.get("completed_endpoint_distribution", {})
     d_dist = metrics.get("disrupted_endpoint_distribution", {})
     if not c_dist and not d_dist:
-        return _empty_chart("Endpoint distribution data not available", width_in, height_in)
+        return _empty_chart("Endpoint distribution data not available", width_in, height_in, fmt)
 
     all_cats = sorted(set(c_dist) | set(d_dist))
     c_vals = [c_dist.get(cat, 0) for cat in all_cats]
@@ -345,14 +371,15 @@ def generate_endpoint_distribution_chart(metrics: dict,
             ax.text(bar.get_x() + bar.get_width() / 2, h + 0.5,
                     f"{h:.0f}%", ha="center", va="bottom", fontsize=6.5, color=C_HEADER)
     fig.tight_layout()
-    return _save(fig)
+    return _save(fig, fmt)
 
 
 # ── 6. Precedent posture gauge — single-metric visual ─────────────────────────
 
 def generate_posture_gauge(metrics: dict,
                             width_in: float = 5.0,
-                            height_in: float = 3.0) -> io.BytesIO:
+                            height_in: float = 3.0,
+                            fmt: str = "png") -> io.BytesIO:
     """
     Half-donut gauge showing the net precedent gap (completed fit – disrupted fit).
     Positive = closer to completed (green); negative = closer to disrupted (red).
@@ -361,7 +388,7 @@ def generate_posture_gauge(metrics: dict,
     d_fit = metrics.get("disrupted_design_fit_pct")
 
     if c_fit is None or d_fit is None:
-        return _empty_chart("Posture data not available", width_in, height_in)
+        return _empty_chart("Posture data not available", width_in, height_in, fmt)
 
     gap = c_fit - d_fit
     posture = metrics.get("precedent_posture", "Mixed")
@@ -400,18 +427,19 @@ def generate_posture_gauge(metrics: dict,
     ax.set_title("Overall Precedent Posture", fontsize=10, color=C_HEADER,
                  fontweight="bold", pad=4)
     fig.tight_layout()
-    return _save(fig)
+    return _save(fig, fmt)
 
 
 # ── 7. Sponsor type donut ─────────────────────────────────────────────────────
 
 def generate_sponsor_donut(metrics: dict,
                             width_in: float = 4.0,
-                            height_in: float = 3.5) -> io.BytesIO:
+                            height_in: float = 3.5,
+                            fmt: str = "png") -> io.BytesIO:
     """Donut chart showing industry vs academic sponsor split in the cohort."""
     dist = metrics.get("sponsor_type_distribution", {})
     if not dist:
-        return _empty_chart("Sponsor data not available", width_in, height_in)
+        return _empty_chart("Sponsor data not available", width_in, height_in, fmt)
 
     labels = list(dist.keys())
     values = [float(v) for v in dist.values()]
@@ -433,14 +461,159 @@ def generate_sponsor_donut(metrics: dict,
     ax.set_title("Sponsor Type Distribution", fontsize=10, color=C_HEADER,
                  fontweight="bold", pad=10)
     fig.tight_layout()
-    return _save(fig)
+    return _save(fig, fmt)
 
 
 # ── Helper ────────────────────────────────────────────────────────────────────
 
-def _empty_chart(message: str, width_in: float, height_in: float) -> io.BytesIO:
+def _empty_chart(message: str, width_in: float, height_in: float, fmt: str = "png") -> io.BytesIO:
     fig, ax = plt.subplots(figsize=(width_in, height_in), facecolor="white")
     ax.axis("off")
     ax.text(0.5, 0.5, message, ha="center", va="center",
             fontsize=10, color=C_NEUTRAL, transform=ax.transAxes)
-    return _save(fig)
+    return _save(fig, fmt)
+
+
+# ── Chart rendering stage ─────────────────────────────────────────────────────
+
+_CHART_GENERATORS = {
+    "radar": generate_radar_chart,
+    "enrollment_benchmark": generate_enrollment_benchmark_chart,
+    "duration_comparison": generate_duration_comparison_chart,
+    "alignment_heatmap": generate_alignment_heatmap,
+    "endpoint_distribution": generate_endpoint_distribution_chart,
+    "posture_gauge": generate_posture_gauge,
+    "sponsor_donut": generate_sponsor_donut,
+}
+
+# (chart name, width_in, height_in) as drawn by each exporter.
+REPORT_CHART_SPECS = [
+    ("posture_gauge", 5.0, 3.2),
+    ("radar", 7.0, 5.5),
+    ("alignment_heatmap", 9.0, 3.2),
+    ("enrollment_benchmark", 8.0, 4.0),
+    ("duration_comparison", 8.0, 3.5),
+    ("endpoint_distribution", 9.0, 4.5),
+]
+SLIDE_CHART_SPECS = [
+    ("posture_gauge", 5.5, 3.5),
+    ("radar", 7.0, 5.5),
+    ("enrollment_benchmark", 7.5, 4.5),
+    ("duration_comparison", 8.5, 4.2),
+    ("alignment_heatmap", 12.0, 4.5),
+    ("endpoint_distribution", 7.5, 5.0),
+    ("sponsor_donut", 4.5, 4.0),
+]
+
+
+_MEMO_SIZE = 64
+_CHART_MEMO: "OrderedDict[tuple, bytes]" = OrderedDict()
+_MEMO_LOCK = threading.Lock()
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def report_chart_format() -> str:
+    """Format for PDF report charts: svg when enabled and svglib can embed it, else png."""
+    if not REPORT_VECTOR_CHARTS:
+        return "png"
+    try:
+        import svglib  # noqa: F401
+    except ImportError:
+        return "png"
+    return "svg"
+
+
+def export_chart_specs() -> list[tuple[str, float, float, str]]:
+    """Every (chart, width_in, height_in, format) the PDF and the deck draw."""
+    report_fmt = report_chart_format()
+    specs = [(*spec, report_fmt) for spec in REPORT_CHART_SPECS]
+    specs += [(*spec, "png") for spec in SLIDE_CHART_SPECS]   # python-pptx embeds bitmaps only
+    return list(dict.fromkeys(specs))
+
+
+def metrics_fingerprint(metrics: dict) -> str:
+    payload = json.dumps(metrics, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _render_chart(name: str, metrics: dict, width_in: float, height_in: float, fmt: str) -> bytes:
+    return _CHART_GENERATORS[name](metrics, width_in=width_in, height_in=height_in, fmt=fmt).getvalue()
+
+
+def _memo_get(key: tuple) -> bytes | None:
+    with _MEMO_LOCK:
+        data = _CHART_MEMO.get(key)
+        if data is not None:
+            _CHART_MEMO.move_to_end(key)
+        return data
+
+
+def _memo_put(key: tuple, data: bytes) -> None:
+    with _MEMO_LOCK:
+        _CHART_MEMO[key] = data
+        while len(_CHART_MEMO) > _MEMO_SIZE:
+            _CHART_MEMO.popitem(last=False)
+
+
+def _chart_pool() -> ProcessPoolExecutor | None:
+    global _POOL
+    if CHART_RENDER_WORKERS <= 1:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            import multiprocessing
+
+            # spawn: forking a Streamlit process with live threads is not safe.
+            _POOL = ProcessPoolExecutor(
+                max_workers=CHART_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL
+
+
+def _discard_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+def render_chart_set(metrics: dict, specs: list[tuple[str, float, float, str]] | None = None) -> None:
+    """
+    Render every chart in ``specs`` (default: export_chart_specs()) for
+    ``metrics`` that is not memoized yet.
+
+    Charts are rendered in worker processes when CHART_RENDER_WORKERS > 1;
+    anything the pool fails to render is drawn in-process instead.
+    """
+    fingerprint = metrics_fingerprint(metrics)
+    specs = export_chart_specs() if specs is None else specs
+    missing = [spec for spec in dict.fromkeys(specs) if _memo_get((fingerprint, *spec)) is None]
+    if not missing:
+        return
+
+    pool = _chart_pool() if len(missing) > 1 else None
+    if pool is not None:
+        try:
+            futures = [(spec, pool.submit(_render_chart, spec[0], metrics, *spec[1:])) for spec in missing]
+            for spec, future in futures:
+                _memo_put((fingerprint, *spec), future.result())
+            return
+        except Exception:
+            _discard_pool()
+    for spec in missing:
+        if _memo_get((fingerprint, *spec)) is None:
+            _memo_put((fingerprint, *spec), _render_chart(spec[0], metrics, *spec[1:]))
+
+
+def chart_buffer(metrics: dict, name: str, width_in: float, height_in: float,
+                 fmt: str = "png") -> io.BytesIO:
+    """One chart, served from the memo (rendered on demand if missing)."""
+    key = (metrics_fingerprint(metrics), name, width_in, height_in, fmt)
+    data = _memo_get(key)
+    if data is None:
+        data = _render_chart(name, metrics, width_in, height_in, fmt)
+        _memo_put(key, data)
+    return io.BytesIO(data)
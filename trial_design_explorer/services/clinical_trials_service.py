@@ -25,13 +25,70 @@ Similarity thresholds (for interpretation, not hard filtering):
 Sponsor is intentionally excluded from all scoring.
 """
 
+import hashlib
 import re
 from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
 import requests
 
-from trial_design_explorer.config import BASE_API_URL, DEFAULT_PAGE_SIZE
+from trial_design_explorer.config import (
+    BASE_API_URL,
+    COMMON_CONDITIONS,
+    CONDITION_SYNONYMS,
+    DEFAULT_PAGE_SIZE,
+    FEDERATED_SEARCH_MAX_QUERIES,
+    FEDERATED_SEARCH_WORKERS,
+)
+from trial_design_explorer.services.cohort_snapshot_service import (
+    load_cohort_snapshot,
+    load_snapshot_features,
+    save_cohort_snapshot,
+)
+from trial_design_explorer.services.registry_cache_service import (
+    RegistryCache,
+    get_registry_cache,
+    normalize_condition,
+    registry_cache_key,
+    study_last_update,
+    study_nct_id,
+)
+
+# Registry enum columns stored as categoricals, with the fill for missing values.
+ENUM_COLUMNS = {
+    "Status":             "Unknown",
+    "Phase":              "N/A",
+    "Study Type":         "N/A",
+    "Allocation":         "N/A",
+    "Masking":            "N/A",
+    "Intervention Model": "N/A",
+    "Primary Purpose":    "N/A",
+    "Sex":                "N/A",
+}
+
+# Typed date columns derived from the registry date strings at parse time,
+# and the trial duration (completion − start) in 30-day months.  Not the same
+# measure as the similarity feature "duration_months" (positive spans only,
+# 30.44-day months), hence the distinct name.
+DATE_COLUMNS = {
+    "Start Date":      "start_datetime",
+    "Completion Date": "completion_datetime",
+}
+DURATION_COLUMN = "registry_duration_months"
+
+
+class RegistryFetchError(RuntimeError):
+    """A registry pull failed after some pages had arrived; the result would be partial."""
+
+
+# Registry cache refresh modes (see iter_trial_pages)
+_REFRESH_MODES = ("auto", "changed", "full")
+_LISTING_PAGE_SIZE = 1000   # API maximum; listing pages carry two fields per study
+_ID_BATCH_SIZE = 200        # NCT IDs per filter.ids request when re-pulling changes
 
 # ── Domain weights ─────────────────────────────────────────────────────────────
 # Top-level domains mirror the formal PICO-aligned similarity framework.
@@ -100,119 +157,579 @@ _POP_STOP = {
 
 # ── Registry fetch and parse ───────────────────────────────────────────────────
 
-def fetch_trials_by_condition(condition: str, limit: int = DEFAULT_PAGE_SIZE):
+def _iter_remote_pages(params: dict, page_size: int, max_studies: int | None = None) -> Iterator[dict]:
+    """
+    Yield raw ClinicalTrials.gov response pages for a query as they arrive.
+
+    Follows ``nextPageToken`` until the registry has no more pages or
+    ``max_studies`` studies have been yielded.  A single keep-alive session is
+    reused across pages.  If the first page cannot be retrieved nothing is
+    yielded; a failure on any later page raises RegistryFetchError, so a
+    truncated pull is never mistaken for a complete one.
+    """
+    remaining = max_studies
+    page_token = None
+    with requests.Session() as session:
+        while remaining is None or remaining > 0:
+            page_params = {
+                **params,
+                "pageSize": page_size if remaining is None else min(page_size, remaining),
+            }
+            if page_token:
+                page_params["pageToken"] = page_token
+            try:
+                response = session.get(BASE_API_URL, params=page_params, timeout=30)
+                response.raise_for_status()
+                page = response.json()
+            except (requests.RequestException, ValueError) as exc:
+                if page_token:
+                    raise RegistryFetchError(f"registry pagination failed after a partial pull: {exc}") from exc
+                return
+
+            studies = page.get("studies", [])
+            if remaining is not None:
+                studies = studies[:remaining]
+                remaining -= len(studies)
+            page_token = page.get("nextPageToken")
+            yield {"studies": studies, "nextPageToken": page_token}
+            if not page_token or not studies:
+                return
+
+
+def _download_into_cache(
+    cache: RegistryCache,
+    key: str,
+    condition: str,
+    page_size: int,
+    max_studies: int | None,
+) -> Iterator[dict]:
+    """Stream a full pull to the caller while staging it; commit only a complete pull."""
+    cache.begin(key)
+    position = 0
+    complete = False
+    try:
+        for page in _iter_remote_pages({"query.term": condition}, page_size, max_studies):
+            cache.stage(key, position, page["studies"])
+            position += len(page["studies"])
+            complete = not page["nextPageToken"] or position == max_studies
+            yield page
+    except BaseException:
+        # Fetch error or the consumer stopped early: never commit the partial pull.
+        cache.discard(key)
+        raise
+    if complete:
+        cache.commit(key, condition, page_size)
+    else:
+        cache.discard(key)
+
+
+def _refresh_changed(
+    cache: RegistryCache,
+    key: str,
+    condition: str,
+    page_size: int,
+    max_studies: int | None,
+) -> bool:
+    """
+    Bring a cached entry up to date by re-pulling only changed studies.
+
+    A lightweight listing pass (NCT ID + lastUpdatePostDate only) is diffed
+    against the cache; new or updated studies are fetched by ID and studies
+    that dropped out of the query are removed.  Returns False, leaving the
+    entry untouched, if any request fails.
+    """
+    listing: list[tuple[str, str | None]] = []
+    complete = False
+    listing_params = {"query.term": condition, "fields": "NCTId,LastUpdatePostDate"}
+    try:
+        for page in _iter_remote_pages(listing_params, _LISTING_PAGE_SIZE, max_studies):
+            listing.extend(
+                (study_nct_id(study), study_last_update(study))
+                for study in page["studies"]
+                if study_nct_id(study)
+            )
+            complete = not page["nextPageToken"] or len(listing) == max_studies
+    except RegistryFetchError:
+        return False
+    if not complete:
+        return False
+
+    cached = cache.last_updates(key)
+    changed_ids = [
+        nct_id for nct_id, last_update in listing
+        if nct_id not in cached or cached[nct_id] != last_update
+    ]
+    changed_studies: list[dict] = []
+    for start in range(0, len(changed_ids), _ID_BATCH_SIZE):
+        batch = changed_ids[start:start + _ID_BATCH_SIZE]
+        fetched = 0
+        try:
+            for page in _iter_remote_pages({"filter.ids": ",".join(batch)}, len(batch)):
+                changed_studies.extend(page["studies"])
+                fetched += 1
+        except RegistryFetchError:
+            return False
+        if not fetched:
+            return False
+
+    cache.apply_refresh(key, condition, page_size, listing, changed_studies)
+    return True
+
+
+def iter_trial_pages(
+    condition: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_studies: int | None = None,
+    refresh: str = "auto",
+) -> Iterator[dict]:
+    """
+    Yield ClinicalTrials.gov response pages for a condition, via the local cache.
+
+    ``refresh`` controls the on-disk registry cache:
+      "auto"     serve a fresh entry as-is; refresh a stale one incrementally
+      "changed"  refresh incrementally now, whatever the entry's age
+      "full"     re-download every study and replace the entry
+
+    Incremental refreshes re-pull only studies whose lastUpdatePostDate
+    changed.  If the registry is unreachable a stale entry is still served.
+    On a cache miss, pages stream straight from the API while being stored;
+    if that pull breaks off mid-way RegistryFetchError is raised and nothing
+    is cached.
+    """
+    if refresh not in _REFRESH_MODES:
+        raise ValueError(f"refresh must be one of {_REFRESH_MODES}, got {refresh!r}")
+
+    cache = get_registry_cache()
+    if not cache.enabled:
+        yield from _iter_remote_pages({"query.term": condition}, page_size, max_studies)
+        return
+
+    key = registry_cache_key(condition, page_size, max_studies)
+    entry = cache.lookup(key) if refresh != "full" else None
+    if entry is None:
+        yield from _download_into_cache(cache, key, condition, page_size, max_studies)
+        return
+    if refresh == "changed" or not cache.is_fresh(entry):
+        _refresh_changed(cache, key, condition, page_size, max_studies)
+    yield from cache.iter_pages(key, page_size)
+
+
+def fetch_trials_by_condition(
+    condition: str,
+    limit: int | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    refresh: str = "auto",
+):
+    """
+    Fetch every study for a condition (or the first ``limit``) as one response dict.
+
+    Returns None when not even the first page could be retrieved and raises
+    RegistryFetchError when a later page fails.  Prefer
+    ``iter_trial_pages`` + ``parse_trials_to_df`` for large conditions so the
+    raw JSON of earlier pages can be released while later pages download.
+    """
+    studies: list[dict] = []
+    pages = 0
+    for page in iter_trial_pages(condition, page_size=page_size, max_studies=limit, refresh=refresh):
+        studies.extend(page["studies"])
+        pages += 1
+    if not pages:
+        return None
+    return {"studies": studies}
+
+
+def _parse_study(study: dict) -> dict | None:
     try:
-        response = requests.get(
-            BASE_API_URL,
-            params={"query.term": condition, "pageSize": limit},
-            timeout=30,
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException:
+        protocol_section = study.get("protocolSection", {})
+
+        identification   = protocol_section.get("identificationModule", {})
+        status_module    = protocol_section.get("statusModule", {})
+        design_module    = protocol_section.get("designModule", {})
+        sponsor_module   = protocol_section.get("sponsorCollaboratorsModule", {})
+        outcomes_module  = protocol_section.get("outcomesModule", {})
+        conditions_module = protocol_section.get("conditionsModule", {})
+        contacts_module  = protocol_section.get("contactsLocationsModule", {})
+        arms_module      = protocol_section.get("armsInterventionsModule", {})
+        eligibility_module = protocol_section.get("eligibilityModule", {})
+        enrollment_module = protocol_section.get("designModule", {})
+
+        raw_locations = contacts_module.get("locations", [])
+        locations = [
+            {
+                "city": loc.get("city"),
+                "country": loc.get("country"),
+                "facility": loc.get("facility"),
+                "lat": loc.get("geoPoint", {}).get("lat"),
+                "lon": loc.get("geoPoint", {}).get("lon"),
+            }
+            for loc in raw_locations
+        ]
+
+        primary_outcomes = ", ".join(
+            o.get("measure", "")
+            for o in outcomes_module.get("primaryOutcomes", [])
+            if o.get("measure")
+        ) or "N/A"
+
+        interventions = ", ".join(
+            i.get("type", "")
+            for i in arms_module.get("interventions", [])
+            if i.get("type")
+        ) or "N/A"
+
+        intervention_names = ", ".join(
+            i.get("name", "")
+            for i in arms_module.get("interventions", [])
+            if i.get("name")
+        ) or "N/A"
+
+        collaborator_names = ", ".join(
+            c.get("name", "")
+            for c in sponsor_module.get("collaborators", [])
+            if c.get("name")
+        ) or "N/A"
+
+        country_count = len({
+            loc.get("country") for loc in locations if loc.get("country")
+        })
+
+        return {
+            "NCT ID":            identification.get("nctId"),
+            "Title":             identification.get("briefTitle", "Untitled Trial"),
+            "Conditions":        ", ".join(conditions_module.get("conditions", [])) or "N/A",
+            "Study Type":        design_module.get("studyType", "N/A"),
+            "Phase":             ", ".join(design_module.get("phases", [])) or "N/A",
+            "Status":            status_module.get("overallStatus", "Unknown"),
+            "Start Date":        status_module.get("startDateStruct", {}).get("date"),
+            "Completion Date":   status_module.get("completionDateStruct", {}).get("date"),
+            "Enrollment":        enrollment_module.get("enrollmentInfo", {}).get("count"),
+            "Enrollment Type":   enrollment_module.get("enrollmentInfo", {}).get("type", "N/A"),
+            "Allocation":        design_module.get("designInfo", {}).get("allocation", "N/A"),
+            "Intervention Model": design_module.get("designInfo", {}).get("interventionModel", "N/A"),
+            "Masking":           design_module.get("designInfo", {}).get("maskingInfo", {}).get("masking", "N/A"),
+            "Primary Purpose":   design_module.get("designInfo", {}).get("primaryPurpose", "N/A"),
+            "Intervention Types": interventions,
+            "Interventions":     intervention_names,
+            "Sponsor":           sponsor_module.get("leadSponsor", {}).get("name", "Unknown Sponsor"),
+            "Collaborators":     collaborator_names,
+            "Sex":               eligibility_module.get("sex", "N/A"),
+            "Minimum Age":       eligibility_module.get("minimumAge", "N/A"),
+            "Maximum Age":       eligibility_module.get("maximumAge", "N/A"),
+            "Healthy Volunteers": eligibility_module.get("healthyVolunteers", "N/A"),
+            "Primary Outcome":   primary_outcomes,
+            "Primary Outcome Count": len(outcomes_module.get("primaryOutcomes", [])),
+            "Arms Count":        len(arms_module.get("armGroups", [])),
+            "Location Count":    len(locations),
+            "Country Count":     country_count,
+            "Locations":         locations,
+        }
+    except Exception:
         return None
 
 
-def parse_trials_to_df(api_response) -> pd.DataFrame:
-    trials: list[dict] = []
+def _as_pages(api_response) -> Iterable[dict]:
+    """Accept a single response dict or any iterable of response pages."""
+    if api_response is None:
+        return []
+    if isinstance(api_response, dict):
+        return [api_response]
+    return api_response
 
-    for study in api_response.get("studies", []):
-        try:
-            protocol_section = study.get("protocolSection", {})
-
-            identification   = protocol_section.get("identificationModule", {})
-            status_module    = protocol_section.get("statusModule", {})
-            design_module    = protocol_section.get("designModule", {})
-            sponsor_module   = protocol_section.get("sponsorCollaboratorsModule", {})
-            outcomes_module  = protocol_section.get("outcomesModule", {})
-            conditions_module = protocol_section.get("conditionsModule", {})
-            contacts_module  = protocol_section.get("contactsLocationsModule", {})
-            arms_module      = protocol_section.get("armsInterventionsModule", {})
-            eligibility_module = protocol_section.get("eligibilityModule", {})
-            enrollment_module = protocol_section.get("designModule", {})
-
-            raw_locations = contacts_module.get("locations", [])
-            locations = [
-                {
-                    "city": loc.get("city"),
-                    "country": loc.get("country"),
-                    "facility": loc.get("facility"),
-                    "lat": loc.get("geoPoint", {}).get("lat"),
-                    "lon": loc.get("geoPoint", {}).get("lon"),
-                }
-                for loc in raw_locations
-            ]
-
-            primary_outcomes = ", ".join(
-                o.get("measure", "")
-                for o in outcomes_module.get("primaryOutcomes", [])
-                if o.get("measure")
-            ) or "N/A"
-
-            interventions = ", ".join(
-                i.get("type", "")
-                for i in arms_module.get("interventions", [])
-                if i.get("type")
-            ) or "N/A"
-
-            intervention_names = ", ".join(
-                i.get("name", "")
-                for i in arms_module.get("interventions", [])
-                if i.get("name")
-            ) or "N/A"
-
-            collaborator_names = ", ".join(
-                c.get("name", "")
-                for c in sponsor_module.get("collaborators", [])
-                if c.get("name")
-            ) or "N/A"
-
-            country_count = len({
-                loc.get("country") for loc in locations if loc.get("country")
-            })
-
-            trials.append({
-                "NCT ID":            identification.get("nctId"),
-                "Title":             identification.get("briefTitle", "Untitled Trial"),
-                "Conditions":        ", ".join(conditions_module.get("conditions", [])) or "N/A",
-                "Study Type":        design_module.get("studyType", "N/A"),
-                "Phase":             ", ".join(design_module.get("phases", [])) or "N/A",
-                "Status":            status_module.get("overallStatus", "Unknown"),
-                "Start Date":        status_module.get("startDateStruct", {}).get("date"),
-                "Completion Date":   status_module.get("completionDateStruct", {}).get("date"),
-                "Enrollment":        enrollment_module.get("enrollmentInfo", {}).get("count"),
-                "Enrollment Type":   enrollment_module.get("enrollmentInfo", {}).get("type", "N/A"),
-                "Allocation":        design_module.get("designInfo", {}).get("allocation", "N/A"),
-                "Intervention Model": design_module.get("designInfo", {}).get("interventionModel", "N/A"),
-                "Masking":           design_module.get("designInfo", {}).get("maskingInfo", {}).get("masking", "N/A"),
-                "Primary Purpose":   design_module.get("designInfo", {}).get("primaryPurpose", "N/A"),
-                "Intervention Types": interventions,
-                "Interventions":     intervention_names,
-                "Sponsor":           sponsor_module.get("leadSponsor", {}).get("name", "Unknown Sponsor"),
-                "Collaborators":     collaborator_names,
-                "Sex":               eligibility_module.get("sex", "N/A"),
-                "Minimum Age":       eligibility_module.get("minimumAge", "N/A"),
-                "Maximum Age":       eligibility_module.get("maximumAge", "N/A"),
-                "Healthy Volunteers": eligibility_module.get("healthyVolunteers", "N/A"),
-                "Primary Outcome":   primary_outcomes,
-                "Primary Outcome Count": len(outcomes_module.get("primaryOutcomes", [])),
-                "Arms Count":        len(arms_module.get("armGroups", [])),
-                "Location Count":    len(locations),
-                "Country Count":     country_count,
-                "Locations":         locations,
-            })
-        except Exception:
+
+def _canonical_enum(value, default: str) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return default
+    return " ".join(str(value).split()) or default
+
+
+def categorize_enum_columns(trials_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store the ENUM_COLUMNS as categoricals of canonical values, in place.
+
+    Whitespace is collapsed and missing values get the column's fill, so the
+    columns never hold NaN and each distinct value is normalized only once.
+    """
+    for column, default in ENUM_COLUMNS.items():
+        if column not in trials_df.columns:
             continue
+        codes, uniques = pd.factorize(trials_df[column].astype(object))
+        canonical = np.array([_canonical_enum(value, default) for value in uniques] + [default], dtype=object)
+        trials_df[column] = pd.Categorical(canonical[codes])
+    return trials_df
+
+
+@lru_cache(maxsize=256)
+def _normalized_categories(categories: tuple, normalize: Callable) -> np.ndarray:
+    return np.array([normalize(value) for value in categories] + [normalize(None)], dtype=object)
+
+
+def enum_codes(series: pd.Series, normalize: Callable = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (codes, normalized values) of an enum column: ``values[codes]`` is the
+    column with ``normalize`` (default _norm) applied to every row.
+
+    For categoricals the normalized categories are memoized, so comparisons
+    reduce to integer-code lookups; other columns are factorized first.
+    """
+    normalize = normalize or _norm
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        categories = tuple(series.cat.categories)
+    else:
+        codes, uniques = pd.factorize(series.astype(object))
+        categories = tuple(uniques)
+    values = _normalized_categories(categories, normalize)
+    # NaN rows (code -1) map to normalize(None), stored last.
+    return np.where(codes < 0, len(categories), codes), values
+
+
+def enum_value_counts(series: pd.Series, fill: str) -> pd.Series:
+    """
+    Row counts per value of an enum column, most frequent first, with missing
+    values counted as ``fill``.
+
+    Only values present in ``series`` are listed: a filtered categorical still
+    carries every category of the full cohort, and value_counts would report
+    the unused ones as zero.
+    """
+    return series.astype(object).fillna(fill).value_counts()
+
+
+def iter_trial_frames(api_response) -> Iterator[pd.DataFrame]:
+    """
+    Parse response pages one at a time, yielding a DataFrame per page.
+
+    Each page's raw JSON can be garbage-collected as soon as its rows are
+    built, and callers can render the first rows before the last page lands.
+    Every page carries the typed date columns (add_date_columns).  Combine
+    the pages with concat_trial_frames to keep the enum categoricals.
+    """
+    for page in _as_pages(api_response):
+        rows = [row for row in map(_parse_study, page.get("studies", [])) if row is not None]
+        if rows:
+            yield add_date_columns(categorize_enum_columns(pd.DataFrame(rows)))
+
+
+def concat_trial_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate per-page frames; enum columns stay categorical across pages."""
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    return categorize_enum_columns(pd.concat(frames, ignore_index=True))
+
+
+def parse_registry_dates(values) -> pd.Series:
+    """
+    Registry date strings as datetime64 values, NaT where unparseable.
+
+    CT.gov dates are "YYYY-MM-DD", "YYYY-MM" or "YYYY".  Partial dates resolve
+    to the first day of the month (or year) regardless of which format comes
+    first, instead of following the format pandas infers from the first value;
+    anything else gets a per-value parse.
+    """
+    raw = values.astype(object) if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    parsed = pd.to_datetime(raw, errors="coerce", format="ISO8601")
+    retry = parsed.isna() & raw.notna()
+    if retry.any():
+        parsed = parsed.astype(object)
+        for index in np.flatnonzero(retry.to_numpy()):
+            try:
+                parsed.iat[index] = pd.to_datetime(raw.iat[index], errors="coerce")
+            except Exception:
+                parsed.iat[index] = pd.NaT
+        parsed = pd.to_datetime(parsed, errors="coerce")
+    return parsed
+
+
+def add_date_columns(trials_df: pd.DataFrame) -> pd.DataFrame:
+    """Add the typed DATE_COLUMNS and DURATION_COLUMN where missing, in place."""
+    for column, typed in DATE_COLUMNS.items():
+        trials_df[typed] = trial_dates(trials_df, column)
+    trials_df[DURATION_COLUMN] = trial_duration_months(trials_df)
+    return trials_df
+
+
+def trial_dates(trials_df: pd.DataFrame, column: str = "Start Date") -> pd.Series:
+    """Typed dates of a registry date column, parsed here for frames without them."""
+    typed = DATE_COLUMNS[column]
+    if typed in trials_df.columns:
+        return trials_df[typed]
+    if column not in trials_df.columns:
+        return pd.Series(pd.NaT, index=trials_df.index, dtype="datetime64[ns]")
+    return parse_registry_dates(trials_df[column])
+
+
+def trial_duration_months(trials_df: pd.DataFrame) -> pd.Series:
+    """Completion − start in 30-day months per trial; NaN where either date is missing."""
+    if DURATION_COLUMN in trials_df.columns:
+        return trials_df[DURATION_COLUMN]
+    return (trial_dates(trials_df, "Completion Date") - trial_dates(trials_df, "Start Date")).dt.days / 30
+
+
+def parse_trials_to_df(api_response) -> pd.DataFrame:
+    """Parse a response dict or an iterable of pages (e.g. ``iter_trial_pages``)."""
+    return concat_trial_frames(list(iter_trial_frames(api_response)))
+
+
+def cohort_fingerprint(trials_df: pd.DataFrame, columns: list[str] | None = None) -> str:
+    """
+    Content hash of a cohort, optionally restricted to ``columns``.
+
+    Two frames with the same values in the same row order share a fingerprint
+    regardless of their index, so derived data can be memoized against it.
+    """
+    if trials_df is None or trials_df.empty:
+        return "empty"
+    if columns is not None:
+        trials_df = trials_df[[c for c in columns if c in trials_df.columns]]
+    hashed = pd.util.hash_pandas_object(trials_df.astype({
+        c: str for c in trials_df.columns if trials_df[c].dtype == object
+    }), index=False)
+    digest = hashlib.sha1(hashed.to_numpy().tobytes())
+    digest.update("|".join(map(str, trials_df.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_trials_snapshot(
+    condition: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_studies: int | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame | None:
+    """
+    Parsed cohort for a condition from its parquet snapshot, if one is current.
+
+    A snapshot is current when the registry cache entry it was built from is
+    still fresh and has not been refreshed since.  Returns None otherwise.
+    """
+    cache = get_registry_cache()
+    if not cache.enabled:
+        return None
+    key = registry_cache_key(condition, page_size, max_studies)
+    entry = cache.lookup(key)
+    if not cache.is_fresh(entry):
+        return None
+    trials_df = load_cohort_snapshot(key, entry.fetched_at, columns=columns)
+    if trials_df is not None and columns is None:
+        if DURATION_COLUMN not in trials_df.columns:
+            add_date_columns(trials_df)   # snapshot written before the typed columns
+        features = load_snapshot_features(key, entry.fetched_at)
+        if features is not None and len(features) == len(trials_df):
+            from trial_design_explorer.services.similarity_service import register_trial_features
+
+            register_trial_features(trials_df, features)
+    return trials_df
+
+
+def save_trials_snapshot(
+    condition: str,
+    trials_df: pd.DataFrame,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_studies: int | None = None,
+) -> None:
+    """
+    Snapshot a cohort parsed from ``iter_trial_pages`` against its cache entry.
+
+    The trial-side similarity features are computed here, at ingest, and stored
+    with the snapshot so later comparisons only do protocol-side work.
+    """
+    from trial_design_explorer.services.similarity_service import get_trial_features
+
+    features = get_trial_features(trials_df) if not trials_df.empty else None
+    cache = get_registry_cache()
+    if not cache.enabled:
+        return
+    key = registry_cache_key(condition, page_size, max_studies)
+    entry = cache.lookup(key)
+    if entry is not None:
+        save_cohort_snapshot(key, entry.fetched_at, trials_df, features=features)
+
+
+def load_trials_df(
+    condition: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_studies: int | None = None,
+    refresh: str = "auto",
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Parsed cohort for a condition: snapshot read when current, else fetch + parse.
+
+    A freshly parsed cohort is snapshotted so the next open is a columnar read.
+    Raises RegistryFetchError rather than returning (or snapshotting) a cohort
+    from a pull that broke off part-way.
+    """
+    if refresh == "auto":
+        snapshot = load_trials_snapshot(condition, page_size, max_studies, columns=columns)
+        if snapshot is not None:
+            return snapshot
+    trials_df = parse_trials_to_df(
+        iter_trial_pages(condition, page_size=page_size, max_studies=max_studies, refresh=refresh)
+    )
+    save_trials_snapshot(condition, trials_df, page_size, max_studies)
+    if columns is not None and not trials_df.empty:
+        return trials_df[[c for c in columns if c in trials_df.columns]]
+    return trials_df
+
+
+def expand_condition_queries(condition: str, max_queries: int = FEDERATED_SEARCH_MAX_QUERIES) -> list[str]:
+    """
+    The condition itself plus synonym / related registry queries, deduplicated.
+
+    Related queries are the curated CONDITION_SYNONYMS entries and every
+    narrower COMMON_CONDITIONS entry containing the condition as whole words
+    (e.g. "Stroke" → "Ischemic Stroke", "Hemorrhagic Stroke").
+    """
+    base = normalize_condition(condition)
+    if not base:
+        return []
+    queries = [condition.strip()]
+    queries.extend(CONDITION_SYNONYMS.get(base, []))
+    pattern = re.compile(rf"\b{re.escape(base)}\b")
+    queries.extend(
+        c for c in COMMON_CONDITIONS
+        if normalize_condition(c) != base and pattern.search(normalize_condition(c))
+    )
+
+    seen: set[str] = set()
+    expanded = []
+    for query in queries:
+        key = normalize_condition(query)
+        if key not in seen:
+            seen.add(key)
+            expanded.append(query)
+    return expanded[:max_queries]
 
-    return pd.DataFrame(trials)
+
+def load_federated_trials_df(
+    queries: list[str],
+    max_workers: int = FEDERATED_SEARCH_WORKERS,
+    refresh: str = "auto",
+) -> pd.DataFrame:
+    """
+    Fetch several condition queries concurrently and merge them into one pool.
+
+    Each query goes through ``load_trials_df`` (registry cache and snapshot
+    included) on a bounded thread pool, so at most ``max_workers`` registry
+    connections are open at once.  Trials are de-duplicated by NCT ID, keeping
+    the first occurrence in query order, so the pool is deterministic.
+    """
+    if not queries:
+        return pd.DataFrame()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as pool:
+        frames = list(pool.map(lambda q: load_trials_df(q, refresh=refresh), queries))
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    merged = pd.concat(frames, ignore_index=True)
+    return merged.drop_duplicates(subset="NCT ID", keep="first").reset_index(drop=True)
 
 
 def median_trial_duration_months(trials_df: pd.DataFrame) -> int | None:
     if trials_df.empty:
         return None
-    start = pd.to_datetime(trials_df["Start Date"], errors="coerce")
-    end   = pd.to_datetime(trials_df["Completion Date"], errors="coerce")
-    months = ((end - start).dt.days / 30).dropna()
+    months = trial_duration_months(trials_df).dropna()
     return int(months.median()) if not months.empty else None
 
 
@@ -273,19 +790,21 @@ def _phase_score(protocol_phase: str, trial_phase: str) -> float:
     return 0.0
 
 
+def _text_tokens(text, stop: set) -> set:
+    """Lower-cased word tokens longer than two characters, minus stop-words."""
+    if isinstance(text, list):
+        text = " ".join(str(t) for t in text)
+    cleaned = re.sub(r"[^a-z0-9/\-]", " ", str(text).lower())
+    return {tok for tok in cleaned.split() if len(tok) > 2 and tok not in stop}
+
+
 def _jaccard_score(text_a, text_b, stop: set) -> float:
     """
     Token Jaccard similarity with thresholded output:
       ≥ 0.30 → 1.0,  0.10–0.30 → 0.5,  < 0.10 → 0.0
     """
-    def _tokens(text) -> set:
-        if isinstance(text, list):
-            text = " ".join(str(t) for t in text)
-        cleaned = re.sub(r"[^a-z0-9/\-]", " ", str(text).lower())
-        return {tok for tok in cleaned.split() if len(tok) > 2 and tok not in stop}
-
-    a = _tokens(text_a)
-    b = _tokens(text_b)
+    a = _text_tokens(text_a, stop)
+    b = _text_tokens(text_b, stop)
     if not a or not b:
         return 0.5
     j = len(a & b) / len(a | b)
@@ -536,6 +1055,27 @@ _ACTIVE_COMP_TERMS  = {
 }
 
 
+def _protocol_comparator_flags(protocol_meta) -> tuple[bool, bool, bool] | None:
+    """(single-arm, placebo, active comparator) for a protocol; None if unspecified."""
+    p_comp  = _norm(getattr(protocol_meta, "comparator", None))
+    p_arms  = _norm(getattr(protocol_meta, "arms_count", None))
+
+    if not p_comp and not p_arms:
+        return None
+
+    is_single_arm = any(k in p_comp for k in _NO_COMPARATOR_TERMS) if p_comp else False
+    has_placebo   = any(k in p_comp for k in _PLACEBO_TERMS)        if p_comp else False
+    has_active    = any(k in p_comp for k in _ACTIVE_COMP_TERMS)    if p_comp else False
+
+    if p_arms and p_arms.isdigit():
+        if int(p_arms) == 1:
+            is_single_arm = True
+        elif int(p_arms) >= 2:
+            is_single_arm = False
+
+    return is_single_arm, has_placebo, has_active
+
+
 def _comparator_structure_score(protocol_meta, trial_row: dict) -> float:
     """
     Control arm structure: single-arm vs placebo vs active comparator.
@@ -546,26 +1086,16 @@ def _comparator_structure_score(protocol_meta, trial_row: dict) -> float:
 
     Arms count from CT.gov is used as a proxy when comparator text is absent.
     """
-    p_comp  = _norm(getattr(protocol_meta, "comparator", None))
-    p_arms  = _norm(getattr(protocol_meta, "arms_count", None))
     t_arms  = trial_row.get("Arms Count") or 0
     try:
         t_arms = int(t_arms)
     except (ValueError, TypeError):
         t_arms = 0
 
-    if not p_comp and not p_arms:
+    flags = _protocol_comparator_flags(protocol_meta)
+    if flags is None:
         return 0.5
-
-    is_single_arm = any(k in p_comp for k in _NO_COMPARATOR_TERMS) if p_comp else False
-    has_placebo   = any(k in p_comp for k in _PLACEBO_TERMS)        if p_comp else False
-    has_active    = any(k in p_comp for k in _ACTIVE_COMP_TERMS)    if p_comp else False
-
-    if p_arms and p_arms.isdigit():
-        if int(p_arms) == 1:
-            is_single_arm = True
-        elif int(p_arms) >= 2:
-            is_single_arm = False
+    is_single_arm, has_placebo, has_active = flags
 
     if t_arms == 0:
         return 0.5   # Unknown trial arm count — neutral
@@ -595,8 +1125,8 @@ def _score_intervention_domain(protocol_meta, trial_row: dict) -> float:
 
 # ── Domain 5: Duration & Follow-up ────────────────────────────────────────────
 
-def _parse_duration_months(start: str | None, end: str | None) -> float | None:
-    """Return duration in months between two date strings; None if unparseable."""
+def _parse_duration_months(start, end) -> float | None:
+    """Return duration in months between two dates (strings or timestamps); None if unparseable."""
     try:
         s = pd.to_datetime(start, errors="coerce")
         e = pd.to_datetime(end,   errors="coerce")
@@ -632,8 +1162,8 @@ def _score_duration_domain(protocol_meta, trial_row: dict) -> float:
         getattr(protocol_meta, "completion_date", None),
     )
     trial_months = _parse_duration_months(
-        trial_row.get("Start Date"),
-        trial_row.get("Completion Date"),
+        trial_row.get(DATE_COLUMNS["Start Date"], trial_row.get("Start Date")),
+        trial_row.get(DATE_COLUMNS["Completion Date"], trial_row.get("Completion Date")),
     )
 
     if proto_months is None or trial_months is None:
@@ -710,6 +1240,7 @@ def build_design_similar_cohort(
     trials_df: pd.DataFrame,
     min_similarity: float = _MIN_SIMILARITY,
     min_cohort_size: int = _MIN_COHORT_SIZE,
+    top_k: int | None = None,
 ) -> pd.DataFrame:
     """
     Filter and rank a condition-matched trial DataFrame by design similarity.
@@ -719,6 +1250,12 @@ def build_design_similar_cohort(
 
     Trials with score ≥ min_similarity are kept. If fewer than min_cohort_size
     pass the threshold, the threshold is relaxed to always return a useful cohort.
+    With ``top_k`` only the k best-ranked trials of that cohort are returned.
+    Ties are ranked in input order.
+
+    Trials whose score upper bound (from the design, phase, comparator, age
+    and duration dimensions) cannot make the cut are never text-matched, so
+    large pools and small ``top_k`` values are cheap.
 
     Adds columns:
       design_similarity_score   — overall 0–1 score
@@ -732,29 +1269,24 @@ def build_design_similar_cohort(
     if trials_df is None or trials_df.empty:
         return trials_df if trials_df is not None else pd.DataFrame()
 
-    records = trials_df.to_dict("records")
-    breakdowns = [score_domain_breakdown(protocol_meta, row) for row in records]
-    scores = [
-        round(sum(_DOMAIN_WEIGHTS[d] * s for d, s in bd.items()) / _MAX_DOMAIN_WEIGHT, 4)
-        for bd in breakdowns
-    ]
+    # Batch scorer with early exit: trial-side features are derived once and
+    # only trials that can still make the cut are text-matched.
+    from trial_design_explorer.services.similarity_service import select_similar_trials
+
+    positions, domain_scores = select_similar_trials(
+        protocol_meta, trials_df, min_similarity, min_cohort_size, top_k=top_k,
+    )
+    scores = domain_scores["design_similarity_score"].tolist()
 
-    result = trials_df.copy()
+    result = trials_df.iloc[positions].reset_index(drop=True)
     result["design_similarity_score"] = scores
     result["similarity_class"]  = [classify_similarity(s) for s in scores]
-    result["sim_population"]    = [bd["population"]   for bd in breakdowns]
-    result["sim_design"]        = [bd["design"]        for bd in breakdowns]
-    result["sim_endpoints"]     = [bd["endpoints"]     for bd in breakdowns]
-    result["sim_intervention"]  = [bd["intervention"]  for bd in breakdowns]
-    result["sim_duration"]      = [bd["duration"]      for bd in breakdowns]
-
-    result = result.sort_values("design_similarity_score", ascending=False)
-
-    filtered = result[result["design_similarity_score"] >= min_similarity]
-    if len(filtered) < min_cohort_size:
-        filtered = result.head(max(min_cohort_size, len(result)))
-
-    return filtered.reset_index(drop=True)
+    result["sim_population"]    = domain_scores["sim_population"].to_numpy()
+    result["sim_design"]        = domain_scores["sim_design"].to_numpy()
+    result["sim_endpoints"]     = domain_scores["sim_endpoints"].to_numpy()
+    result["sim_intervention"]  = domain_scores["sim_intervention"].to_numpy()
+    result["sim_duration"]      = domain_scores["sim_duration"].to_numpy()
+    return result
 
 
 def cohort_selection_summary(
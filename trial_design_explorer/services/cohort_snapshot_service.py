@@ -0,0 +1,302 @@
+"""
+Cohort snapshot service — columnar parquet snapshots of parsed trial cohorts.
+
+Each snapshot is a directory under CACHE_DIR/snapshots holding three files:
+
+trials.parquet     the wide trial table produced by parse_trials_to_df,
+                   minus the nested Locations column
+locations.parquet  one row per site, keyed by NCT ID, with the site's
+                   position inside the trial's Locations list
+features.parquet   trial-side similarity features (similarity_service), row-
+                   aligned with trials.parquet; optional
+
+Each snapshot records the registry cache key and the fetch time of the cache
+entry it was built from, so it is only reused while that entry is unchanged.
+Files are read through memory maps and callers can ask for a subset of
+columns.  save_trials_frame / load_trials_frame write the same trial + site
+layout into an arbitrary directory (used by the project store), and
+site_aggregates summarises the site table per trial.  If pyarrow is not
+installed, every read/write function here is a no-op that returns None.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trial_design_explorer.config import CACHE_DIR
+
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
+
+_TRIALS_FILE = "trials.parquet"
+_LOCATIONS_FILE = "locations.parquet"
+_FEATURES_FILE = "features.parquet"
+_KEY_META = b"tde.registry_key"
+_FETCHED_META = b"tde.fetched_at"
+_MIXED_META = b"tde.json_columns"
+
+LOCATION_FIELDS = ["city", "country", "facility", "lat", "lon"]
+
+
+def _snapshot_path(key: str) -> Path:
+    return SNAPSHOT_DIR / hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+def _arrow_safe(trials_df: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
+    """
+    JSON-encode object columns that mix value types (e.g. bool and "N/A").
+
+    Returns the frame to write and the encoded column names, which are stored
+    in the schema metadata so _decode_mixed restores the original values.
+    """
+    safe = trials_df.copy()
+    encoded = []
+    for column in safe.columns:
+        if safe[column].dtype != object:
+            continue
+        kinds = {type(value) for value in safe[column].dropna()}
+        if len(kinds) > 1:
+            safe[column] = safe[column].map(lambda value: None if pd.isna(value) else json.dumps(value))
+            encoded.append(column)
+    return safe, encoded
+
+
+def _wide_table(pa, trials_df: pd.DataFrame, metadata: dict | None = None):
+    """The wide trial table (minus Locations) as an Arrow table, mixed columns encoded."""
+    wide, encoded = _arrow_safe(trials_df.drop(columns=["Locations"], errors="ignore"))
+    table = pa.Table.from_pandas(wide, preserve_index=False)
+    return table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        **(metadata or {}),
+        _MIXED_META: json.dumps(encoded).encode("utf-8"),
+    })
+
+
+def _decode_mixed(table) -> pd.DataFrame:
+    """Arrow trial table to pandas, restoring the columns _arrow_safe encoded."""
+    trials_df = table.to_pandas()
+    encoded = json.loads((table.schema.metadata or {}).get(_MIXED_META, b"[]"))
+    for column in encoded:
+        if column in trials_df.columns:
+            trials_df[column] = pd.Series(
+                [None if value is None else json.loads(value) for value in trials_df[column].astype(object)],
+                index=trials_df.index,
+                dtype=object,
+            )
+    return trials_df
+
+
+def locations_table(trials_df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize the nested Locations column into one row per site."""
+    if trials_df.empty or "Locations" not in trials_df.columns:
+        return pd.DataFrame(columns=["NCT ID", "Site Index", *LOCATION_FIELDS])
+    exploded = trials_df[["NCT ID", "Locations"]].explode("Locations", ignore_index=True)
+    exploded = exploded[exploded["Locations"].map(lambda loc: isinstance(loc, dict))]
+    sites = pd.DataFrame(exploded["Locations"].tolist(), columns=LOCATION_FIELDS)
+    sites.insert(0, "Site Index", exploded.groupby("NCT ID", sort=False).cumcount().to_numpy())
+    sites.insert(0, "NCT ID", exploded["NCT ID"].to_numpy())
+    sites["lat"] = pd.to_numeric(sites["lat"], errors="coerce")
+    sites["lon"] = pd.to_numeric(sites["lon"], errors="coerce")
+    return sites
+
+
+def _joined_unique(sites: pd.DataFrame, field: str) -> pd.Series:
+    values = sites[["NCT ID", field]].dropna()
+    values = values[values[field].astype(str) != ""].drop_duplicates().sort_values(["NCT ID", field])
+    # Slice each trial's run out of the sorted values instead of a per-group agg.
+    trial_ids = values["NCT ID"].to_numpy()
+    texts = values[field].astype(str).tolist()
+    starts = np.flatnonzero(np.r_[True, trial_ids[1:] != trial_ids[:-1]]) if len(trial_ids) else np.array([], dtype=int)
+    ends = np.r_[starts[1:], len(texts)]
+    return pd.Series(
+        [", ".join(texts[start:end]) for start, end in zip(starts, ends)],
+        index=pd.Index(trial_ids[starts], name="NCT ID"),
+        dtype=object,
+    )
+
+
+def site_aggregates(sites: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-trial aggregates of a locations_table frame, indexed by NCT ID (sorted).
+
+    Countries and Cities are the trial's distinct non-empty values, sorted and
+    comma-joined; Location Count is the number of sites with a latitude.
+    """
+    counts = sites.groupby("NCT ID")["lat"].count()
+    return pd.DataFrame({
+        "Countries": _joined_unique(sites, "country").reindex(counts.index, fill_value=""),
+        "Cities": _joined_unique(sites, "city").reindex(counts.index, fill_value=""),
+        "Location Count": counts,
+    })
+
+
+def _nest_locations(trials_df: pd.DataFrame, sites: pd.DataFrame) -> pd.Series:
+    """Rebuild the list-of-dicts Locations column from the child table."""
+    records = sites[LOCATION_FIELDS].astype(object).where(sites[LOCATION_FIELDS].notna(), None)
+    grouped: dict[str, list[dict]] = {}
+    for nct_id, record in zip(sites["NCT ID"], records.to_dict("records")):
+        grouped.setdefault(nct_id, []).append(record)
+    return pd.Series(
+        [grouped.get(nct_id, []) for nct_id in trials_df["NCT ID"]],
+        index=trials_df.index,
+        dtype=object,
+    )
+
+
+def _is_current(pq, path: Path, key: str, fetched_at: float) -> bool:
+    metadata = pq.read_schema(path / _TRIALS_FILE, memory_map=True).metadata or {}
+    return (
+        metadata.get(_KEY_META) == key.encode("utf-8")
+        and float(metadata.get(_FETCHED_META, b"nan")) == fetched_at
+        and _MIXED_META in metadata   # older snapshots stringified mixed columns
+    )
+
+
+def save_cohort_snapshot(
+    key: str,
+    fetched_at: float,
+    trials_df: pd.DataFrame,
+    features: pd.DataFrame | None = None,
+) -> Path | None:
+    """Write a snapshot for a registry cache entry; returns its directory, or None."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+    if trials_df.empty or "NCT ID" not in trials_df.columns:
+        return None
+
+    target = _snapshot_path(key)
+    staging = target.with_name(target.name + ".tmp")
+    try:
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True, exist_ok=True)
+        metadata = {_KEY_META: key.encode("utf-8"), _FETCHED_META: repr(fetched_at).encode("ascii")}
+
+        pq.write_table(_wide_table(pa, trials_df, metadata), staging / _TRIALS_FILE)
+        pq.write_table(pa.Table.from_pandas(locations_table(trials_df), preserve_index=False),
+                       staging / _LOCATIONS_FILE)
+        if features is not None:
+            pq.write_table(pa.Table.from_pandas(features, preserve_index=False),
+                           staging / _FEATURES_FILE)
+
+        shutil.rmtree(target, ignore_errors=True)
+        staging.rename(target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        return None
+    return target
+
+
+def load_cohort_snapshot(
+    key: str,
+    fetched_at: float,
+    columns: list[str] | None = None,
+) -> pd.DataFrame | None:
+    """
+    Read a snapshot written for the same cache entry, or None if absent or stale.
+
+    ``columns`` limits the read to the named columns; Locations is rebuilt from
+    the child table only when requested (or when reading every column).
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+
+    path = _snapshot_path(key)
+    try:
+        if not _is_current(pq, path, key, fetched_at):
+            return None
+        schema = pq.read_schema(path / _TRIALS_FILE, memory_map=True)
+
+        want_locations = columns is None or "Locations" in columns
+        wide_columns = None
+        if columns is not None:
+            wide_columns = [c for c in columns if c != "Locations" and c in schema.names]
+            if want_locations and "NCT ID" not in wide_columns:
+                wide_columns.append("NCT ID")
+        trials_df = _decode_mixed(pq.read_table(path / _TRIALS_FILE, columns=wide_columns, memory_map=True))
+        if want_locations:
+            sites = pq.read_table(path / _LOCATIONS_FILE, memory_map=True).to_pandas()
+            trials_df["Locations"] = _nest_locations(trials_df, sites)
+    except Exception:
+        return None
+
+    if columns is not None:
+        return trials_df[[c for c in columns if c in trials_df.columns]]
+    return trials_df
+
+
+def load_snapshot_locations(key: str, fetched_at: float, columns: list[str] | None = None) -> pd.DataFrame | None:
+    """Read only the site child table of a matching snapshot."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+
+    path = _snapshot_path(key)
+    try:
+        if not _is_current(pq, path, key, fetched_at):
+            return None
+        return pq.read_table(path / _LOCATIONS_FILE, columns=columns, memory_map=True).to_pandas()
+    except Exception:
+        return None
+
+
+def load_snapshot_features(key: str, fetched_at: float) -> pd.DataFrame | None:
+    """Read the stored trial features of a matching snapshot, row-aligned with its trials."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+
+    path = _snapshot_path(key)
+    try:
+        if not _is_current(pq, path, key, fetched_at):
+            return None
+        features = pq.read_table(path / _FEATURES_FILE, memory_map=True).to_pandas()
+    except Exception:
+        return None
+    # Arrow list columns come back as arrays; restore plain lists.
+    for column in features.columns:
+        if column.endswith("_tokens"):
+            features[column] = features[column].map(list)
+    return features
+
+
+def save_trials_frame(directory: Path, trials_df: pd.DataFrame) -> bool:
+    """Write a trial table (and its site child table) into ``directory``; False without pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return False
+    if "NCT ID" not in trials_df.columns:
+        return False
+    directory.mkdir(parents=True, exist_ok=True)
+    pq.write_table(_wide_table(pa, trials_df), directory / _TRIALS_FILE)
+    pq.write_table(pa.Table.from_pandas(locations_table(trials_df), preserve_index=False),
+                   directory / _LOCATIONS_FILE)
+    return True
+
+
+def load_trials_frame(directory: Path) -> pd.DataFrame | None:
+    """Read a trial table written by save_trials_frame, with Locations rebuilt."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+    try:
+        trials_df = _decode_mixed(pq.read_table(directory / _TRIALS_FILE, memory_map=True))
+        sites = pq.read_table(directory / _LOCATIONS_FILE, memory_map=True).to_pandas()
+    except Exception:
+        return None
+    trials_df["Locations"] = _nest_locations(trials_df, sites)
+    return trials_df
@@ -2,6 +2,7 @@ import re
 import textwrap
 from datetime import datetime, timezone
 
+import numpy as np
 import pandas as pd
 
 from trial_design_explorer.config import DEFAULT_CONDITION
@@ -16,6 +17,7 @@ from trial_design_explorer.domain import (
     ProtocolMetadata,
     RegistryTrialRef,
 )
+from trial_design_explorer.services.clinical_trials_service import enum_codes, trial_duration_months
 
 
 COMPLETED_STATUSES = {"COMPLETED"}
@@ -26,6 +28,11 @@ ACTIVE_STATUSES = {
     "ENROLLING_BY_INVITATION",
     "ACTIVE_NOT_RECRUITING",
 }
+STATUS_GROUPS = (
+    ("completed", COMPLETED_STATUSES),
+    ("disrupted", RISK_STATUSES),
+    ("active", ACTIVE_STATUSES),
+)
 
 ALIGNMENT_DOMAINS = [
     {"label": "Phase", "metric_key": "phase_alignment_pct", "column": "Phase", "attr": "phase"},
@@ -93,6 +100,9 @@ DOMAIN_CONTEXT = {
 
 PRIORITY_ORDER = {"High": 0, "Medium": 1, "Monitor": 2, "Preserve": 3}
 
+_NUMERIC_COLUMNS = ("enrollment", "duration", "site_count", "country_count")
+_QUANTILES = [0.25, 0.5, 0.75]
+
 
 def classify_sponsor_type(name: str | None) -> str:
     if not isinstance(name, str):
@@ -138,18 +148,6 @@ def _parse_int(value) -> int | None:
     return int(digits) if digits else None
 
 
-def _series_alignment_share(series: pd.Series, protocol_value: str | None) -> float | None:
-    if not protocol_value or series.empty:
-        return None
-
-    target = protocol_value.strip().lower()
-    normalized = series.fillna("").astype(str).str.lower()
-    matches = normalized.str.contains(target, regex=False)
-    if matches.empty:
-        return None
-    return round(matches.mean() * 100, 1)
-
-
 def _percentile_rank(series: pd.Series, protocol_value: int | None) -> float | None:
     if protocol_value is None or series.empty:
         return None
@@ -167,95 +165,184 @@ def _display_status(status: str) -> str:
     return status.replace("_", " ").title()
 
 
-def _alignment_series(frame: pd.DataFrame, domain: dict) -> pd.Series:
-    if frame is None or frame.empty:
-        return pd.Series(dtype=str)
-    if domain.get("mode") == "endpoint":
-        return frame["Primary Outcome"].fillna("").astype(str).apply(classify_endpoint_category)
-    return frame[domain["column"]].fillna("").astype(str)
+def _map_unique(series: pd.Series, func) -> pd.Series:
+    """Apply ``func`` once per distinct value rather than once per row."""
+    lookup = {value: func(value) for value in series.unique()}
+    return series.map(lookup)
 
 
-def _numeric_series(frame: pd.DataFrame, column: str) -> pd.Series:
-    if frame is None or frame.empty or column not in frame.columns:
-        return pd.Series(dtype=float)
-    return pd.to_numeric(frame[column], errors="coerce").dropna()
+def _status_group(status: str) -> str:
+    for group, statuses in STATUS_GROUPS:
+        if status in statuses:
+            return group
+    return "other"
 
 
-def _duration_series(frame: pd.DataFrame) -> pd.Series:
-    if frame is None or frame.empty:
-        return pd.Series(dtype=float)
-    start_dates = pd.to_datetime(frame["Start Date"], errors="coerce")
-    end_dates = pd.to_datetime(frame["Completion Date"], errors="coerce")
-    return ((end_dates - start_dates).dt.days / 30).dropna()
+def _distribution(series: pd.Series) -> dict:
+    if series.empty:
+        return {}
+    return series.value_counts(normalize=True).mul(100).round(1).to_dict()
 
 
-def _list_length_series(frame: pd.DataFrame, column: str) -> pd.Series:
-    if frame is None or frame.empty or column not in frame.columns:
-        return pd.Series(dtype=float)
-    return frame[column].apply(lambda value: len(value) if isinstance(value, list) else 0)
+def _domain_protocol_value(protocol_meta: ProtocolMetadata, domain: dict) -> str | None:
+    protocol_value = getattr(protocol_meta, domain["attr"], None)
+    if domain["attr"] == "endpoint_focus" and not protocol_value:
+        protocol_value = classify_endpoint_category(protocol_meta.primary_endpoints or protocol_meta.secondary_endpoints)
+    return protocol_value
 
 
-def _country_count_series(frame: pd.DataFrame) -> pd.Series:
-    if frame is None or frame.empty:
-        return pd.Series(dtype=float)
-    return frame["Locations"].apply(
-        lambda locs: len({loc.get("country") for loc in locs if isinstance(loc, dict) and loc.get("country")}) if isinstance(locs, list) else 0
-    )
+def _status_group_of(value) -> str:
+    return _status_group(_normalize_status(value))
 
 
-def _subset_by_status(trials_df: pd.DataFrame, allowed_statuses: set[str]) -> pd.DataFrame:
-    if trials_df is None or trials_df.empty:
-        return pd.DataFrame(columns=trials_df.columns if trials_df is not None else [])
-    normalized = trials_df["Status"].fillna("").astype(str).apply(_normalize_status)
-    return trials_df[normalized.isin(allowed_statuses)].copy()
+def _lower_text(value) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return str(value).lower()
 
 
-def _summarize_numeric_series(series: pd.Series) -> dict:
-    if series.empty:
-        return {"median": None, "p25": None, "p75": None}
-    return {
-        "median": round(float(series.median()), 1),
-        "p25": round(float(series.quantile(0.25)), 1),
-        "p75": round(float(series.quantile(0.75)), 1),
+def cohort_typed_columns(trials_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-trial typed columns the comparison statistics are computed from.
+
+    Row-aligned with ``trials_df``: normalized status and its status group,
+    numeric enrollment and duration (months), site and country counts, sponsor
+    type and endpoint category.  Status is normalized per category of the
+    enum column, not per row.
+    """
+    codes, statuses = enum_codes(trials_df["Status"], _normalize_status)
+    _, groups = enum_codes(trials_df["Status"], _status_group_of)
+    locations = trials_df["Locations"] if "Locations" in trials_df.columns else pd.Series([[]] * len(trials_df), index=trials_df.index)
+
+    columns = {
+        "status": statuses[codes],
+        "status_group": groups[codes],
+        "enrollment": pd.to_numeric(trials_df["Enrollment"], errors="coerce") if "Enrollment" in trials_df.columns
+        else pd.Series(float("nan"), index=trials_df.index),
+        "duration": trial_duration_months(trials_df),
+        "site_count": locations.map(lambda value: len(value) if isinstance(value, list) else 0),
+        "country_count": locations.map(
+            lambda locs: len({loc.get("country") for loc in locs if isinstance(loc, dict) and loc.get("country")})
+            if isinstance(locs, list) else 0
+        ),
+        "sponsor_type": _map_unique(trials_df["Sponsor"], classify_sponsor_type),
+        "endpoint_category": _map_unique(trials_df["Primary Outcome"].fillna("").astype(str), classify_endpoint_category),
     }
+    return pd.DataFrame(columns, index=trials_df.index)
 
 
-def _protocol_duration_months(protocol_meta: ProtocolMetadata) -> float | None:
-    start = pd.to_datetime(protocol_meta.start_date, errors="coerce")
-    end = pd.to_datetime(protocol_meta.completion_date, errors="coerce")
-    if pd.isna(start) or pd.isna(end):
-        return None
-    return round(float((end - start).days / 30), 1)
+def _domain_matches(trials_df: pd.DataFrame, typed: pd.DataFrame, domain: dict, protocol_value: str) -> np.ndarray:
+    """Rows whose domain value contains the protocol choice, via one test per category."""
+    series = typed["endpoint_category"] if domain.get("mode") == "endpoint" else trials_df[domain["column"]]
+    codes, texts = enum_codes(series, _lower_text)
+    target = protocol_value.strip().lower()
+    return np.array([target in text for text in texts], dtype=bool)[codes]
 
 
-def _build_domain_alignment_row(
-    protocol_meta: ProtocolMetadata,
-    domain: dict,
-    overall_df: pd.DataFrame,
-    completed_df: pd.DataFrame,
-    disrupted_df: pd.DataFrame,
-) -> dict:
-    protocol_value = getattr(protocol_meta, domain["attr"], None)
-    if domain["attr"] == "endpoint_focus" and not protocol_value:
-        protocol_value = classify_endpoint_category(protocol_meta.primary_endpoints or protocol_meta.secondary_endpoints)
+class CohortAggregates:
+    """
+    Status-sliced statistics for one protocol / cohort pair.
 
-    overall_share = _series_alignment_share(_alignment_series(overall_df, domain), protocol_value)
-    completed_share = _series_alignment_share(_alignment_series(completed_df, domain), protocol_value)
-    disrupted_share = _series_alignment_share(_alignment_series(disrupted_df, domain), protocol_value)
+    The typed columns are derived once, then every medians / quartiles /
+    alignment share per status group comes out of a single grouped pass.
+    Shared by build_protocol_comparison_metrics and build_comparison_result.
+    ``group`` arguments take "completed", "disrupted", "active", or None for
+    the whole cohort.
+    """
+
+    def __init__(self, protocol_meta: ProtocolMetadata, trials_df: pd.DataFrame):
+        self.trials_df = trials_df
+        self.columns = cohort_typed_columns(trials_df)
+        self.groups = self.columns["status_group"]
+        self.protocol_values = {
+            domain["label"]: _domain_protocol_value(protocol_meta, domain) for domain in ALIGNMENT_DOMAINS
+        }
+        self.matches = pd.DataFrame(
+            {
+                domain["label"]: _domain_matches(trials_df, self.columns, domain, self.protocol_values[domain["label"]])
+                for domain in ALIGNMENT_DOMAINS
+                if self.protocol_values[domain["label"]]
+            },
+            index=trials_df.index,
+        )
+
+        values = pd.concat([self.columns[list(_NUMERIC_COLUMNS)], self.matches.astype(float)], axis=1)
+        grouped = values.groupby(self.groups, sort=False)
+        self._sizes = self.groups.value_counts().to_dict()
+        self._sizes[None] = len(trials_df)
+        self._counts = {None: values.count(), **{g: row for g, row in grouped.count().iterrows()}}
+        self._means = {None: values.mean(), **{g: row for g, row in grouped.mean().iterrows()}}
+        overall_quantiles = values[list(_NUMERIC_COLUMNS)].quantile(_QUANTILES)
+        group_quantiles = grouped[list(_NUMERIC_COLUMNS)].quantile(_QUANTILES)
+        self._quantiles = {None: overall_quantiles}
+        for group in self._sizes:
+            if group is not None:
+                self._quantiles[group] = group_quantiles.xs(group, level=0)
+
+    def size(self, group: str | None = None) -> int:
+        return int(self._sizes.get(group, 0))
+
+    def share(self, group: str) -> float | None:
+        if not self.size():
+            return None
+        return round(float(self.size(group) / self.size() * 100), 1)
+
+    def numeric_summary(self, column: str, group: str | None = None) -> dict:
+        if not self.size(group) or not self._counts[group][column]:
+            return {"median": None, "p25": None, "p75": None}
+        quantiles = self._quantiles[group][column]
+        return {
+            "median": round(float(quantiles[0.5]), 1),
+            "p25": round(float(quantiles[0.25]), 1),
+            "p75": round(float(quantiles[0.75]), 1),
+        }
+
+    def alignment_share(self, label: str, group: str | None = None) -> float | None:
+        if label not in self.matches.columns or not self.size(group):
+            return None
+        return float(round(self._means[group][label] * 100, 1))
+
+    def values(self, column: str, group: str | None = None) -> pd.Series:
+        series = self.columns[column]
+        return series if group is None else series[self.groups == group]
+
+    def frame(self, group: str) -> pd.DataFrame:
+        return self.trials_df[self.groups == group]
+
+    def matching_frame(self, label: str, group: str) -> pd.DataFrame:
+        if label not in self.matches.columns:
+            return self.trials_df.iloc[0:0]
+        return self.trials_df[(self.groups == group) & self.matches[label]]
+
+
+def _build_domain_alignment_row(domain: dict, aggregates: CohortAggregates) -> dict:
+    label = domain["label"]
+    protocol_value = aggregates.protocol_values[label]
+    overall_share = aggregates.alignment_share(label)
+    completed_share = aggregates.alignment_share(label, "completed")
+    disrupted_share = aggregates.alignment_share(label, "disrupted")
     gap = round(float(completed_share - disrupted_share), 1) if completed_share is not None and disrupted_share is not None else None
 
     return {
-        "Domain": domain["label"],
+        "Domain": label,
         "Protocol Choice": protocol_value or "Not provided",
         "Overall Match (%)": overall_share,
         "Completed Match (%)": completed_share,
         "Disrupted Match (%)": disrupted_share,
         "Net Gap (%)": gap,
         "Signal": _precedent_signal(completed_share, disrupted_share, protocol_value),
-        "Why It Matters": DOMAIN_CONTEXT[domain["label"]]["why_it_matters"],
+        "Why It Matters": DOMAIN_CONTEXT[label]["why_it_matters"],
     }
 
 
+def _protocol_duration_months(protocol_meta: ProtocolMetadata) -> float | None:
+    start = pd.to_datetime(protocol_meta.start_date, errors="coerce")
+    end = pd.to_datetime(protocol_meta.completion_date, errors="coerce")
+    if pd.isna(start) or pd.isna(end):
+        return None
+    return round(float((end - start).days / 30), 1)
+
+
 def _average(values: list[float | None]) -> float | None:
     populated = [value for value in values if value is not None]
     if not populated:
@@ -263,19 +350,6 @@ def _average(values: list[float | None]) -> float | None:
     return round(float(sum(populated) / len(populated)), 1)
 
 
-def _status_distribution(status_series: pd.Series) -> dict:
-    if status_series.empty:
-        return {}
-    distribution = status_series.value_counts(normalize=True).mul(100).round(1).to_dict()
-    return {_display_status(status): float(share) for status, share in distribution.items()}
-
-
-def _share_of_statuses(status_series: pd.Series, statuses: set[str]) -> float | None:
-    if status_series.empty:
-        return None
-    return round(float(status_series.isin(statuses).mean() * 100), 1)
-
-
 def _evidence_strength(total_count: int, completed_count: int, disrupted_count: int) -> str:
     if total_count >= 100 and completed_count >= 25 and disrupted_count >= 8:
         return "Strong"
@@ -296,6 +370,11 @@ def _posture_label(completed_fit: float | None, disrupted_fit: float | None) ->
 
 
 def build_protocol_comparison_metrics(protocol_meta: ProtocolMetadata, trials_df: pd.DataFrame) -> dict:
+    aggregates = CohortAggregates(protocol_meta, trials_df) if trials_df is not None and not trials_df.empty else None
+    return _metrics_from_aggregates(protocol_meta, aggregates)
+
+
+def _metrics_from_aggregates(protocol_meta: ProtocolMetadata, aggregates: CohortAggregates | None) -> dict:
     metrics = {
         "condition": protocol_meta.condition or DEFAULT_CONDITION,
         "cohort_size": 0,
@@ -355,28 +434,20 @@ def build_protocol_comparison_metrics(protocol_meta: ProtocolMetadata, trials_df
         "missing_core_fields": [],
     }
 
-    if trials_df is None or trials_df.empty:
+    if aggregates is None:
         return metrics
 
-    normalized_statuses = trials_df["Status"].fillna("Unknown").astype(str).apply(_normalize_status)
-    completed_df = trials_df[normalized_statuses.isin(COMPLETED_STATUSES)].copy()
-    disrupted_df = trials_df[normalized_statuses.isin(RISK_STATUSES)].copy()
-    active_df = trials_df[normalized_statuses.isin(ACTIVE_STATUSES)].copy()
-
-    metrics["cohort_size"] = int(len(trials_df))
-    metrics["completed_cohort_size"] = int(len(completed_df))
-    metrics["disrupted_cohort_size"] = int(len(disrupted_df))
-    metrics["active_cohort_size"] = int(len(active_df))
+    metrics["cohort_size"] = aggregates.size()
+    metrics["completed_cohort_size"] = aggregates.size("completed")
+    metrics["disrupted_cohort_size"] = aggregates.size("disrupted")
+    metrics["active_cohort_size"] = aggregates.size("active")
     metrics["evidence_strength"] = _evidence_strength(
         metrics["cohort_size"],
         metrics["completed_cohort_size"],
         metrics["disrupted_cohort_size"],
     )
 
-    alignment_rows = [
-        _build_domain_alignment_row(protocol_meta, domain, trials_df, completed_df, disrupted_df)
-        for domain in ALIGNMENT_DOMAINS
-    ]
+    alignment_rows = [_build_domain_alignment_row(domain, aggregates) for domain in ALIGNMENT_DOMAINS]
     metrics["alignment_by_domain"] = alignment_rows
     for domain, row in zip(ALIGNMENT_DOMAINS, alignment_rows):
         metrics[domain["metric_key"]] = row["Overall Match (%)"]
@@ -400,59 +471,41 @@ def build_protocol_comparison_metrics(protocol_meta: ProtocolMetadata, trials_df
         row["Domain"] for row in alignment_rows if row["Protocol Choice"] in {"Not provided", "Unspecified"}
     ]
 
-    enrollments = _numeric_series(trials_df, "Enrollment")
-    completed_enrollments = _numeric_series(completed_df, "Enrollment")
-    disrupted_enrollments = _numeric_series(disrupted_df, "Enrollment")
-    for prefix, summary in (
-        ("", _summarize_numeric_series(enrollments)),
-        ("completed_", _summarize_numeric_series(completed_enrollments)),
-        ("disrupted_", _summarize_numeric_series(disrupted_enrollments)),
-    ):
+    for prefix, group in (("", None), ("completed_", "completed"), ("disrupted_", "disrupted")):
+        summary = aggregates.numeric_summary("enrollment", group)
         metrics[f"{prefix}enrollment_median"] = summary["median"]
         metrics[f"{prefix}enrollment_p25"] = summary["p25"]
         metrics[f"{prefix}enrollment_p75"] = summary["p75"]
-    metrics["enrollment_percentile"] = _percentile_rank(enrollments, metrics["enrollment_target"])
-
-    durations = _duration_series(trials_df)
-    completed_durations = _duration_series(completed_df)
-    disrupted_durations = _duration_series(disrupted_df)
-    for prefix, summary in (
-        ("", _summarize_numeric_series(durations)),
-        ("completed_", _summarize_numeric_series(completed_durations)),
-        ("disrupted_", _summarize_numeric_series(disrupted_durations)),
-    ):
+        summary = aggregates.numeric_summary("duration", group)
         metrics[f"{prefix}duration_median_months"] = summary["median"]
         metrics[f"{prefix}duration_p25_months"] = summary["p25"]
         metrics[f"{prefix}duration_p75_months"] = summary["p75"]
+    metrics["enrollment_percentile"] = _percentile_rank(
+        aggregates.values("enrollment").dropna(), metrics["enrollment_target"]
+    )
 
-    site_counts = _list_length_series(trials_df, "Locations")
-    if not site_counts.empty:
-        metrics["site_count_median"] = round(float(site_counts.median()), 1)
-
-    country_counts = _country_count_series(trials_df)
-    if not country_counts.empty:
-        metrics["country_count_median"] = round(float(country_counts.median()), 1)
+    metrics["site_count_median"] = aggregates.numeric_summary("site_count")["median"]
+    metrics["country_count_median"] = aggregates.numeric_summary("country_count")["median"]
 
-    metrics["status_distribution_raw"] = normalized_statuses.value_counts(normalize=True).mul(100).round(1).to_dict()
-    metrics["status_distribution"] = _status_distribution(normalized_statuses)
-    metrics["risk_status_share_pct"] = _share_of_statuses(normalized_statuses, RISK_STATUSES)
-    metrics["completed_share_pct"] = _share_of_statuses(normalized_statuses, COMPLETED_STATUSES)
+    status_distribution = _distribution(aggregates.values("status"))
+    metrics["status_distribution_raw"] = status_distribution
+    metrics["status_distribution"] = {
+        _display_status(status): float(share) for status, share in status_distribution.items()
+    }
+    metrics["risk_status_share_pct"] = aggregates.share("disrupted")
+    metrics["completed_share_pct"] = aggregates.share("completed")
     metrics["recruiting_share_pct"] = round(float(metrics["status_distribution"].get("Recruiting", 0.0)), 1)
-    metrics["active_share_pct"] = _share_of_statuses(normalized_statuses, ACTIVE_STATUSES)
+    metrics["active_share_pct"] = aggregates.share("active")
 
-    sponsor_types = trials_df["Sponsor"].apply(classify_sponsor_type)
-    sponsor_distribution = sponsor_types.value_counts(normalize=True).mul(100).round(1).to_dict()
+    sponsor_distribution = _distribution(aggregates.values("sponsor_type"))
     metrics["sponsor_type_distribution"] = sponsor_distribution
     metrics["industry_share_pct"] = round(float(sponsor_distribution.get("Industry", 0.0)), 1)
     metrics["academic_share_pct"] = round(float(sponsor_distribution.get("Academic", 0.0)), 1)
 
-    endpoint_categories = trials_df["Primary Outcome"].fillna("").astype(str).apply(classify_endpoint_category)
-    completed_endpoint_categories = completed_df["Primary Outcome"].fillna("").astype(str).apply(classify_endpoint_category)
-    disrupted_endpoint_categories = disrupted_df["Primary Outcome"].fillna("").astype(str).apply(classify_endpoint_category)
-    endpoint_distribution = endpoint_categories.value_counts(normalize=True).mul(100).round(1).to_dict()
+    endpoint_distribution = _distribution(aggregates.values("endpoint_category"))
     metrics["endpoint_category_distribution"] = endpoint_distribution
-    metrics["completed_endpoint_distribution"] = completed_endpoint_categories.value_counts(normalize=True).mul(100).round(1).to_dict()
-    metrics["disrupted_endpoint_distribution"] = disrupted_endpoint_categories.value_counts(normalize=True).mul(100).round(1).to_dict()
+    metrics["completed_endpoint_distribution"] = _distribution(aggregates.values("endpoint_category", "completed"))
+    metrics["disrupted_endpoint_distribution"] = _distribution(aggregates.values("endpoint_category", "disrupted"))
 
     protocol_endpoint_focus = metrics["protocol_endpoint_focus"]
     if protocol_endpoint_focus and protocol_endpoint_focus != "Unspecified":
@@ -844,10 +897,11 @@ def build_trial_exemplar_table(trials_df: pd.DataFrame, limit: int = 10) -> pd.D
     if trials_df is None or trials_df.empty:
         return pd.DataFrame(columns=["Comparator Lens", "Status", "NCT ID", "Title", "Phase", "Enrollment", "Sponsor"])
 
-    normalized = trials_df["Status"].fillna("").astype(str).apply(_normalize_status)
-    completed_df = trials_df[normalized.isin(COMPLETED_STATUSES)].copy()
-    disrupted_df = trials_df[normalized.isin(RISK_STATUSES)].copy()
-    active_df = trials_df[normalized.isin(ACTIVE_STATUSES)].copy()
+    codes, groups = enum_codes(trials_df["Status"], _status_group_of)
+    status_groups = groups[codes]
+    completed_df = trials_df[status_groups == "completed"].copy()
+    disrupted_df = trials_df[status_groups == "disrupted"].copy()
+    active_df = trials_df[status_groups == "active"].copy()
 
     selected_frames = []
     if not completed_df.empty:
@@ -1001,17 +1055,15 @@ def _numeric_position_signal(value, low, high, unit: str = "enrollment") -> str:
 
 
 def _trial_refs_for_domain(
-    frame: pd.DataFrame,
-    domain: dict,
-    protocol_value: str | None,
+    aggregates: CohortAggregates | None,
+    domain_label: str,
+    group: str,
     max_refs: int = 5,
 ) -> list[RegistryTrialRef]:
     """Extract RegistryTrialRef objects from matching rows for a domain."""
-    if frame is None or frame.empty or not protocol_value:
+    if aggregates is None:
         return []
-    series = _alignment_series(frame, domain)
-    target = protocol_value.strip().lower()
-    matching = frame[series.str.lower().str.contains(target, regex=False, na=False)]
+    matching = aggregates.matching_frame(domain_label, group)
     refs = []
     for _, row in matching.head(max_refs).iterrows():
         nct_id = str(row.get("NCT ID", "")).strip()
@@ -1195,21 +1247,14 @@ def build_comparison_result(
     """
     from trial_design_explorer.services.audit_service import current_utc_timestamp
 
-    # Use existing flat builders as the computation core
-    flat_metrics = build_protocol_comparison_metrics(protocol_meta, trials_df)
+    # One aggregation pass feeds both the flat metrics and the evidence refs
+    aggregates = CohortAggregates(protocol_meta, trials_df) if trials_df is not None and not trials_df.empty else None
+    flat_metrics = _metrics_from_aggregates(protocol_meta, aggregates)
     flat_recs = build_protocol_recommendations(protocol_meta, flat_metrics)
 
     evidence_strength = flat_metrics.get("evidence_strength", "Limited")
     timestamp = current_utc_timestamp()
-
-    # ── Subset frames ─────────────────────────────────────────────────────────
-    if trials_df is not None and not trials_df.empty:
-        norm_statuses = trials_df["Status"].fillna("").astype(str).apply(_normalize_status)
-        completed_df = trials_df[norm_statuses.isin(COMPLETED_STATUSES)].copy()
-        disrupted_df = trials_df[norm_statuses.isin(RISK_STATUSES)].copy()
-        active_df    = trials_df[norm_statuses.isin(ACTIVE_STATUSES)].copy()
-    else:
-        completed_df = disrupted_df = active_df = pd.DataFrame()
+    completed_df = aggregates.frame("completed") if aggregates is not None else pd.DataFrame()
 
     # ── CohortSummary ─────────────────────────────────────────────────────────
     cohort = CohortSummary(
@@ -1302,8 +1347,8 @@ def build_comparison_result(
         disr_match = flat_row.get("Disrupted Match (%)")
         signal = flat_row.get("Signal", "")
 
-        c_refs = _trial_refs_for_domain(completed_df, domain_def, protocol_value, max_refs=4)
-        d_refs = _trial_refs_for_domain(disrupted_df, domain_def, protocol_value, max_refs=3)
+        c_refs = _trial_refs_for_domain(aggregates, domain_def["label"], "completed", max_refs=4)
+        d_refs = _trial_refs_for_domain(aggregates, domain_def["label"], "disrupted", max_refs=3)
         domain_refs_by_label[flat_row.get("Domain", "")] = c_refs + d_refs
 
         ev = _build_domain_evidence(
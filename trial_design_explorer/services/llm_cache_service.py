@@ -0,0 +1,141 @@
+"""
+LLM cache service — persistent store for protocol-extraction responses.
+
+Each entry is keyed by a SHA-256 of everything that determines the model's
+answer for one extraction pass: prompt version, API endpoint, model name,
+completion token cap, requested field list and the text window itself.
+Re-uploading the same protocol, or re-running extraction on it, is then
+served locally pass by pass.
+
+Storage is one SQLite file under CACHE_DIR; entries beyond the size cap are
+evicted least-recently-used first.  Hit / miss counters are kept per process.
+
+This module does no network I/O.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from trial_design_explorer.config import CACHE_DIR, LLM_CACHE_MAX_ENTRIES
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key          TEXT PRIMARY KEY,
+    model        TEXT NOT NULL,
+    response     TEXT NOT NULL,
+    created_at   REAL NOT NULL,
+    accessed_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+"""
+
+
+def llm_cache_key(
+    text_chunk: str,
+    fields: list[str],
+    model: str,
+    prompt_version: str,
+    max_tokens: int,
+    base_url: str | None,
+) -> str:
+    payload = json.dumps(
+        [prompt_version, base_url, model, max_tokens, list(fields), text_chunk], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with LRU eviction and hit / miss counters."""
+
+    def __init__(self, path: Path | str | None = None, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = Path(path) if path else CACHE_DIR / "llm_cache.sqlite"
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._initialised = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._initialised:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._initialised:
+                conn.executescript(_SCHEMA)
+                self._initialised = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> dict | None:
+        """Cached parsed response for ``key``, counting the lookup as a hit or miss."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, model: str, response: dict) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(response), now, now),
+            )
+            evicted = conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        if evicted > 0:
+            with self._lock:
+                self.evictions += evicted
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            (entries,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "entries": entries,
+            }
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+
+_DEFAULT_CACHE: LLMCache | None = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide cache instance shared by the extraction passes."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = LLMCache()
+    return _DEFAULT_CACHE
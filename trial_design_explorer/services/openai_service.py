@@ -1,14 +1,114 @@
+import asyncio
 import os
+import threading
+import weakref
+from collections.abc import Generator
+
+from trial_design_explorer.config import OPENAI_MAX_CONCURRENCY, OPENAI_TIMEOUT_SECONDS
+
+# One client per (api key, base URL), built on first use and reused so every
+# call shares the same keep-alive connection pool.
+_CLIENTS: dict[tuple[str, str], object] = {}
+# Async clients are bound to the event loop they were first used on.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+_CLIENT_LOCK = threading.Lock()
+_REQUEST_SLOTS = threading.BoundedSemaphore(OPENAI_MAX_CONCURRENCY)
 
 
 def configured_model_name() -> str | None:
     return os.getenv("OPENAI_MODEL")
 
 
+def resolved_model_name(model: str | None = None) -> str:
+    """The model generate_chat_completion will actually call."""
+    return model or configured_model_name() or "gpt-4o-mini"
+
+
+def configured_base_url() -> str:
+    return os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+
 def has_openai_config() -> bool:
     return bool(os.getenv("OPENAI_API_KEY"))
 
 
+def _connection_settings() -> tuple[str, str] | None:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    return api_key, configured_base_url()
+
+
+def _http_client(factory):
+    """SDK HTTP client sized to the concurrency limit; None keeps the SDK's default pool."""
+    try:
+        import httpx
+    except ImportError:
+        return None
+    return factory(limits=httpx.Limits(
+        max_connections=OPENAI_MAX_CONCURRENCY,
+        max_keepalive_connections=OPENAI_MAX_CONCURRENCY,
+    ))
+
+
+def get_openai_client():
+    """Process-wide pooled ``OpenAI`` client for the configured key, or None."""
+    settings = _connection_settings()
+    if settings is None:
+        return None
+    with _CLIENT_LOCK:
+        client = _CLIENTS.get(settings)
+        if client is None:
+            from openai import DefaultHttpxClient, OpenAI
+
+            client = OpenAI(
+                api_key=settings[0],
+                base_url=settings[1],
+                timeout=OPENAI_TIMEOUT_SECONDS,
+                http_client=_http_client(DefaultHttpxClient),
+            )
+            _CLIENTS[settings] = client
+    return client
+
+
+def get_async_openai_client():
+    """Pooled ``AsyncOpenAI`` client for the running event loop, or None."""
+    settings = _connection_settings()
+    if settings is None:
+        return None
+    loop = asyncio.get_running_loop()
+    with _CLIENT_LOCK:
+        per_loop = _ASYNC_CLIENTS.setdefault(
+            loop, {"clients": {}, "slots": asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)}
+        )
+        client = per_loop["clients"].get(settings)
+        if client is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            client = AsyncOpenAI(
+                api_key=settings[0],
+                base_url=settings[1],
+                timeout=OPENAI_TIMEOUT_SECONDS,
+                http_client=_http_client(DefaultAsyncHttpxClient),
+            )
+            per_loop["clients"][settings] = client
+    return client
+
+
+def _chat_messages(system_prompt: str, user_prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _message_text(response) -> str | None:
+    message = response.choices[0].message.content
+    if isinstance(message, list):
+        return "".join(str(part) for part in message).strip() or None
+    return message.strip() if message else None
+
+
 def generate_chat_completion(
     system_prompt: str,
     user_prompt: str,
@@ -16,49 +116,128 @@ def generate_chat_completion(
     model: str | None = None,
     temperature: float = 0.0,
     max_tokens: int = 900,
+    timeout: float | None = None,
 ) -> str | None:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    settings = _connection_settings()
+    if settings is None:
         return None
-
-    base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-    target_model = model or configured_model_name() or "gpt-4o-mini"
+    target_model = resolved_model_name(model)
 
     try:
-        from openai import OpenAI
-
-        client = OpenAI(api_key=api_key, base_url=base_url)
-        response = client.chat.completions.create(
-            model=target_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens,
+        client = get_openai_client()
+    except ImportError:
+        return _legacy_chat_completion(
+            settings, target_model, system_prompt, user_prompt, temperature, max_tokens, timeout
         )
-        message = response.choices[0].message.content
-        if isinstance(message, list):
-            return "".join(str(part) for part in message).strip() or None
-        return message.strip() if message else None
+
+    try:
+        with _REQUEST_SLOTS:
+            response = client.chat.completions.create(
+                model=target_model,
+                messages=_chat_messages(system_prompt, user_prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout or OPENAI_TIMEOUT_SECONDS,
+            )
+        return _message_text(response)
     except Exception:
-        pass
+        return None
+
+
+def stream_chat_completion(
+    system_prompt: str,
+    user_prompt: str,
+    *,
+    model: str | None = None,
+    temperature: float = 0.0,
+    max_tokens: int = 900,
+    timeout: float | None = None,
+) -> Generator[str, None, bool]:
+    """
+    Yield the completion text as it arrives.
 
+    Yields nothing when no API key is configured or the request fails before
+    the first token; a failure mid-stream ends the stream early.  The
+    generator's return value tells the two apart from a full answer: True
+    only once the model has reported a finish reason.
+    """
+    if _connection_settings() is None:
+        return False
+    try:
+        client = get_openai_client()
+    except ImportError:
+        return False
+
+    finished = False
+    try:
+        with _REQUEST_SLOTS:
+            stream = client.chat.completions.create(
+                model=resolved_model_name(model),
+                messages=_chat_messages(system_prompt, user_prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout or OPENAI_TIMEOUT_SECONDS,
+                stream=True,
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.choices[0].finish_reason:
+                    finished = True
+    except Exception:
+        return False
+    return finished
+
+
+async def agenerate_chat_completion(
+    system_prompt: str,
+    user_prompt: str,
+    *,
+    model: str | None = None,
+    temperature: float = 0.0,
+    max_tokens: int = 900,
+    timeout: float | None = None,
+) -> str | None:
+    """Async variant of generate_chat_completion sharing a per-loop pooled client."""
+    try:
+        client = get_async_openai_client()
+    except ImportError:
+        return None
+    if client is None:
+        return None
+
+    slots = _ASYNC_CLIENTS[asyncio.get_running_loop()]["slots"]
+    try:
+        async with slots:
+            response = await client.chat.completions.create(
+                model=resolved_model_name(model),
+                messages=_chat_messages(system_prompt, user_prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout or OPENAI_TIMEOUT_SECONDS,
+            )
+        return _message_text(response)
+    except Exception:
+        return None
+
+
+def _legacy_chat_completion(settings, target_model, system_prompt, user_prompt,
+                            temperature, max_tokens, timeout) -> str | None:
+    """Pre-1.0 ``openai`` module API, used only when the v1 client is unavailable."""
     try:
         import openai
 
-        openai.api_key = api_key
-        openai.api_base = base_url
-        response = openai.ChatCompletion.create(
-            model=target_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        openai.api_key, openai.api_base = settings
+        with _REQUEST_SLOTS:
+            response = openai.ChatCompletion.create(
+                model=target_model,
+                messages=_chat_messages(system_prompt, user_prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                request_timeout=timeout or OPENAI_TIMEOUT_SECONDS,
+            )
         return response["choices"][0]["message"]["content"].strip()
     except Exception:
         return None
-
@@ -0,0 +1,226 @@
+"""
+Project store service — persistent protocol workspace runs.
+
+Storage layout (under PROJECT_STORE_DIR)
+────────────────────────────────────────
+projects.sqlite  runs       one row per run: the ProjectRun fields, the
+                            protocol profile and the run state (comparison
+                            result, metrics, recommendations, literature,
+                            audit log, chat) as JSON
+                 artifacts  exported files (PDF report, PPTX deck) by run
+<run_id>/        trials.parquet + locations.parquet — the design-similar
+                 cohort, in the cohort snapshot layout
+
+Saving a run again under the same run_id replaces it, so the workspace can
+checkpoint after each stage.  Loading a run restores everything needed to
+reopen the Analysis and Report stages without re-fetching or re-scoring.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import sqlite3
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from trial_design_explorer.config import PROJECT_STORE_DIR, PROJECT_STORE_LIST_LIMIT
+from trial_design_explorer.domain import ProjectRun
+from trial_design_explorer.services.audit_service import current_utc_timestamp
+from trial_design_explorer.services.cohort_snapshot_service import load_trials_frame, save_trials_frame
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       TEXT PRIMARY KEY,
+    workspace    TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    timestamp    TEXT NOT NULL,
+    notes        TEXT,
+    title        TEXT,
+    condition    TEXT,
+    cohort_size  INTEGER NOT NULL,
+    protocol     TEXT NOT NULL,
+    state        TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id       TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    payload      BLOB NOT NULL,
+    stored_at    TEXT NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+_RUN_COLUMNS = "run_id, workspace, status, timestamp, notes, title, condition, cohort_size"
+
+
+def _run_from_row(row: tuple, artifacts: list[str]) -> ProjectRun:
+    run_id, workspace, status, timestamp, notes, title, condition, cohort_size = row
+    return ProjectRun(
+        workspace=workspace,
+        status=status,
+        timestamp=timestamp,
+        notes=notes,
+        run_id=run_id,
+        title=title,
+        condition=condition,
+        cohort_size=cohort_size,
+        artifacts=artifacts,
+    )
+
+
+class ProjectStore:
+    """SQLite run index with parquet cohorts, one directory per run."""
+
+    def __init__(self, root: Path | str | None = None):
+        self.root = Path(root) if root else PROJECT_STORE_DIR
+        self.path = self.root / "projects.sqlite"
+        self._initialised = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._initialised:
+            self.root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._initialised:
+                conn.executescript(_SCHEMA)
+                self._initialised = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _cohort_dir(self, run_id: str) -> Path:
+        return self.root / run_id
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def save_run(
+        self,
+        run: ProjectRun,
+        protocol: dict,
+        state: dict,
+        cohort_df: pd.DataFrame | None = None,
+    ) -> str | None:
+        """
+        Insert or replace a run; returns its run_id, or None if it could not be stored.
+
+        ``state`` must be JSON-serialisable (values that are not are stringified).
+        The cohort is rewritten only when ``cohort_df`` is given.
+        """
+        run_id = run.run_id or uuid.uuid4().hex[:12]
+        try:
+            if cohort_df is not None:
+                cohort_dir = self._cohort_dir(run_id)
+                shutil.rmtree(cohort_dir, ignore_errors=True)
+                save_trials_frame(cohort_dir, cohort_df)
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO runs ({_RUN_COLUMNS}, protocol, state) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id, run.workspace, run.status, run.timestamp or current_utc_timestamp(),
+                        run.notes, run.title, run.condition, int(run.cohort_size or 0),
+                        json.dumps(protocol, default=str), json.dumps(state, default=str),
+                    ),
+                )
+        except Exception:
+            return None
+        run.run_id = run_id
+        return run_id
+
+    def put_artifact(self, run_id: str, name: str, payload: bytes) -> bool:
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts (run_id, name, payload, stored_at) VALUES (?, ?, ?, ?)",
+                    (run_id, name, sqlite3.Binary(payload), current_utc_timestamp()),
+                )
+        except Exception:
+            return False
+        return True
+
+    def delete_run(self, run_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM artifacts WHERE run_id = ?", (run_id,))
+        shutil.rmtree(self._cohort_dir(run_id), ignore_errors=True)
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def list_runs(self, workspace: str | None = None, limit: int = PROJECT_STORE_LIST_LIMIT) -> list[ProjectRun]:
+        """Most recent runs first."""
+        query = f"SELECT {_RUN_COLUMNS} FROM runs"
+        params: tuple = ()
+        if workspace:
+            query += " WHERE workspace = ?"
+            params = (workspace,)
+        query += " ORDER BY timestamp DESC LIMIT ?"
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(query, (*params, limit)).fetchall()
+                artifacts: dict[str, list[str]] = {}
+                for run_id, name in conn.execute("SELECT run_id, name FROM artifacts ORDER BY name"):
+                    artifacts.setdefault(run_id, []).append(name)
+        except Exception:
+            return []
+        return [_run_from_row(row, artifacts.get(row[0], [])) for row in rows]
+
+    def load_run(self, run_id: str) -> dict | None:
+        """
+        The stored run as {"run", "protocol", "state", "cohort"}, or None if absent.
+
+        ``cohort`` is None when the run was saved before a cohort was built.
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    f"SELECT {_RUN_COLUMNS}, protocol, state FROM runs WHERE run_id = ?", (run_id,)
+                ).fetchone()
+        except Exception:
+            return None
+        if row is None:
+            return None
+        names = self.list_artifacts(run_id)
+        cohort_dir = self._cohort_dir(run_id)
+        return {
+            "run": _run_from_row(row[:8], names),
+            "protocol": json.loads(row[8]),
+            "state": json.loads(row[9]),
+            "cohort": load_trials_frame(cohort_dir) if cohort_dir.exists() else None,
+        }
+
+    def list_artifacts(self, run_id: str) -> list[str]:
+        try:
+            with self._connect() as conn:
+                return [name for (name,) in conn.execute(
+                    "SELECT name FROM artifacts WHERE run_id = ? ORDER BY name", (run_id,)
+                )]
+        except Exception:
+            return []
+
+    def get_artifact(self, run_id: str, name: str) -> bytes | None:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload FROM artifacts WHERE run_id = ? AND name = ?", (run_id, name)
+                ).fetchone()
+        except Exception:
+            return None
+        return bytes(row[0]) if row else None
+
+
+_DEFAULT_STORE: ProjectStore | None = None
+
+
+def get_project_store() -> ProjectStore:
+    """Process-wide project store."""
+    global _DEFAULT_STORE
+    if _DEFAULT_STORE is None:
+        _DEFAULT_STORE = ProjectStore()
+    return _DEFAULT_STORE
@@ -21,6 +21,13 @@ Keyword-anchored windows:
   Pass 3 — window around "inclusion criteria" / "eligibility criteria"
   Pass 4 — window around "investigational product" / "study treatment" / dosing
 
+The four windows are independent, so the passes run concurrently on a small
+thread pool; each pass has an overall deadline, and a call that comes back
+empty or fails fast is retried with exponential backoff within it (a call
+that ran into its timeout is not retried).  Parsed pass results are cached on
+disk by content hash (llm_cache_service), so an unchanged window is never
+sent to the model twice.
+
 Merging: later passes win for their specialist fields; rich text fields prefer
 the longer, more detailed value.
 
@@ -31,16 +38,24 @@ from __future__ import annotations
 
 import json
 import re
+import time
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from trial_design_explorer.config import PROTOCOL_FIELDS
 from trial_design_explorer.domain import ProtocolMetadata, ProvenanceRecord
+from trial_design_explorer.services.assistant_context_service import build_assistant_context
 from trial_design_explorer.services.comparison_service import classify_endpoint_category
 from trial_design_explorer.services.audit_service import build_provenance_record
+from trial_design_explorer.services.llm_cache_service import get_llm_cache, llm_cache_key
 from trial_design_explorer.services.openai_service import (
+    configured_base_url,
     generate_chat_completion,
     has_openai_config,
     configured_model_name,
+    resolved_model_name,
+    stream_chat_completion,
 )
 
 
@@ -58,6 +73,17 @@ _WINDOW_LEAD           = 800      # chars before the anchor keyword
 # "inclusion criteria" appearing in the summary-of-changes table).
 _CONTENT_MIN_POS = 25_000   # skip first ~25 k chars for content section anchors
 
+# ── LLM call budget ────────────────────────────────────────────────────────────
+_LLM_MAX_WORKERS     = 4      # concurrent passes in multi-pass extraction
+_LLM_PASS_TIMEOUT    = 90.0   # seconds per LLM request
+_LLM_PASS_DEADLINE   = 150.0  # seconds per pass, across all attempts
+_LLM_PASS_RETRIES    = 2      # extra attempts after an empty / failed response
+_LLM_RETRY_BACKOFF   = 1.5    # seconds; doubled after each failed attempt
+
+# Bump whenever _SYSTEM_PROMPT or the pass prompt template changes, so cached
+# responses produced by the old prompt are no longer served.
+_PROMPT_VERSION = "protocol_extraction_v4"
+
 
 # ── Keyword anchors for each pass (plain substrings, case-insensitive) ─────────
 # These are searched in the RAW document text.  The first match wins and a
@@ -276,10 +302,37 @@ def _llm_pass(text_chunk: str, fields: list[str], max_tokens: int = 3000) -> Opt
         f"- Use null for anything not found — do not invent.\n\n"
         f"Protocol text:\n{text_chunk}"
     )
-    raw = generate_chat_completion(
-        _SYSTEM_PROMPT, user_prompt, temperature=0.0, max_tokens=max_tokens
-    )
-    return _parse_json(raw) if raw else None
+    cache = get_llm_cache()
+    model = resolved_model_name()
+    cache_key = llm_cache_key(text_chunk, fields, model, _PROMPT_VERSION, max_tokens, configured_base_url())
+    if cache.enabled:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    # generate_chat_completion reports every failure as None, so a call that
+    # used up its whole timeout is taken to have timed out: retrying it would
+    # only stack another full timeout onto the pass.
+    raw = None
+    deadline = time.monotonic() + _LLM_PASS_DEADLINE
+    for attempt in range(_LLM_PASS_RETRIES + 1):
+        if attempt:
+            backoff = _LLM_RETRY_BACKOFF * 2 ** (attempt - 1)
+            if time.monotonic() + backoff >= deadline:
+                break
+            time.sleep(backoff)
+        timeout = min(_LLM_PASS_TIMEOUT, deadline - time.monotonic())
+        started = time.monotonic()
+        raw = generate_chat_completion(
+            _SYSTEM_PROMPT, user_prompt, temperature=0.0, max_tokens=max_tokens,
+            timeout=timeout,
+        )
+        if raw or time.monotonic() - started >= timeout:
+            break
+    parsed = _parse_json(raw) if raw else None
+    if parsed is not None and cache.enabled:
+        cache.put(cache_key, model, parsed)
+    return parsed
 
 
 # ── Main LLM extraction paths ──────────────────────────────────────────────────
@@ -307,6 +360,9 @@ def _extract_multi_pass(text: str) -> tuple[dict, int]:
     Pass 3 — Eligibility window                 : inclusion/exclusion criteria
     Pass 4 — Intervention window                : drug, dose, comparator
 
+    The windows are cut up front and the four passes are dispatched together,
+    so latency is roughly that of the slowest pass rather than the sum.
+
     Returns (merged_dict, passes_succeeded_count).
     """
     # Pass 1: title page / synopsis / study design header
@@ -315,7 +371,6 @@ def _extract_multi_pass(text: str) -> tuple[dict, int]:
     if synopsis_window and synopsis_window not in chunk1:
         chunk1 += "\n\n--- [SYNOPSIS / STUDY DESIGN SECTION] ---\n\n" + synopsis_window
     chunk1 = chunk1[:_WINDOW_SIZE * 2]           # cap at ~28 k chars
-    parsed1 = _llm_pass(chunk1, _PASS1_FIELDS, max_tokens=2000)
 
     # Pass 2: endpoints — skip first _CONTENT_MIN_POS chars to avoid false
     # matches in glossary ("primary outcome measure"), TOC, or changes table.
@@ -324,7 +379,6 @@ def _extract_multi_pass(text: str) -> tuple[dict, int]:
         # Fallback: take a window from the middle-third of the document
         mid = max(_CONTENT_MIN_POS, len(text) // 3)
         chunk2 = text[mid:mid + _WINDOW_SIZE]
-    parsed2 = _llm_pass(chunk2, _PASS2_FIELDS, max_tokens=2500)
 
     # Pass 3: eligibility — skip early sections where "inclusion criteria"
     # appears in the summary-of-changes table before the actual criteria text.
@@ -332,7 +386,6 @@ def _extract_multi_pass(text: str) -> tuple[dict, int]:
     if not chunk3:
         mid = max(_CONTENT_MIN_POS, len(text) // 3)
         chunk3 = text[mid:mid + _WINDOW_SIZE]
-    parsed3 = _llm_pass(chunk3, _PASS3_FIELDS, max_tokens=3000)
 
     # Pass 4: intervention — skip early sections where "study intervention"
     # appears in the title-page header or "investigational product" in the TOC.
@@ -340,7 +393,16 @@ def _extract_multi_pass(text: str) -> tuple[dict, int]:
     if not chunk4:
         mid = max(_CONTENT_MIN_POS, len(text) // 4)
         chunk4 = text[mid:mid + _WINDOW_SIZE]
-    parsed4 = _llm_pass(chunk4, ["comparator", "intervention_description"], max_tokens=2000)
+
+    passes = [
+        (chunk1, _PASS1_FIELDS, 2000),
+        (chunk2, _PASS2_FIELDS, 2500),
+        (chunk3, _PASS3_FIELDS, 3000),
+        (chunk4, ["comparator", "intervention_description"], 2000),
+    ]
+    with ThreadPoolExecutor(max_workers=_LLM_MAX_WORKERS) as pool:
+        # map() keeps pass order, which _merge_llm_results relies on.
+        parsed1, parsed2, parsed3, parsed4 = pool.map(lambda job: _llm_pass(*job), passes)
 
     passes_ok = sum(1 for p in (parsed1, parsed2, parsed3, parsed4) if p)
     merged = _merge_llm_results(parsed1, parsed2, parsed3, parsed4)
@@ -535,7 +597,7 @@ def extract_protocol_metadata_from_text(text: str) -> ProtocolMetadata:
 
     provenance = build_provenance_record(
         source="llm_extraction",
-        tool=f"protocol_extraction_v4/{configured_model_name() or 'openai'}",
+        tool=f"{_PROMPT_VERSION}/{configured_model_name() or 'openai'}",
         notes=(
             f"LLM-primary extraction. {strategy}. "
             f"Confidence: {confidence}. "
@@ -570,35 +632,88 @@ def protocol_metadata_from_session(payload) -> ProtocolMetadata:
     return metadata
 
 
-def grounded_assistant_response(
+_ASSISTANT_FALLBACK = (
+    "Current evidence review is limited to the approved protocol profile and the "
+    "matched trial summary in this workspace. "
+    "Please validate any planning decision with clinical, regulatory, and operational review."
+)
+
+
+def _assistant_prompts(
     user_question: str,
     protocol_meta: ProtocolMetadata,
     trial_summary: str,
-    comparison_metrics: Optional[dict] = None,
-    recommendations: Optional[list] = None,
-) -> str:
-    fallback = (
-        "Current evidence review is limited to the approved protocol profile and the "
-        "matched trial summary in this workspace. "
-        "Please validate any planning decision with clinical, regulatory, and operational review."
-    )
-    if not has_openai_config():
-        return fallback
-
+    comparison_metrics: Optional[dict],
+    recommendations: Optional[list],
+) -> tuple[str, str]:
     system_prompt = (
         "You are a senior clinical trial planning assistant. "
         "Be truthful, do not fabricate evidence, state uncertainty clearly, "
         "and only use the provided context."
     )
+    context = build_assistant_context(
+        user_question, protocol_meta, trial_summary, comparison_metrics, recommendations
+    )
     user_prompt = (
-        f"Protocol metadata: {json.dumps(protocol_meta.to_display_dict(), ensure_ascii=True, default=str)}\n"
-        f"Comparison summary: {trial_summary}\n"
-        f"Comparison metrics: {json.dumps(comparison_metrics or {}, ensure_ascii=True, default=str)}\n"
-        f"Recommendations: {json.dumps(recommendations or [], ensure_ascii=True, default=str)}\n"
+        f"Workspace context:\n{context}\n\n"
         f"User question: {user_question}\n\n"
         "Answer concisely. If evidence is incomplete, say so explicitly."
     )
+    return system_prompt, user_prompt
+
+
+def grounded_assistant_response(
+    user_question: str,
+    protocol_meta: ProtocolMetadata,
+    trial_summary: str,
+    comparison_metrics: Optional[dict] = None,
+    recommendations: Optional[list] = None,
+) -> str:
+    if not has_openai_config():
+        return _ASSISTANT_FALLBACK
+
+    system_prompt, user_prompt = _assistant_prompts(
+        user_question, protocol_meta, trial_summary, comparison_metrics, recommendations
+    )
     response = generate_chat_completion(
         system_prompt, user_prompt, temperature=0.2, max_tokens=600
     )
-    return response or fallback
+    return response or _ASSISTANT_FALLBACK
+
+
+def stream_grounded_assistant_response(
+    user_question: str,
+    protocol_meta: ProtocolMetadata,
+    trial_summary: str,
+    comparison_metrics: Optional[dict] = None,
+    recommendations: Optional[list] = None,
+) -> Generator[str, None, bool]:
+    """
+    Streaming form of grounded_assistant_response: yields text as the model
+    produces it, or the fallback message if no tokens arrive.
+
+    Returns (as the generator's value) False when the stream broke off after
+    some text had been yielded; that text is not a complete answer, and the
+    caller should replace it, e.g. with grounded_assistant_response.
+    """
+    if not has_openai_config():
+        yield _ASSISTANT_FALLBACK
+        return True
+
+    system_prompt, user_prompt = _assistant_prompts(
+        user_question, protocol_meta, trial_summary, comparison_metrics, recommendations
+    )
+    tokens = stream_chat_completion(system_prompt, user_prompt, temperature=0.2, max_tokens=600)
+    streamed = False
+    while True:
+        try:
+            token = next(tokens)
+        except StopIteration as stop:
+            finished = stop.value
+            break
+        streamed = True
+        yield token
+    if not streamed:
+        yield _ASSISTANT_FALLBACK
+        return True
+    return finished
@@ -0,0 +1,133 @@
+"""
+PubMed cache service — two-level local store for E-utilities results.
+
+Storage layout (SQLite, one file under CACHE_DIR)
+─────────────────────────────────────────────────
+queries   one row per (query string, retmax): the PMID list esearch returned
+          and when; rows older than the TTL are ignored and re-queried
+articles  one row per PMID: the parsed article record as JSON; articles do
+          not change once published, so they are kept until cleared
+
+Repeat searches for the same indication are answered from ``queries``; only
+PMIDs missing from ``articles`` go back to efetch.
+
+This module does no network I/O.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from trial_design_explorer.config import CACHE_DIR, PUBMED_QUERY_CACHE_TTL_SECONDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    query        TEXT NOT NULL,
+    max_results  INTEGER NOT NULL,
+    pmids        TEXT NOT NULL,
+    fetched_at   REAL NOT NULL,
+    PRIMARY KEY (query, max_results)
+);
+CREATE TABLE IF NOT EXISTS articles (
+    pmid         TEXT PRIMARY KEY,
+    payload      TEXT NOT NULL,
+    stored_at    REAL NOT NULL
+);
+"""
+
+# SQLite's default bound-parameter limit is 999 on older builds.
+_LOOKUP_CHUNK = 500
+
+
+class PubMedCache:
+    """SQLite-backed query → PMID memo (with TTL) and PMID → article store."""
+
+    def __init__(self, path: Path | str | None = None, ttl_seconds: int = PUBMED_QUERY_CACHE_TTL_SECONDS):
+        self.path = Path(path) if path else CACHE_DIR / "pubmed.sqlite"
+        self.ttl_seconds = ttl_seconds
+        self._initialised = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._initialised:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._initialised:
+                conn.executescript(_SCHEMA)
+                self._initialised = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ── Query level ───────────────────────────────────────────────────────────
+
+    def query_pmids(self, query: str, max_results: int) -> list[str] | None:
+        """PMIDs cached for the query, or None when absent or older than the TTL."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT pmids, fetched_at FROM queries WHERE query = ? AND max_results = ?",
+                (query, max_results),
+            ).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def store_query(self, query: str, max_results: int, pmids: list[str]) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO queries (query, max_results, pmids, fetched_at) VALUES (?, ?, ?, ?)",
+                (query, max_results, json.dumps(list(pmids)), now),
+            )
+            conn.execute("DELETE FROM queries WHERE fetched_at < ?", (now - self.ttl_seconds,))
+
+    # ── Article level ─────────────────────────────────────────────────────────
+
+    def articles(self, pmids: Iterable[str]) -> dict[str, dict]:
+        """Cached article records for whichever of ``pmids`` are stored."""
+        pmids = list(dict.fromkeys(pmids))
+        found: dict[str, dict] = {}
+        with self._connect() as conn:
+            for start in range(0, len(pmids), _LOOKUP_CHUNK):
+                chunk = pmids[start:start + _LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"SELECT pmid, payload FROM articles WHERE pmid IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                found.update((pmid, json.loads(payload)) for pmid, payload in rows)
+        return found
+
+    def store_articles(self, records: Iterable[dict]) -> None:
+        now = time.time()
+        rows = [(record["pmid"], json.dumps(record), now) for record in records if record.get("pmid")]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO articles (pmid, payload, stored_at) VALUES (?, ?, ?)", rows
+            )
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM queries")
+            conn.execute("DELETE FROM articles")
+
+
+_DEFAULT_CACHE: PubMedCache | None = None
+
+
+def get_pubmed_cache() -> PubMedCache:
+    """Process-wide cache instance shared by the PubMed fetchers."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = PubMedCache()
+    return _DEFAULT_CACHE
@@ -5,19 +5,32 @@ Uses NCBI E-utilities (free, no API key required for low-volume access).
 Searches PubMed for peer-reviewed evidence relevant to a trial's condition,
 design choices, or endpoints, and returns structured, auditable citations.
 
-Rate limit: NCBI allows up to 3 requests/second without an API key.
+Rate limit: NCBI allows up to 3 requests/second without an API key and 10
+with one (NCBI_API_KEY).  All requests go through one pooled client that
+enforces the limit with a token bucket shared across threads, reuses
+keep-alive connections, and splits large efetch calls into batches.
+Search results and parsed articles are cached locally (pubmed_cache_service),
+so repeat searches only send efetch requests for PMIDs not seen before.
 All requests include a user-agent identifying this tool.
 """
 
+import os
+import queue
 import re
+import threading
 import time
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass, field
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
 from typing import Optional
 
 import requests
 
+from trial_design_explorer.config import PUBMED_EFETCH_BATCH_SIZE, PUBMED_MAX_WORKERS
+from trial_design_explorer.services.pubmed_cache_service import get_pubmed_cache
+
 ESEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
 EFETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
 ESUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
@@ -26,7 +39,8 @@ _HEADERS = {
     "User-Agent": "TrialDesignExplorer/1.0 (clinical-trial-planning-tool; contact: opensource)",
     "Accept": "application/xml",
 }
-_RATE_LIMIT_SLEEP = 0.4  # seconds between requests
+_RATE_NO_KEY = 3.0   # requests per second
+_RATE_WITH_KEY = 10.0
 
 
 @dataclass
@@ -64,99 +78,270 @@ class PubMedArticle:
         return f"{author_part} et al. ({self.year}). {self.title}. {self.journal}. PMID:{self.pmid}"
 
 
+class _TokenBucket:
+    """Thread-safe token bucket; ``acquire`` blocks until a request may be sent."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class EutilsClient:
+    """
+    Pooled NCBI E-utilities client.
+
+    A pool of keep-alive ``requests.Session`` objects reused across calls and
+    threads, a shared token bucket sized from the API key, batched efetch, and
+    a bounded thread pool for running several searches at once.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_workers: int = PUBMED_MAX_WORKERS,
+        efetch_batch_size: int = PUBMED_EFETCH_BATCH_SIZE,
+    ):
+        self.api_key = api_key if api_key is not None else os.getenv("NCBI_API_KEY", "")
+        self.max_workers = max_workers
+        self.efetch_batch_size = efetch_batch_size
+        # One token of burst: NCBI counts requests per second, so never send a burst.
+        self.bucket = _TokenBucket(_RATE_WITH_KEY if self.api_key else _RATE_NO_KEY, capacity=1)
+        self._sessions: queue.SimpleQueue[requests.Session] = queue.SimpleQueue()
+
+    def _checkout_session(self) -> requests.Session:
+        try:
+            return self._sessions.get_nowait()
+        except queue.Empty:
+            session = requests.Session()
+            session.headers.update(_HEADERS)
+            return session
+
+    def _with_key(self, params: dict) -> dict:
+        return {**params, "api_key": self.api_key} if self.api_key else params
+
+    def get_xml(self, url: str, params: dict) -> Optional[ET.Element]:
+        """Fetch XML from NCBI E-utilities with error handling."""
+        params = self._with_key(params)
+        session = self._checkout_session()
+        try:
+            self.bucket.acquire()
+            response = session.get(url, params=params, timeout=15)
+            response.raise_for_status()
+            return ET.fromstring(response.content)
+        except Exception:
+            return None
+        finally:
+            self._sessions.put(session)
+
+    def search_pmids(self, query: str, max_results: int = 8) -> list[str] | None:
+        """Return PMIDs matching a PubMed query; None if the request failed."""
+        params = {
+            "db": "pubmed",
+            "term": query,
+            "retmax": max_results,
+            "retmode": "xml",
+            "sort": "relevance",
+        }
+        root = self.get_xml(ESEARCH_URL, params)
+        if root is None:
+            return None
+        return [id_elem.text for id_elem in root.findall(".//Id") if id_elem.text]
+
+    def fetch_articles(self, pmids: list[str], query: str) -> list[PubMedArticle]:
+        """Fetch full article details, ``efetch_batch_size`` PMIDs per request, in PMID order."""
+        if not pmids:
+            return []
+        articles: list[PubMedArticle] = []
+        for batch_articles in self.map(
+            lambda batch: list(self.stream_articles(batch, query)), self._batches(pmids)
+        ):
+            articles.extend(batch_articles)
+        return articles
+
+    def iter_articles(self, pmids: list[str], query: str) -> Iterator[PubMedArticle]:
+        """Yield articles batch by batch as each efetch response is parsed."""
+        for batch in self._batches(pmids):
+            yield from self.stream_articles(batch, query)
+
+    def _batches(self, pmids: list[str]) -> list[list[str]]:
+        return [
+            pmids[start:start + self.efetch_batch_size]
+            for start in range(0, len(pmids), self.efetch_batch_size)
+        ]
+
+    def stream_articles(self, pmids: list[str], query: str) -> Iterator[PubMedArticle]:
+        """
+        One efetch request, parsed incrementally from the response stream.
+
+        Articles are yielded as soon as their closing tag arrives, so memory
+        stays flat however many abstracts the batch holds.  A failed request
+        or malformed payload ends the stream early.
+        """
+        params = self._with_key({
+            "db": "pubmed",
+            "id": ",".join(pmids),
+            "retmode": "xml",
+            "rettype": "abstract",
+        })
+        session = self._checkout_session()
+        try:
+            self.bucket.acquire()
+            with session.get(EFETCH_URL, params=params, timeout=15, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                yield from _iter_articles(response.raw, query)
+        except Exception:
+            return
+        finally:
+            self._sessions.put(session)
+
+    def map(self, fn, items: list) -> list:
+        """Run ``fn`` over ``items`` on the bounded pool; results keep input order."""
+        if len(items) <= 1 or self.max_workers <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+
+_DEFAULT_CLIENT: EutilsClient | None = None
+
+
+def get_pubmed_client() -> EutilsClient:
+    """Process-wide client, so every caller shares one rate limit."""
+    global _DEFAULT_CLIENT
+    if _DEFAULT_CLIENT is None:
+        _DEFAULT_CLIENT = EutilsClient()
+    return _DEFAULT_CLIENT
+
+
 def _get_xml(url: str, params: dict) -> Optional[ET.Element]:
     """Fetch XML from NCBI E-utilities with error handling."""
-    try:
-        time.sleep(_RATE_LIMIT_SLEEP)
-        response = requests.get(url, params=params, headers=_HEADERS, timeout=15)
-        response.raise_for_status()
-        return ET.fromstring(response.content)
-    except Exception:
-        return None
+    return get_pubmed_client().get_xml(url, params)
 
 
 def _search_pmids(query: str, max_results: int = 8) -> list[str]:
-    """Return PMIDs matching a PubMed query."""
-    params = {
-        "db": "pubmed",
-        "term": query,
-        "retmax": max_results,
-        "retmode": "xml",
-        "sort": "relevance",
-    }
-    root = _get_xml(ESEARCH_URL, params)
-    if root is None:
+    """Return PMIDs matching a PubMed query, memoized per query for the cache TTL."""
+    cache = get_pubmed_cache()
+    if cache.enabled:
+        cached = cache.query_pmids(query, max_results)
+        if cached is not None:
+            return cached
+    pmids = get_pubmed_client().search_pmids(query, max_results=max_results)
+    if pmids is None:
         return []
-    return [id_elem.text for id_elem in root.findall(".//Id") if id_elem.text]
+    if cache.enabled:
+        cache.store_query(query, max_results, pmids)
+    return pmids
 
 
 def _fetch_article_details(pmids: list[str], query: str) -> list[PubMedArticle]:
-    """Fetch full article details for a list of PMIDs."""
-    if not pmids:
-        return []
-
-    params = {
-        "db": "pubmed",
-        "id": ",".join(pmids),
-        "retmode": "xml",
-        "rettype": "abstract",
-    }
-    root = _get_xml(EFETCH_URL, params)
-    if root is None:
-        return []
-
-    articles = []
-    for article_elem in root.findall(".//PubmedArticle"):
+    """Fetch full article details for a list of PMIDs; only uncached PMIDs hit efetch."""
+    cache = get_pubmed_cache()
+    if not cache.enabled:
+        return get_pubmed_client().fetch_articles(pmids, query)
+
+    known = {pmid: PubMedArticle(**record) for pmid, record in cache.articles(pmids).items()}
+    missing = [pmid for pmid in pmids if pmid not in known]
+    if missing:
+        fetched = get_pubmed_client().fetch_articles(missing, query)
+        cache.store_articles(article.to_dict() for article in fetched)
+        known.update((article.pmid, article) for article in fetched)
+    # Cached records keep their original retrieval time but report this query.
+    return [
+        known[pmid] if known[pmid].query_used == query else replace(known[pmid], query_used=query)
+        for pmid in dict.fromkeys(pmids)
+        if pmid in known
+    ]
+
+
+def _iter_articles(source, query: str) -> Iterator[PubMedArticle]:
+    """Stream PubMedArticle records out of an efetch PubmedArticleSet file object."""
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = elem
+        if event != "end" or elem.tag != "PubmedArticle":
+            continue
         try:
-            pmid = (article_elem.findtext(".//PMID") or "").strip()
-            title = (article_elem.findtext(".//ArticleTitle") or "").strip()
-            title = re.sub(r"<[^>]+>", "", title)
-
-            abstract_parts = [
-                (text_elem.text or "").strip()
-                for text_elem in article_elem.findall(".//AbstractText")
-                if text_elem.text
-            ]
-            abstract = " ".join(abstract_parts)[:600]
-            if len(abstract) == 600:
-                abstract += "..."
-
-            author_elems = article_elem.findall(".//Author")
-            author_names = []
-            for author in author_elems[:3]:
-                last = author.findtext("LastName") or ""
-                initials = author.findtext("Initials") or ""
-                if last:
-                    author_names.append(f"{last} {initials}".strip())
-            authors = ", ".join(author_names)
-
-            journal = (article_elem.findtext(".//Journal/Title") or
-                       article_elem.findtext(".//MedlineTA") or "").strip()
-
-            year_elem = (
-                article_elem.findtext(".//PubDate/Year") or
-                article_elem.findtext(".//PubDate/MedlineDate") or ""
-            )
-            year = re.search(r"\d{4}", year_elem).group() if re.search(r"\d{4}", year_elem) else ""
-
-            doi = ""
-            for id_elem in article_elem.findall(".//ArticleId"):
-                if id_elem.get("IdType") == "doi":
-                    doi = (id_elem.text or "").strip()
-                    break
-
-            url = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else ""
-
-            if title and pmid:
-                articles.append(PubMedArticle(
-                    pmid=pmid, title=title, abstract=abstract,
-                    authors=authors, journal=journal, year=year,
-                    doi=doi, url=url, query_used=query,
-                ))
+            article = _parse_article(elem, query)
         except Exception:
-            continue
+            article = None
+        # Drop parsed articles from the tree so memory does not grow with the payload.
+        root.clear()
+        if article is not None:
+            yield article
 
-    return articles
+
+def _parse_article(article_elem: ET.Element, query: str) -> Optional[PubMedArticle]:
+    """Build one PubMedArticle from a <PubmedArticle> element using direct child paths."""
+    citation = article_elem.find("MedlineCitation")
+    if citation is None:
+        return None
+    article = citation.find("Article")
+    if article is None:
+        return None
+
+    pmid = (citation.findtext("PMID") or "").strip()
+    title = (article.findtext("ArticleTitle") or "").strip()
+    title = re.sub(r"<[^>]+>", "", title)
+
+    abstract_parts = [
+        (text_elem.text or "").strip()
+        for text_elem in article.iterfind("Abstract/AbstractText")
+        if text_elem.text
+    ]
+    abstract = " ".join(abstract_parts)[:600]
+    if len(abstract) == 600:
+        abstract += "..."
+
+    author_names = []
+    for author in article.findall("AuthorList/Author")[:3]:
+        last = author.findtext("LastName") or ""
+        initials = author.findtext("Initials") or ""
+        if last:
+            author_names.append(f"{last} {initials}".strip())
+    authors = ", ".join(author_names)
+
+    journal = (article.findtext("Journal/Title") or
+               citation.findtext("MedlineJournalInfo/MedlineTA") or "").strip()
+
+    year_elem = (
+        article.findtext("Journal/JournalIssue/PubDate/Year") or
+        article.findtext("Journal/JournalIssue/PubDate/MedlineDate") or ""
+    )
+    year_match = re.search(r"\d{4}", year_elem)
+    year = year_match.group() if year_match else ""
+
+    doi = ""
+    for id_elem in article_elem.iterfind("PubmedData/ArticleIdList/ArticleId"):
+        if id_elem.get("IdType") == "doi":
+            doi = (id_elem.text or "").strip()
+            break
+
+    url = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else ""
+
+    if not (title and pmid):
+        return None
+    return PubMedArticle(
+        pmid=pmid, title=title, abstract=abstract,
+        authors=authors, journal=journal, year=year,
+        doi=doi, url=url, query_used=query,
+    )
 
 
 def _build_query(condition: str, design_context: Optional[str] = None,
@@ -213,6 +398,23 @@ def search_pubmed_evidence(
     return _fetch_article_details(pmids, query)
 
 
+def search_pubmed_evidence_many(
+    searches: list[dict],
+    max_results: int = 8,
+) -> list[list[PubMedArticle]]:
+    """
+    Run several evidence searches for one protocol in parallel.
+
+    Each entry of ``searches`` holds ``search_pubmed_evidence`` keyword
+    arguments (condition, design_context, endpoint_focus).  Results come back
+    in the same order; all searches share the client's rate limit.
+    """
+    return get_pubmed_client().map(
+        lambda kwargs: search_pubmed_evidence(**{"max_results": max_results, **kwargs}),
+        list(searches),
+    )
+
+
 def articles_to_evidence_rows(articles: list[PubMedArticle]) -> list[dict]:
     """Convert articles to compact rows for display in tables/reports."""
     rows = []
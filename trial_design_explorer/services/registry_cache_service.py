@@ -0,0 +1,320 @@
+"""
+Registry cache service — persistent on-disk store for ClinicalTrials.gov pulls.
+
+Storage layout (SQLite, one file under CACHE_DIR)
+─────────────────────────────────────────────────
+entries        one row per cached query: normalized condition + page size + cap,
+               fetch / access timestamps and the compressed payload size
+entry_studies  one row per study in an entry, in registry order, with the
+               study's lastUpdatePostDate and its zlib-compressed JSON
+
+Entries younger than the TTL are served as-is.  Older entries are refreshed by
+the caller (clinical_trials_service) re-pulling only studies whose
+lastUpdatePostDate changed.  When the total payload size exceeds the byte
+budget, least-recently-used entries are evicted.
+
+This module does no network I/O.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from trial_design_explorer.config import (
+    CACHE_DIR,
+    REGISTRY_CACHE_MAX_BYTES,
+    REGISTRY_CACHE_TTL_SECONDS,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key          TEXT PRIMARY KEY,
+    condition    TEXT NOT NULL,
+    page_size    INTEGER NOT NULL,
+    fetched_at   REAL NOT NULL,
+    accessed_at  REAL NOT NULL,
+    study_count  INTEGER NOT NULL,
+    size_bytes   INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entry_studies (
+    key          TEXT NOT NULL,
+    position     INTEGER NOT NULL,
+    nct_id       TEXT NOT NULL,
+    last_update  TEXT,
+    payload      BLOB NOT NULL,
+    PRIMARY KEY (key, position)
+);
+CREATE INDEX IF NOT EXISTS idx_entry_studies_nct ON entry_studies (key, nct_id);
+"""
+
+_PENDING_SUFFIX = ":pending"
+
+
+@dataclass(slots=True)
+class RegistryCacheEntry:
+    key: str
+    condition: str
+    page_size: int
+    fetched_at: float
+    accessed_at: float
+    study_count: int
+    size_bytes: int
+
+    def age_seconds(self, now: float | None = None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+
+def normalize_condition(condition: str) -> str:
+    return " ".join(str(condition or "").lower().split())
+
+
+def registry_cache_key(condition: str, page_size: int, max_studies: int | None) -> str:
+    return f"{normalize_condition(condition)}|{page_size}|{max_studies or 'all'}"
+
+
+def study_nct_id(study: dict) -> str:
+    return (
+        study.get("protocolSection", {}).get("identificationModule", {}).get("nctId") or ""
+    )
+
+
+def study_last_update(study: dict) -> str | None:
+    return (
+        study.get("protocolSection", {})
+        .get("statusModule", {})
+        .get("lastUpdatePostDateStruct", {})
+        .get("date")
+    )
+
+
+def _encode(study: dict) -> bytes:
+    return zlib.compress(json.dumps(study, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+class RegistryCache:
+    """SQLite-backed registry cache with TTL freshness and size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        ttl_seconds: int = REGISTRY_CACHE_TTL_SECONDS,
+        max_bytes: int = REGISTRY_CACHE_MAX_BYTES,
+    ):
+        self.path = Path(path) if path else CACHE_DIR / "registry.sqlite"
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._initialised = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._initialised:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._initialised:
+                conn.executescript(_SCHEMA)
+                self._initialised = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def lookup(self, key: str) -> RegistryCacheEntry | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT key, condition, page_size, fetched_at, accessed_at, study_count, size_bytes "
+                "FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return RegistryCacheEntry(*row) if row else None
+
+    def is_fresh(self, entry: RegistryCacheEntry | None) -> bool:
+        return entry is not None and entry.age_seconds() < self.ttl_seconds
+
+    def iter_pages(self, key: str, page_size: int) -> Iterator[dict]:
+        """Yield cached studies in registry order, chunked like API response pages."""
+        with self._connect() as conn:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT payload FROM entry_studies WHERE key = ? ORDER BY position", (key,)
+            )
+            yielded = False
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                yielded = True
+                yield {"studies": [_decode(payload) for (payload,) in rows]}
+        if not yielded:
+            # An empty result set is still a valid response page.
+            yield {"studies": []}
+
+    def last_updates(self, key: str) -> dict[str, str | None]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT nct_id, last_update FROM entry_studies WHERE key = ?", (key,)
+            ).fetchall()
+        return dict(rows)
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def begin(self, key: str) -> None:
+        """Start staging a fresh download; the previous entry stays readable until commit."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entry_studies WHERE key = ?", (key + _PENDING_SUFFIX,))
+
+    def stage(self, key: str, start_position: int, studies: Iterable[dict]) -> None:
+        rows = [
+            (key + _PENDING_SUFFIX, start_position + offset, study_nct_id(study),
+             study_last_update(study), _encode(study))
+            for offset, study in enumerate(studies)
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entry_studies (key, position, nct_id, last_update, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def commit(self, key: str, condition: str, page_size: int) -> None:
+        """Atomically replace the entry with the staged rows, then enforce the size budget."""
+        pending = key + _PENDING_SUFFIX
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entry_studies WHERE key = ?", (key,))
+            conn.execute("UPDATE entry_studies SET key = ? WHERE key = ?", (key, pending))
+            self._write_entry(conn, key, condition, page_size)
+        self.evict(keep=key)
+
+    def discard(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entry_studies WHERE key = ?", (key + _PENDING_SUFFIX,))
+
+    def apply_refresh(
+        self,
+        key: str,
+        condition: str,
+        page_size: int,
+        listing: list[tuple[str, str | None]],
+        changed_studies: Iterable[dict],
+    ) -> None:
+        """
+        Reconcile an entry with a fresh (nct_id, lastUpdatePostDate) listing.
+
+        Changed or new studies are replaced with ``changed_studies``; studies no
+        longer listed are dropped; positions follow the listing order.
+        """
+        order = {nct_id: position for position, (nct_id, _) in enumerate(listing)}
+        with self._connect() as conn:
+            # Park existing rows at negative positions so renumbering never collides.
+            conn.execute(
+                "UPDATE entry_studies SET position = -1 - position WHERE key = ?", (key,)
+            )
+            # Inserted rows go below every parked row, whatever dedup leaves behind.
+            (lowest,) = conn.execute(
+                "SELECT COALESCE(MIN(position), 0) FROM entry_studies WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                "DELETE FROM entry_studies WHERE key = ? AND position NOT IN "
+                "(SELECT MAX(position) FROM entry_studies WHERE key = ? GROUP BY nct_id)",
+                (key, key),
+            )
+            existing = dict(conn.execute(
+                "SELECT nct_id, position FROM entry_studies WHERE key = ?", (key,)
+            ).fetchall())
+            stale = [(key, position) for nct_id, position in existing.items() if nct_id not in order]
+            conn.executemany("DELETE FROM entry_studies WHERE key = ? AND position = ?", stale)
+
+            written: set[str] = set()
+            for study in changed_studies:
+                nct_id = study_nct_id(study)
+                if nct_id not in order or nct_id in written:
+                    continue
+                if nct_id in existing:
+                    conn.execute(
+                        "DELETE FROM entry_studies WHERE key = ? AND position = ?",
+                        (key, existing[nct_id]),
+                    )
+                conn.execute(
+                    "INSERT INTO entry_studies (key, position, nct_id, last_update, payload) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, lowest - 1 - order[nct_id], nct_id, study_last_update(study), _encode(study)),
+                )
+                written.add(nct_id)
+
+            parked = conn.execute(
+                "SELECT nct_id, position FROM entry_studies WHERE key = ?", (key,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE entry_studies SET position = ? WHERE key = ? AND position = ?",
+                [(order[nct_id], key, position) for nct_id, position in parked],
+            )
+            self._write_entry(conn, key, condition, page_size)
+        self.evict(keep=key)
+
+    def _write_entry(self, conn: sqlite3.Connection, key: str, condition: str, page_size: int) -> None:
+        count, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM entry_studies WHERE key = ?",
+            (key,),
+        ).fetchone()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries "
+            "(key, condition, page_size, fetched_at, accessed_at, study_count, size_bytes) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, condition, page_size, now, now, count, size),
+        )
+
+    # ── Eviction ──────────────────────────────────────────────────────────────
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        """Drop least-recently-used entries until the total size fits the budget."""
+        evicted: list[str] = []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, size_bytes FROM entries ORDER BY accessed_at ASC"
+            ).fetchall()
+            total = sum(size for _, size in rows)
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                conn.execute("DELETE FROM entry_studies WHERE key = ?", (key,))
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                evicted.append(key)
+        return evicted
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entry_studies")
+            conn.execute("DELETE FROM entries")
+
+
+_DEFAULT_CACHE: RegistryCache | None = None
+
+
+def get_registry_cache() -> RegistryCache:
+    """Process-wide cache instance shared by the registry fetchers."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = RegistryCache()
+    return _DEFAULT_CACHE
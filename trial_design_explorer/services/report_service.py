@@ -37,13 +37,9 @@ from trial_design_explorer.config import ASSETS_DIR
 from trial_design_explorer.domain import ProtocolMetadata
 from trial_design_explorer.services.audit_service import current_utc_timestamp
 from trial_design_explorer.services.chart_service import (
-    generate_alignment_heatmap,
-    generate_duration_comparison_chart,
-    generate_endpoint_distribution_chart,
-    generate_enrollment_benchmark_chart,
-    generate_posture_gauge,
-    generate_radar_chart,
-    generate_sponsor_donut,
+    chart_buffer,
+    render_chart_set,
+    report_chart_format,
 )
 from trial_design_explorer.services.comparison_service import (
     build_action_register,
@@ -257,12 +253,44 @@ def _callout_box(text: str, styles, fill=ALERT_FILL, border=TEAL_COLOR) -> Table
 
 
 def _chart_image(buf: BytesIO, width_cm: float, height_cm: float,
-                 caption: str, styles) -> list:
+                 caption: str, styles, png_fallback) -> list:
+    """
+    Chart flowable plus caption.  An SVG chart svglib cannot convert is
+    replaced by the PNG render from ``png_fallback`` (a zero-argument callable
+    returning a buffer) instead of failing the export.
+    """
     buf.seek(0)
-    img = Image(buf, width=width_cm * cm, height=height_cm * cm)
+    img = None
+    if buf.read(256).lstrip().startswith((b"<?xml", b"<svg")):
+        buf.seek(0)
+        img = _svg_drawing(buf, width_cm * cm, height_cm * cm)
+        if img is None:
+            buf = png_fallback()
+    if img is None:
+        buf.seek(0)
+        img = Image(buf, width=width_cm * cm, height=height_cm * cm)
     return [img, _p(caption, styles["caption"]), Spacer(1, 0.2 * cm)]
 
 
+def _svg_drawing(buf: BytesIO, width: float, height: float):
+    """
+    Convert an SVG chart into a native ReportLab Drawing scaled to the figure
+    box, or None when svglib cannot parse it.
+    """
+    from svglib.svglib import svg2rlg
+
+    try:
+        drawing = svg2rlg(buf)
+    except Exception:
+        return None
+    if drawing is None or not drawing.width or not drawing.height:
+        return None
+    drawing.scale(width / drawing.width, height / drawing.height)
+    drawing.width, drawing.height = width, height
+    drawing.hAlign = "CENTER"
+    return drawing
+
+
 def _humanize(value: str | None) -> str:
     if not value:
         return "Not provided"
@@ -539,6 +567,10 @@ def generate_protocol_report_pdf(
     )
     styles = _build_styles()
     metrics = comparison_metrics or {}
+    chart_fmt = report_chart_format()
+    if metrics:
+        # Renders the PDF and deck charts together; the other export reuses them.
+        render_chart_set(metrics)
     recs = recommendations or []
 
     doc = SimpleDocTemplate(
@@ -625,11 +657,12 @@ def generate_protocol_report_pdf(
 
     # Posture gauge chart
     if metrics.get("completed_design_fit_pct") is not None:
-        gauge_buf = generate_posture_gauge(metrics, width_in=5.0, height_in=3.2)
+        gauge_buf = chart_buffer(metrics, "posture_gauge", 5.0, 3.2, chart_fmt)
         story.extend(_chart_image(gauge_buf, 13.0, 4.5,
                                   "Figure 1. Overall Precedent Posture Gauge — "
                                   "net gap between completed and disrupted design fit.",
-                                  styles))
+                                  styles,
+                                  png_fallback=lambda: chart_buffer(metrics, "posture_gauge", 5.0, 3.2)))
 
     # ── 2. Decision Signals ───────────────────────────────────────────────────
     if metrics:
@@ -728,19 +761,21 @@ def generate_protocol_report_pdf(
         story.append(_p(_domain_narrative(metrics), styles["body"]))
         story.append(Spacer(1, 0.2 * cm))
 
-        radar_buf = generate_radar_chart(metrics, width_in=7.0, height_in=5.5)
+        radar_buf = chart_buffer(metrics, "radar", 7.0, 5.5, chart_fmt)
         story.extend(_chart_image(radar_buf, 13.0, 7.5,
                                   "Figure 2. Design Domain Alignment Radar — "
                                   "completed precedent (teal filled) vs disrupted precedent (red dashed).  "
                                   "Larger filled area = stronger alignment with successful trials.",
-                                  styles))
+                                  styles,
+                                  png_fallback=lambda: chart_buffer(metrics, "radar", 7.0, 5.5)))
         story.append(Spacer(1, 0.15 * cm))
 
-        heatmap_buf = generate_alignment_heatmap(metrics, width_in=9.0, height_in=3.2)
+        heatmap_buf = chart_buffer(metrics, "alignment_heatmap", 9.0, 3.2, chart_fmt)
         story.extend(_chart_image(heatmap_buf, 13.0, 4.2,
                                   "Figure 3. Domain Alignment Risk Signal Summary — "
                                   "green = closer to completed precedent; red = closer to disrupted.",
-                                  styles))
+                                  styles,
+                                  png_fallback=lambda: chart_buffer(metrics, "alignment_heatmap", 9.0, 3.2)))
 
     # ── 7. Design Differential Matrix ─────────────────────────────────────────
     if metrics and not design_diff_df.empty:
@@ -764,18 +799,20 @@ def generate_protocol_report_pdf(
         story.append(_p(_enrollment_narrative(protocol, metrics), styles["body"]))
         story.append(Spacer(1, 0.2 * cm))
 
-        enroll_buf = generate_enrollment_benchmark_chart(metrics, width_in=8.0, height_in=4.0)
+        enroll_buf = chart_buffer(metrics, "enrollment_benchmark", 8.0, 4.0, chart_fmt)
         story.extend(_chart_image(enroll_buf, 13.0, 5.0,
                                   "Figure 4. Enrollment Benchmark — IQR boxes show 25th–75th percentile "
                                   "range; centre line is the median; amber dashed = protocol target.",
-                                  styles))
+                                  styles,
+                                  png_fallback=lambda: chart_buffer(metrics, "enrollment_benchmark", 8.0, 4.0)))
 
         story.append(Spacer(1, 0.15 * cm))
-        duration_buf = generate_duration_comparison_chart(metrics, width_in=8.0, height_in=3.5)
+        duration_buf = chart_buffer(metrics, "duration_comparison", 8.0, 3.5, chart_fmt)
         story.extend(_chart_image(duration_buf, 13.0, 4.5,
                                   "Figure 5. Planned Duration vs Precedent Cohort Ranges — "
                                   "amber dashed line = protocol planned duration.",
-                                  styles))
+                                  styles,
+                                  png_fallback=lambda: chart_buffer(metrics, "duration_comparison", 8.0, 3.5)))
 
     # ── 9. Cohort Definition ──────────────────────────────────────────────────
     if metrics and not cohort_df.empty:
@@ -828,11 +865,12 @@ def generate_protocol_report_pdf(
             styles["body"]))
         story.append(Spacer(1, 0.2 * cm))
 
-        ep_buf = generate_endpoint_distribution_chart(metrics, width_in=9.0, height_in=4.5)
+        ep_buf = chart_buffer(metrics, "endpoint_distribution", 9.0, 4.5, chart_fmt)
         story.extend(_chart_image(ep_buf, 13.0, 5.5,
                                   "Figure 6. Endpoint Category Distribution — completed precedent (teal) "
                                   "vs disrupted precedent (red).  Amber shading = protocol endpoint focus.",
-                                  styles))
+                                  styles,
+                                  png_fallback=lambda: chart_buffer(metrics, "endpoint_distribution", 9.0, 4.5)))
 
         if not endpoint_df.empty:
             story.append(_df_table(endpoint_df, styles,
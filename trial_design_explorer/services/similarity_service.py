@@ -0,0 +1,664 @@
+"""
+Similarity Service — batch five-domain design similarity scoring.
+
+The per-trial scorers in clinical_trials_service re-normalize strings,
+re-tokenize text and re-parse dates for every trial of every comparison.  This
+module splits that work in two:
+
+  build_trial_features   trial-side features, computed once per cohort:
+                         normalized categorical fields, token sets, parsed
+                         ages, line-of-therapy flags, intervention category
+                         masks, arm counts and duration months
+  score_domain_frame     protocol-side features, computed once per protocol,
+                         then all five sim_* columns as NumPy array ops
+
+Trial features are kept in a process-wide store keyed by the cohort's content
+fingerprint, and are written next to the cohort's parquet snapshot at ingest,
+so scoring a new protocol against a cached condition skips the trial side.
+Token columns are served through per-cohort inverted indexes (TokenIndex):
+overlap counts come from posting-list hits rather than per-trial set
+operations.
+
+Scores are identical to score_domain_breakdown / score_trial_design_similarity
+for every trial: the same thresholds and the same floating-point operation
+order are used, so the batch path can replace the per-row path outright.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from trial_design_explorer.services.clinical_trials_service import (
+    _DOMAIN_WEIGHTS,
+    _ENDPOINT_STOP,
+    _FIRST_LINE_TERMS,
+    _INTERVENTION_CATEGORIES,
+    _MAX_DOMAIN_WEIGHT,
+    _POP_STOP,
+    _SECOND_PLUS_TERMS,
+    _field_score,
+    _norm,
+    _parse_age,
+    _phase_score,
+    _protocol_comparator_flags,
+    _text_tokens,
+    cohort_fingerprint,
+    enum_codes,
+    parse_registry_dates,
+    trial_dates,
+)
+
+DOMAIN_COLUMNS = {
+    "population":   "sim_population",
+    "design":       "sim_design",
+    "endpoints":    "sim_endpoints",
+    "intervention": "sim_intervention",
+    "duration":     "sim_duration",
+}
+
+# Categorical trial columns compared with _field_score / _phase_score.
+_DESIGN_FIELDS = {
+    "study_type":         "Study Type",
+    "allocation":         "Allocation",
+    "masking":            "Masking",
+    "intervention_model": "Intervention Model",
+}
+
+# Every trial column build_trial_features reads; the store's fingerprint covers these.
+FEATURE_SOURCE_COLUMNS = [
+    "Study Type", "Allocation", "Masking", "Intervention Model", "Phase",
+    "Conditions", "Title", "Primary Outcome", "Minimum Age", "Maximum Age",
+    "Intervention Types", "Interventions", "Arms Count", "Start Date", "Completion Date",
+]
+_FEATURE_STORE_SIZE = 8
+_EARLY_EXIT_CHUNK = 2048   # trials scored per step of top-k early exit
+_ROUND_SLACK = 5e-5        # max lift from rounding a score to 4 decimals
+
+_CATEGORY_BITS = {category: 1 << i for i, category in enumerate(_INTERVENTION_CATEGORIES)}
+_SYSTEMIC_BITS = _CATEGORY_BITS["drug"] | _CATEGORY_BITS["biological"]
+
+
+# ── Trial-side features ────────────────────────────────────────────────────────
+
+def _column(trials_df: pd.DataFrame, name: str, default="") -> list:
+    if name not in trials_df.columns:
+        return [default] * len(trials_df)
+    return trials_df[name].tolist()
+
+
+def _norm_enum(trials_df: pd.DataFrame, name: str) -> list:
+    """_norm of an enum column, computed once per category."""
+    if name not in trials_df.columns:
+        return [""] * len(trials_df)
+    codes, values = enum_codes(trials_df[name])
+    return values[codes].tolist()
+
+
+def _text(value) -> str:
+    return value if isinstance(value, str) else ""
+
+
+def _category_mask(text: str) -> int:
+    mask = 0
+    for category, bit in _CATEGORY_BITS.items():
+        if category in text:
+            mask |= bit
+    return mask
+
+
+def _normalized_mask(mask: np.ndarray | int):
+    """Fold "biologic" into "biological", as _intervention_class_score does."""
+    biologic = _CATEGORY_BITS["biologic"]
+    return (mask & ~biologic) | np.where(mask & biologic, _CATEGORY_BITS["biological"], 0)
+
+
+def _arms(value) -> int:
+    value = value or 0
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _months_between(start: pd.Series, end: pd.Series) -> np.ndarray:
+    months = ((end - start).dt.days / 30.44).to_numpy(dtype=float, na_value=np.nan)
+    return np.where(months > 0, months, np.nan)
+
+
+def _duration_months(starts: list, ends: list) -> np.ndarray:
+    return _months_between(parse_registry_dates(starts), parse_registry_dates(ends))
+
+
+def build_trial_features(trials_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive every trial-side input of the five-domain model, one row per trial.
+
+    The frame shares ``trials_df``'s index.  Token columns hold sorted lists of
+    distinct tokens; numeric columns use NaN for "not available".
+    """
+    conditions = _column(trials_df, "Conditions")
+    titles = _column(trials_df, "Title")
+    iv_types = [_norm(v) for v in _column(trials_df, "Intervention Types")]
+    iv_names = [_norm(v) for v in _column(trials_df, "Interventions")]
+    lot_text = [_norm(_text(c) + " " + _text(t)) for c, t in zip(conditions, titles)]
+
+    features = pd.DataFrame(index=trials_df.index)
+    for key, column in (*_DESIGN_FIELDS.items(), ("phase", "Phase")):
+        features[key] = _norm_enum(trials_df, column)
+
+    condition_norm = [_norm(v) for v in conditions]
+    features["conditions_present"] = [bool(c) for c in condition_norm]
+    features["condition_tokens"] = [sorted(set(c.split())) for c in condition_norm]
+    features["endpoint_tokens"] = [
+        sorted(_text_tokens(v, _ENDPOINT_STOP)) for v in _column(trials_df, "Primary Outcome", None)
+    ]
+
+    ages_min = [_parse_age(str(v)) for v in _column(trials_df, "Minimum Age")]
+    ages_max = [_parse_age(str(v)) for v in _column(trials_df, "Maximum Age")]
+    features["age_min"] = np.array([np.nan if a is None else a for a in ages_min], dtype=float)
+    features["age_max"] = np.array([np.nan if a is None else a for a in ages_max], dtype=float)
+
+    features["lot_first"] = [any(k in t for k in _FIRST_LINE_TERMS) for t in lot_text]
+    features["lot_second"] = [any(k in t for k in _SECOND_PLUS_TERMS) for t in lot_text]
+
+    features["intervention_present"] = [bool(t or n) for t, n in zip(iv_types, iv_names)]
+    features["intervention_mask"] = np.array([_category_mask(t) for t in iv_types], dtype=np.int64)
+    features["intervention_tokens"] = [
+        sorted(set((t + " " + n).split())) for t, n in zip(iv_types, iv_names)
+    ]
+    features["arms"] = np.array([_arms(v) for v in _column(trials_df, "Arms Count", 0)], dtype=np.int64)
+    features["duration_months"] = _months_between(
+        trial_dates(trials_df, "Start Date"), trial_dates(trials_df, "Completion Date")
+    )
+    return features
+
+
+class TokenIndex:
+    """
+    Inverted index over one token column of a cohort.
+
+    ``postings`` maps each token to the sorted positions of the trials that
+    contain it; ``sizes`` holds each trial's distinct-token count.  Overlap
+    counts for a query only touch the postings of the query's tokens, and
+    Jaccard follows from the overlap and the two set sizes.
+    """
+
+    __slots__ = ("postings", "sizes")
+
+    def __init__(self, postings: dict[str, np.ndarray], sizes: np.ndarray):
+        self.postings = postings
+        self.sizes = sizes
+
+    @classmethod
+    def from_token_lists(cls, token_lists: pd.Series) -> TokenIndex:
+        sizes = token_lists.map(len).to_numpy(dtype=np.int64)
+        if not sizes.sum():
+            return cls({}, sizes)
+        owners = np.repeat(np.arange(len(sizes)), sizes)
+        codes, tokens = pd.factorize(pd.Series(list(chain.from_iterable(token_lists)), dtype=object))
+        order = np.argsort(codes, kind="stable")
+        bounds = np.cumsum(np.bincount(codes, minlength=len(tokens)))[:-1]
+        postings = dict(zip(tokens, np.split(owners[order], bounds)))
+        return cls(postings, sizes)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def overlap_counts(self, tokens: set, positions: np.ndarray | None = None) -> np.ndarray:
+        """
+        Per-trial count of query tokens present in the trial's token set.
+
+        With ``positions`` only those trials are counted, in the given order;
+        each posting is probed by binary search, so the cost follows the
+        number of positions rather than the cohort size.
+        """
+        if positions is None:
+            counts = np.zeros(len(self.sizes), dtype=np.int64)
+            for token in tokens:
+                posting = self.postings.get(token)
+                if posting is not None:
+                    counts[posting] += 1
+            return counts
+
+        counts = np.zeros(len(positions), dtype=np.int64)
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is not None:
+                slots = np.minimum(np.searchsorted(posting, positions), len(posting) - 1)
+                counts += posting[slots] == positions
+        return counts
+
+
+class CohortFeatures:
+    """Trial features of one cohort plus lazily built token indexes."""
+
+    __slots__ = ("features", "_indexes", "_codes")
+
+    def __init__(self, features: pd.DataFrame):
+        self.features = features
+        self._indexes: dict[str, TokenIndex] = {}
+        self._codes: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    def token_index(self, column: str) -> TokenIndex:
+        index = self._indexes.get(column)
+        if index is None:
+            index = self._indexes[column] = TokenIndex.from_token_lists(self.features[column])
+        return index
+
+    def codes(self, column: str) -> tuple[np.ndarray, np.ndarray]:
+        """(codes, distinct values) of a categorical feature column."""
+        codes = self._codes.get(column)
+        if codes is None:
+            codes = self._codes[column] = pd.factorize(self.features[column], use_na_sentinel=False)
+        return codes
+
+    def aligned(self, index: pd.Index) -> CohortFeatures:
+        """Same features (and already-built indexes) relabelled to ``index``."""
+        view = CohortFeatures(self.features.set_axis(index))
+        view._indexes = self._indexes
+        view._codes = self._codes
+        return view
+
+
+class TrialFeatureStore:
+    """In-memory LRU of cohort features keyed by cohort fingerprint."""
+
+    def __init__(self, max_entries: int = _FEATURE_STORE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CohortFeatures] = OrderedDict()
+
+    def get(self, fingerprint: str) -> CohortFeatures | None:
+        cohort = self._entries.get(fingerprint)
+        if cohort is not None:
+            self._entries.move_to_end(fingerprint)
+        return cohort
+
+    def put(self, fingerprint: str, cohort: CohortFeatures) -> None:
+        self._entries[fingerprint] = cohort
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_FEATURE_STORE = TrialFeatureStore()
+
+
+def get_cohort_features(trials_df: pd.DataFrame) -> CohortFeatures:
+    """Features and token indexes for a cohort, from the store when seen before."""
+    fingerprint = cohort_fingerprint(trials_df, FEATURE_SOURCE_COLUMNS)
+    cohort = _FEATURE_STORE.get(fingerprint)
+    if cohort is None:
+        cohort = CohortFeatures(build_trial_features(trials_df))
+        _FEATURE_STORE.put(fingerprint, cohort)
+    return cohort.aligned(trials_df.index)
+
+
+def get_trial_features(trials_df: pd.DataFrame) -> pd.DataFrame:
+    """Trial features for a cohort, from the store when this cohort was seen before."""
+    return get_cohort_features(trials_df).features
+
+
+def register_trial_features(trials_df: pd.DataFrame, features: pd.DataFrame) -> None:
+    """Seed the store with features loaded from disk for ``trials_df``."""
+    _FEATURE_STORE.put(
+        cohort_fingerprint(trials_df, FEATURE_SOURCE_COLUMNS),
+        CohortFeatures(features.set_axis(trials_df.index)),
+    )
+
+
+# ── Vector helpers ─────────────────────────────────────────────────────────────
+
+def _map_unique(cohort: CohortFeatures, column: str, scorer) -> np.ndarray:
+    """Apply a scalar scorer once per distinct value and broadcast the result."""
+    codes, uniques = cohort.codes(column)
+    return np.array([scorer(u) for u in uniques], dtype=float)[codes]
+
+
+def _round4(values: np.ndarray) -> np.ndarray:
+    """
+    Round to 4 decimals with the same result as Python's round(value, 4).
+
+    NumPy's scaled rounding only disagrees with Python's correctly rounded
+    result when the scaled value sits on a .5 boundary; those few values are
+    re-rounded in Python.
+    """
+    values = np.asarray(values, dtype=float)
+    scaled = values * 10_000
+    rounded = np.round(scaled) / 10_000
+    near_tie = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), 4)
+    return rounded
+
+
+def _jaccard_band(intersection: np.ndarray, size_a: int, sizes_b: np.ndarray) -> np.ndarray:
+    union = size_a + sizes_b - intersection
+    with np.errstate(divide="ignore", invalid="ignore"):
+        j = intersection / union
+    banded = np.where(j >= 0.30, 1.0, np.where(j >= 0.10, 0.5, 0.0))
+    return np.where((size_a == 0) | (sizes_b == 0), 0.5, banded)
+
+
+# ── Sub-dimension scorers (vectorized) ─────────────────────────────────────────
+# "Cheap" parts read categorical or numeric features only; "text" parts need
+# token overlaps.  Text parts take optional trial positions so cohort selection
+# can score just the trials whose upper bound can still make the cut.
+
+def _take(values: np.ndarray, positions: np.ndarray | None) -> np.ndarray:
+    return values if positions is None else values[positions]
+
+
+def _age_scores(protocol_meta, cohort: CohortFeatures) -> np.ndarray:
+    features = cohort.features
+    protocol_pop = _norm(getattr(protocol_meta, "target_population", None) or "")
+    ages = [int(x) for x in re.findall(r"\b([1-9]\d)\b", protocol_pop) if 1 <= int(x) <= 120]
+    if not ages:
+        return np.full(len(features), 0.5)
+
+    t_min = features["age_min"].to_numpy(dtype=float)
+    t_max = features["age_max"].to_numpy(dtype=float)
+    proto_min = min(ages)
+    proto_max = max(ages) if len(ages) > 1 else 100
+    overlap_lo = np.maximum(proto_min, np.where(np.isnan(t_min), 0, t_min))
+    overlap_hi = np.minimum(proto_max, np.where(np.isnan(t_max), 120, t_max))
+    overlap_pct = (overlap_hi - overlap_lo) / max(proto_max - proto_min, 1)
+    banded = np.where(overlap_pct >= 0.80, 1.0, np.where(overlap_pct >= 0.50, 0.5, 0.0))
+    known = ~(np.isnan(t_min) & np.isnan(t_max))
+    return np.where(known, np.where(overlap_lo > overlap_hi, 0.0, banded), 0.5)
+
+
+def _line_of_therapy_scores(protocol_meta, cohort: CohortFeatures) -> np.ndarray:
+    features = cohort.features
+    protocol_pop = _norm(getattr(protocol_meta, "target_population", None) or "")
+    proto_first = any(k in protocol_pop for k in _FIRST_LINE_TERMS)
+    proto_second = any(k in protocol_pop for k in _SECOND_PLUS_TERMS)
+    if not protocol_pop or not (proto_first or proto_second):
+        return np.full(len(features), 0.5)
+
+    trial_first = features["lot_first"].to_numpy(dtype=bool)
+    trial_second = features["lot_second"].to_numpy(dtype=bool)
+    same = (proto_first & trial_first) | (proto_second & trial_second)
+    return np.where(trial_first | trial_second, np.where(same, 1.0, 0.0), 0.5)
+
+
+def _disease_scores(protocol_meta, cohort: CohortFeatures, positions=None) -> np.ndarray:
+    present = _take(cohort.features["conditions_present"].to_numpy(dtype=bool), positions)
+    p_condition = _norm(getattr(protocol_meta, "condition", None) or "")
+    p_pop = _norm(getattr(protocol_meta, "target_population", None) or "")[:300]
+    source = (p_condition + " " + p_pop).strip()
+    p_tokens = {t for t in source.split() if len(t) > 3 and t not in _POP_STOP}
+    if not p_tokens:
+        return np.full(len(present), 0.5)
+
+    hits = cohort.token_index("condition_tokens").overlap_counts(p_tokens, positions)
+    disease = np.minimum(hits / len(p_tokens) * 2.0, 1.0)
+    return np.where(present, disease, 0.5)
+
+
+def _design_scores(protocol_meta, cohort: CohortFeatures) -> np.ndarray:
+    scores = {
+        key: _map_unique(
+            cohort, key, lambda t, p=getattr(protocol_meta, key, None): _field_score(p, t)
+        )
+        for key in _DESIGN_FIELDS
+    }
+    return (
+        3 * scores["study_type"] + 3 * scores["allocation"]
+        + 2 * scores["masking"] + 2 * scores["intervention_model"]
+    ) / 10.0
+
+
+def _phase_scores(protocol_meta, cohort: CohortFeatures) -> np.ndarray:
+    p_phase = getattr(protocol_meta, "phase", None)
+    return _map_unique(cohort, "phase", lambda t: _phase_score(p_phase, t))
+
+
+def _endpoint_text_scores(protocol_meta, cohort: CohortFeatures, positions=None) -> np.ndarray:
+    p_tokens = _text_tokens(getattr(protocol_meta, "primary_endpoints", None), _ENDPOINT_STOP)
+    index = cohort.token_index("endpoint_tokens")
+    return _jaccard_band(
+        index.overlap_counts(p_tokens, positions),
+        len(p_tokens),
+        _take(index.sizes, positions),
+    )
+
+
+def _intervention_class_scores(protocol_meta, cohort: CohortFeatures, positions=None) -> np.ndarray:
+    features = cohort.features
+    present = _take(features["intervention_present"].to_numpy(dtype=bool), positions)
+    p_desc = _norm(getattr(protocol_meta, "intervention_description", None))
+    if not p_desc:
+        return np.full(len(present), 0.5)
+
+    t_mask = _normalized_mask(_take(features["intervention_mask"].to_numpy(dtype=np.int64), positions))
+    p_mask = int(_normalized_mask(_category_mask(p_desc)))
+    category_score = np.where(
+        (t_mask & p_mask) != 0,
+        1.0,
+        np.where(bool(p_mask & _SYSTEMIC_BITS) & ((t_mask & _SYSTEMIC_BITS) != 0), 0.5, 0.0),
+    )
+
+    # Fallback: token overlap between description and trial intervention text
+    p_tokens = set(p_desc.split())
+    index = cohort.token_index("intervention_tokens")
+    t_sizes = _take(index.sizes, positions)
+    intersection = index.overlap_counts(p_tokens, positions)
+    overlap = intersection / np.maximum(len(p_tokens) + t_sizes - intersection, 1)
+    token_score = np.where(overlap >= 0.20, 1.0, np.where(overlap > 0.05, 0.5, 0.0))
+    token_score = np.where(t_sizes == 0, 0.5, token_score)
+
+    iv_class = np.where((t_mask != 0) & (p_mask != 0), category_score, token_score)
+    return np.where(present, iv_class, 0.5)
+
+
+def _comparator_scores(protocol_meta, cohort: CohortFeatures) -> np.ndarray:
+    arms = cohort.features["arms"].to_numpy(dtype=np.int64)
+    flags = _protocol_comparator_flags(protocol_meta)
+    if flags is None:
+        return np.full(len(arms), 0.5)
+
+    is_single_arm, has_placebo, has_active = flags
+    comp = np.full(len(arms), 0.5)
+    if is_single_arm:
+        comp = np.where(arms <= 1, 1.0, 0.0)
+    elif has_placebo or has_active:
+        comp = np.where(arms >= 2, 1.0, 0.0)
+    return np.where(arms == 0, 0.5, comp)
+
+
+def _duration_scores(protocol_meta, cohort: CohortFeatures) -> np.ndarray:
+    proto = _duration_months(
+        [getattr(protocol_meta, "start_date", None)],
+        [getattr(protocol_meta, "completion_date", None)],
+    )[0]
+    trial = cohort.features["duration_months"].to_numpy(dtype=float)
+    if np.isnan(proto):
+        return np.full(len(trial), 0.5)
+    with np.errstate(invalid="ignore"):
+        diff_pct = np.abs(proto - trial) / np.maximum(proto, trial)
+    banded = np.where(diff_pct <= 0.20, 1.0, np.where(diff_pct <= 0.50, 0.5, 0.0))
+    return np.where(np.isnan(trial), 0.5, banded)
+
+
+def _cheap_parts(protocol_meta, cohort: CohortFeatures) -> dict[str, np.ndarray]:
+    return {
+        "age":        _age_scores(protocol_meta, cohort),
+        "lot":        _line_of_therapy_scores(protocol_meta, cohort),
+        "design":     _design_scores(protocol_meta, cohort),
+        "phase":      _phase_scores(protocol_meta, cohort),
+        "comparator": _comparator_scores(protocol_meta, cohort),
+        "duration":   _duration_scores(protocol_meta, cohort),
+    }
+
+
+def _text_parts(protocol_meta, cohort: CohortFeatures, positions=None) -> dict[str, np.ndarray]:
+    return {
+        "disease":            _disease_scores(protocol_meta, cohort, positions),
+        "endpoint":           _endpoint_text_scores(protocol_meta, cohort, positions),
+        "intervention_class": _intervention_class_scores(protocol_meta, cohort, positions),
+    }
+
+
+def _combine(cheap: dict[str, np.ndarray], text: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Assemble the five domains exactly as the per-trial domain scorers do."""
+    return {
+        "population":   (3 * text["disease"] + 2 * cheap["age"] + 1 * cheap["lot"]) / 6.0,
+        "design":       cheap["design"],
+        "endpoints":    (4 * text["endpoint"] + 2 * cheap["phase"]) / 6.0,
+        "intervention": (2 * text["intervention_class"] + 2 * cheap["comparator"]) / 4.0,
+        "duration":     cheap["duration"],
+    }
+
+
+def _raw_total(domains: dict[str, np.ndarray]) -> np.ndarray:
+    """Weighted 0–1 score, summed in score_trial_design_similarity's order."""
+    weighted = 0
+    for domain, weight in _DOMAIN_WEIGHTS.items():
+        weighted = weighted + weight * domains[domain]
+    return np.atleast_1d(weighted / _MAX_DOMAIN_WEIGHT)
+
+
+def _rounded_total(domains: dict[str, np.ndarray]) -> np.ndarray:
+    return _round4(_raw_total(domains))
+
+
+def _domain_frame(domains: dict[str, np.ndarray], totals: np.ndarray, index) -> pd.DataFrame:
+    frame = pd.DataFrame({DOMAIN_COLUMNS[d]: domains[d] for d in DOMAIN_COLUMNS}, index=index)
+    frame["design_similarity_score"] = totals
+    return frame
+
+
+# ── Public API ─────────────────────────────────────────────────────────────────
+
+def weighted_similarity(domain_scores: pd.DataFrame) -> list[float]:
+    """Overall 0–1 score per trial, rounded exactly like score_trial_design_similarity."""
+    domains = {d: domain_scores[c].to_numpy(dtype=float) for d, c in DOMAIN_COLUMNS.items()}
+    return _rounded_total(domains).tolist() if len(domain_scores) else []
+
+
+def score_domain_frame(
+    protocol_meta,
+    trials_df: pd.DataFrame,
+    features: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Score every trial against a protocol in one pass.
+
+    Returns a frame indexed like ``trials_df`` with the five sim_* columns and
+    ``design_similarity_score``.  Trial features come from the feature store
+    unless precomputed ``features`` are passed.
+    """
+    cohort = get_cohort_features(trials_df) if features is None else CohortFeatures(features)
+    index = cohort.features.index
+    if not len(index):
+        return _domain_frame({d: [] for d in DOMAIN_COLUMNS}, [], index)
+    domains = _combine(_cheap_parts(protocol_meta, cohort), _text_parts(protocol_meta, cohort))
+    return _domain_frame(domains, _rounded_total(domains), index)
+
+
+def select_similar_trials(
+    protocol_meta,
+    trials_df: pd.DataFrame,
+    min_similarity: float,
+    min_cohort_size: int,
+    top_k: int | None = None,
+) -> tuple[np.ndarray, pd.DataFrame]:
+    """
+    Rank and select trials with early exit on score upper bounds.
+
+    The cheap sub-dimensions (design fields, phase, comparator structure, age,
+    line of therapy, duration) are scored for every trial; assuming a perfect
+    score on the token-matching parts then gives each trial an upper bound on
+    its overall score.  Token matching is only run for trials whose bound can
+    still reach the cut:
+
+      top_k None  trials whose bound reaches ``min_similarity``
+      top_k = k   trials in descending-bound order, in chunks, until no
+                  remaining bound can displace the current top max(k,
+                  min_cohort_size)
+
+    The selection equals full scoring followed by the rule used in
+    build_design_similar_cohort (keep scores ≥ min_similarity unless fewer
+    than ``min_cohort_size`` pass, then keep everything), truncated to
+    ``top_k``.  Ties rank in cohort order.  Returns the selected trial
+    positions, best first, and their domain-score frame.
+    """
+    cohort = get_cohort_features(trials_df)
+    n = len(trials_df)
+    if not n:
+        return np.empty(0, dtype=np.int64), score_domain_frame(protocol_meta, trials_df)
+
+    cheap = _cheap_parts(protocol_meta, cohort)
+    # Unrounded bound; rounding can lift a score by at most _ROUND_SLACK.
+    upper = _raw_total(_combine(cheap, {k: 1.0 for k in ("disease", "endpoint", "intervention_class")}))
+
+    def _exact(positions: np.ndarray) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        domains = _combine(
+            {k: v[positions] for k, v in cheap.items()},
+            _text_parts(protocol_meta, cohort, positions),
+        )
+        return domains, _rounded_total(domains)
+
+    def _ranked(positions: np.ndarray, totals: np.ndarray) -> np.ndarray:
+        return np.lexsort((positions, -totals))
+
+    if top_k is None:
+        candidates = np.flatnonzero(upper + _ROUND_SLACK >= min_similarity)
+        if len(candidates) >= min_cohort_size:
+            domains, totals = _exact(candidates)
+            keep = totals >= min_similarity
+            if keep.sum() >= min_cohort_size:
+                domains = {d: v[keep] for d, v in domains.items()}
+                positions, totals = candidates[keep], totals[keep]
+                order = _ranked(positions, totals)
+                selected = positions[order]
+                return selected, _domain_frame(
+                    {d: v[order] for d, v in domains.items()}, totals[order], trials_df.index[selected]
+                )
+        positions = np.arange(n)
+        domains, totals = _exact(positions)
+        order = _ranked(positions, totals)
+        return order, _domain_frame(
+            {d: v[order] for d, v in domains.items()}, totals[order], trials_df.index[order]
+        )
+
+    needed = max(top_k, min_cohort_size)
+    by_bound = np.argsort(-upper, kind="stable")
+    seen: list[np.ndarray] = []
+    seen_domains: list[dict[str, np.ndarray]] = []
+    seen_totals: list[np.ndarray] = []
+    cutoff = -np.inf
+    for start in range(0, n, _EARLY_EXIT_CHUNK):
+        chunk = by_bound[start:start + _EARLY_EXIT_CHUNK]
+        if upper[chunk[0]] + _ROUND_SLACK < cutoff:
+            break   # no remaining trial can enter the top ``needed``
+        domains, totals = _exact(chunk)
+        seen.append(chunk)
+        seen_domains.append(domains)
+        seen_totals.append(totals)
+        evaluated = np.concatenate(seen_totals)
+        if len(evaluated) >= needed:
+            cutoff = np.partition(evaluated, len(evaluated) - needed)[len(evaluated) - needed]
+
+    positions = np.concatenate(seen)
+    totals = np.concatenate(seen_totals)
+    domains = {d: np.concatenate([part[d] for part in seen_domains]) for d in DOMAIN_COLUMNS}
+    order = _ranked(positions, totals)[:needed]
+    passing_cohort = len(order) >= min_cohort_size and bool(
+        (totals[order[:min_cohort_size]] >= min_similarity).all()
+    )
+    order = order[:top_k]
+    if passing_cohort:
+        order = order[totals[order] >= min_similarity]
+    selected = positions[order]
+    return selected, _domain_frame(
+        {d: v[order] for d, v in domains.items()}, totals[order], trials_df.index[selected]
+    )
@@ -38,13 +38,8 @@ from pptx.util import Inches, Pt, Emu
 from trial_design_explorer.domain import ProtocolMetadata
 from trial_design_explorer.services.audit_service import current_utc_timestamp
 from trial_design_explorer.services.chart_service import (
-    generate_alignment_heatmap,
-    generate_duration_comparison_chart,
-    generate_endpoint_distribution_chart,
-    generate_enrollment_benchmark_chart,
-    generate_posture_gauge,
-    generate_radar_chart,
-    generate_sponsor_donut,
+    chart_buffer,
+    render_chart_set,
 )
 from trial_design_explorer.services.comparison_service import (
     build_action_register,
@@ -286,7 +281,7 @@ def _slide_posture_gauge(prs, metrics) -> None:
     _heading_bar(slide, "Precedent Posture",
                  "How the draft design compares to completed vs disrupted trial precedent")
 
-    gauge_buf = generate_posture_gauge(metrics, width_in=5.5, height_in=3.5)
+    gauge_buf = chart_buffer(metrics, "posture_gauge", 5.5, 3.5)
     _add_image_from_buf(slide, gauge_buf, Inches(0.3), Inches(1.0),
                         Inches(5.5), Inches(3.5))
 
@@ -314,7 +309,7 @@ def _slide_radar(prs, metrics) -> None:
     _heading_bar(slide, "Design Domain Alignment",
                  "Alignment across design domains — completed vs disrupted precedent")
 
-    buf = generate_radar_chart(metrics, width_in=7, height_in=5.5)
+    buf = chart_buffer(metrics, "radar", 7.0, 5.5)
     _add_image_from_buf(slide, buf, Inches(0.2), Inches(0.95), Inches(7.0), Inches(5.5))
 
     rows = metrics.get("alignment_by_domain", [])
@@ -337,7 +332,7 @@ def _slide_enrollment(prs, metrics) -> None:
     _heading_bar(slide, "Enrollment Benchmark",
                  "Protocol target vs completed and disrupted precedent IQR ranges")
 
-    buf = generate_enrollment_benchmark_chart(metrics, width_in=7.5, height_in=4.5)
+    buf = chart_buffer(metrics, "enrollment_benchmark", 7.5, 4.5)
     _add_image_from_buf(slide, buf, Inches(0.2), Inches(0.95), Inches(7.5), Inches(4.5))
 
     right_x = Inches(8.1)
@@ -370,7 +365,7 @@ def _slide_duration(prs, metrics) -> None:
     _heading_bar(slide, "Trial Duration Analysis",
                  "Planned duration vs completed and disrupted precedent cohort ranges")
 
-    buf = generate_duration_comparison_chart(metrics, width_in=8.5, height_in=4.2)
+    buf = chart_buffer(metrics, "duration_comparison", 8.5, 4.2)
     _add_image_from_buf(slide, buf, Inches(0.2), Inches(1.0), Inches(8.5), Inches(4.2))
 
     right_x = Inches(9.0)
@@ -397,7 +392,7 @@ def _slide_design_matrix(prs, metrics) -> None:
     _heading_bar(slide, "Design Differential Matrix",
                  "Domain-level protocol choice vs completed and disrupted precedent match rates")
 
-    heatmap_buf = generate_alignment_heatmap(metrics, width_in=12, height_in=4.5)
+    heatmap_buf = chart_buffer(metrics, "alignment_heatmap", 12.0, 4.5)
     _add_image_from_buf(slide, heatmap_buf, Inches(0.3), Inches(1.0), Inches(12.5), Inches(5.5))
 
 
@@ -426,10 +421,10 @@ def _slide_endpoint_evidence(prs, metrics) -> None:
     _heading_bar(slide, "Endpoint Evidence",
                  "Endpoint category prevalence in completed vs disrupted precedent cohorts")
 
-    buf = generate_endpoint_distribution_chart(metrics, width_in=7.5, height_in=5.0)
+    buf = chart_buffer(metrics, "endpoint_distribution", 7.5, 5.0)
     _add_image_from_buf(slide, buf, Inches(0.2), Inches(1.0), Inches(7.5), Inches(5.0))
 
-    donut_buf = generate_sponsor_donut(metrics, width_in=4.5, height_in=4.0)
+    donut_buf = chart_buffer(metrics, "sponsor_donut", 4.5, 4.0)
     _add_image_from_buf(slide, donut_buf, Inches(8.2), Inches(1.0), Inches(4.8), Inches(4.0))
 
 
@@ -541,6 +536,9 @@ def generate_slides_pptx(
         else protocol_metadata_from_session(protocol_meta)
     )
     metrics = comparison_metrics or {}
+    if metrics:
+        # Renders the PDF and deck charts together; the other export reuses them.
+        render_chart_set(metrics)
 
     prs = Presentation()
     prs.slide_width = SLIDE_W
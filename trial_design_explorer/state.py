@@ -2,6 +2,8 @@ SESSION_DEFAULTS = {
     "workspace": "Protocol Intelligence",
     "registry_tab": "Overview",
     "df_trials": None,
+    # panel_fingerprint of df_trials; keys the registry panel cache.
+    "df_trials_fingerprint": None,
     "protocol_meta": None,
     "protocol_text": "",
     "matching_trials": None,
@@ -12,9 +14,13 @@ SESSION_DEFAULTS = {
     # Access via: ComparisonResult-aware code reads this and re-inflates if needed.
     "comparison_result": None,
     "protocol_stage": "Intake",
+    # Widen the registry pull to synonym / narrower condition queries.
+    "include_related_conditions": False,
     "audit_log": [],
     "chat_history": [],
     "pubmed_articles": [],
+    # Project store run the workspace checkpoints into (None until first analysis).
+    "project_run_id": None,
 }
 
 
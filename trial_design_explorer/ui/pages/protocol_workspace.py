@@ -13,19 +13,24 @@ from trial_design_explorer.services import (
     compare_protocol_to_trials,
     extract_protocol_metadata_from_text,
     extract_text_from_uploaded_file,
-    fetch_trials_by_condition,
     generate_protocol_report_pdf,
     generate_slides_pptx,
     grounded_assistant_response,
-    parse_trials_to_df,
+    load_trials_df,
     protocol_metadata_from_session,
-    search_pubmed_evidence,
+    search_pubmed_evidence_many,
+    stream_grounded_assistant_response,
 )
 from trial_design_explorer.services.clinical_trials_service import (
+    RegistryFetchError,
     build_design_similar_cohort,
     cohort_selection_summary,
+    expand_condition_queries,
+    load_federated_trials_df,
 )
 from trial_design_explorer.services.audit_service import current_utc_timestamp
+from trial_design_explorer.services.project_store_service import get_project_store
+from trial_design_explorer.domain import ProjectRun
 from trial_design_explorer.ui.panels.protocol_benchmarks import render_protocol_benchmark_panel
 
 
@@ -62,6 +67,70 @@ def _reset_protocol_downstream_state():
     st.session_state["comparison_recommendations"] = []
     st.session_state["chat_history"] = []
     st.session_state["pubmed_articles"] = []
+    st.session_state["project_run_id"] = None
+
+
+# Session keys checkpointed with each saved run (besides the profile and cohort).
+_PROJECT_STATE_KEYS = [
+    "latest_comparison",
+    "comparison_metrics",
+    "comparison_recommendations",
+    "comparison_result",
+    "cohort_selection_info",
+    "pubmed_articles",
+    "audit_log",
+    "chat_history",
+]
+
+
+def _save_project_run(status: str, include_cohort: bool = False) -> str | None:
+    """Checkpoint the current protocol workspace into the project store."""
+    protocol_payload = st.session_state.get("protocol_meta")
+    if not protocol_payload:
+        return None
+    matching_trials = st.session_state.get("matching_trials")
+    run = ProjectRun(
+        workspace="Protocol Intelligence",
+        status=status,
+        timestamp=current_utc_timestamp(),
+        run_id=st.session_state.get("project_run_id"),
+        title=protocol_payload.get("title"),
+        condition=protocol_payload.get("condition"),
+        cohort_size=len(matching_trials) if matching_trials is not None else 0,
+    )
+    state = {key: st.session_state.get(key) for key in _PROJECT_STATE_KEYS}
+    run_id = get_project_store().save_run(
+        run, protocol_payload, state, matching_trials if include_cohort else None
+    )
+    if run_id:
+        st.session_state["project_run_id"] = run_id
+    return run_id
+
+
+def _load_project_run(run_id: str) -> bool:
+    """Restore a saved run into the session without re-fetching or re-scoring."""
+    stored = get_project_store().load_run(run_id)
+    if stored is None:
+        return False
+    st.session_state["protocol_meta"] = stored["protocol"]
+    for key in _PROJECT_STATE_KEYS:
+        if key in stored["state"]:
+            st.session_state[key] = stored["state"][key]
+    st.session_state["matching_trials"] = stored["cohort"]
+    st.session_state["project_run_id"] = run_id
+    _set_protocol_stage("Analysis" if stored["cohort"] is not None else "Review")
+    return True
+
+
+def _run_label(run: ProjectRun) -> str:
+    name = run.title or run.condition or run.run_id
+    return f"{name[:40]}  ·  {run.status}  ·  {run.timestamp[:16].replace('T', ' ')}"
+
+
+def _store_export(file_name: str, payload: bytes, status: str) -> None:
+    run_id = st.session_state.get("project_run_id") or _save_project_run(status, include_cohort=True)
+    if run_id and get_project_store().put_artifact(run_id, file_name, payload):
+        _save_project_run(status)
 
 
 def _set_protocol_stage(stage: str) -> None:
@@ -99,10 +168,22 @@ def _safe_display_value(value):
     return str(value)
 
 
-def _build_comparable_cohort(protocol_meta):
+def _build_comparable_cohort(protocol_meta) -> bool:
+    """Fetch, score and store the comparison cohort; False (with an error shown) if the pull broke off."""
     compare_label = protocol_meta.condition or DEFAULT_CONDITION
-    response = fetch_trials_by_condition(compare_label)
-    all_trials_df = parse_trials_to_df(response) if response else pd.DataFrame()
+    try:
+        if st.session_state.get("include_related_conditions"):
+            registry_queries = expand_condition_queries(compare_label)
+            all_trials_df = load_federated_trials_df(registry_queries)
+        else:
+            registry_queries = [compare_label]
+            all_trials_df = load_trials_df(compare_label)
+    except RegistryFetchError:
+        st.error(
+            "The ClinicalTrials.gov download was interrupted part-way, so the trial pool would be "
+            "incomplete. The previous analysis was kept — please try again."
+        )
+        return False
 
     # ── Step 1: Design similarity filtering ───────────────────────────────────
     # Select trials that are design-comparable to the protocol.
@@ -127,7 +208,8 @@ def _build_comparable_cohort(protocol_meta):
         build_audit_event(
             "build_design_similar_cohort",
             (
-                f"Fetched {selection_info.get('condition_matched_total', 0)} condition-matched trials for '{compare_label}'.  "
+                f"Fetched {selection_info.get('condition_matched_total', 0)} condition-matched trials for '{compare_label}'"
+                f"{' (queries: ' + ', '.join(registry_queries) + ')' if len(registry_queries) > 1 else ''}.  "
                 f"Design similarity filter selected {selection_info.get('design_similar_selected', 0)} trials "
                 f"({selection_info.get('selection_rate_pct', 0)}% of pool).  "
                 f"Dimensions used: {', '.join(selection_info.get('design_dimensions_used', []))}.  "
@@ -136,6 +218,7 @@ def _build_comparable_cohort(protocol_meta):
             artifact_type="comparison_cohort",
             metadata={
                 "condition": compare_label,
+                "registry_queries": registry_queries,
                 "condition_matched_total": selection_info.get("condition_matched_total", 0),
                 "design_similar_selected": selection_info.get("design_similar_selected", 0),
                 "similarity_score_median": selection_info.get("similarity_score_median"),
@@ -147,17 +230,35 @@ def _build_comparable_cohort(protocol_meta):
             },
         )
     )
+    _save_project_run("analysed", include_cohort=True)
+    return True
+
+
+def _pubmed_design_context(protocol_meta):
+    masking = (protocol_meta.masking or "").lower()
+    if masking in ("double", "triple", "quadruple"):
+        return "double-blind"
+    if (protocol_meta.allocation or "").lower() == "randomized":
+        return "randomized"
+    return None
 
 
 def _fetch_pubmed_evidence(protocol_meta):
-    """Fetch PubMed articles for the protocol's condition and endpoint focus."""
+    """Fetch PubMed articles for the protocol's condition, endpoint focus and design."""
     condition = protocol_meta.condition or DEFAULT_CONDITION
     endpoint_focus = protocol_meta.endpoint_focus or None
-    articles = search_pubmed_evidence(
-        condition=condition,
-        endpoint_focus=endpoint_focus,
-        max_results=8,
-    )
+    design_context = _pubmed_design_context(protocol_meta)
+    searches = [{"condition": condition, "endpoint_focus": endpoint_focus}]
+    if design_context:
+        searches.append({"condition": condition, "design_context": design_context})
+
+    # Endpoint and design searches run in parallel; endpoint hits keep precedence.
+    articles, seen = [], set()
+    for result in search_pubmed_evidence_many(searches, max_results=8):
+        for article in result:
+            if article.pmid not in seen:
+                seen.add(article.pmid)
+                articles.append(article)
     st.session_state["pubmed_articles"] = [a.to_dict() for a in articles]
     st.session_state["audit_log"].append(
         build_audit_event(
@@ -165,9 +266,14 @@ def _fetch_pubmed_evidence(protocol_meta):
             f"Retrieved {len(articles)} PubMed articles for '{condition}'.",
             artifact_type="literature_evidence",
             artifact_id=condition,
-            metadata={"article_count": len(articles), "endpoint_focus": endpoint_focus or "any"},
+            metadata={
+                "article_count": len(articles),
+                "endpoint_focus": endpoint_focus or "any",
+                "design_context": design_context or "any",
+            },
         )
     )
+    _save_project_run("analysed")
     return articles
 
 
@@ -370,6 +476,25 @@ def render_protocol_sidebar():
     if protocol_meta and protocol_meta.condition:
         st.caption(f"Condition: {protocol_meta.condition}")
 
+    saved_runs = get_project_store().list_runs(workspace="Protocol Intelligence")
+    if saved_runs:
+        st.markdown("---")
+        st.markdown("### Saved Runs")
+        labels = {run.run_id: _run_label(run) for run in saved_runs}
+        current = st.session_state.get("project_run_id")
+        run_ids = list(labels)
+        selected = st.selectbox(
+            "Saved run",
+            run_ids,
+            index=run_ids.index(current) if current in labels else 0,
+            format_func=labels.get,
+            label_visibility="collapsed",
+        )
+        if st.button("Load run", width="stretch", disabled=selected == current):
+            if _load_project_run(selected):
+                st.rerun()
+            st.warning("The saved run could not be loaded.")
+
 
 def render_protocol_workspace():
     protocol_payload = st.session_state.get("protocol_meta")
@@ -588,8 +713,9 @@ def _render_review_stage():
             protocol_meta.secondary_endpoints  = secondary_endpoints or None
             protocol_meta.confirmation_status  = "reviewed"
             st.session_state["protocol_meta"] = protocol_meta.to_dict()
-            if st.session_state.get("matching_trials") is not None:
-                _build_comparable_cohort(protocol_meta)
+            cohort_current = (
+                st.session_state.get("matching_trials") is None or _build_comparable_cohort(protocol_meta)
+            )
             st.session_state["audit_log"].append(
                 build_audit_event(
                     "review_protocol_profile",
@@ -598,8 +724,9 @@ def _render_review_stage():
                     artifact_type="protocol_profile",
                 )
             )
-            _set_protocol_stage("Analysis")
-            st.rerun()
+            if cohort_current:
+                _set_protocol_stage("Analysis")
+                st.rerun()
 
     # ── Provenance ─────────────────────────────────────────────────────────────
     with st.expander("Extraction provenance and traceability"):
@@ -1053,13 +1180,28 @@ def _render_assistant_panel(protocol_meta, comparison_metrics: dict, comparison_
             key="protocol_chat_query",
         )
         if st.button("Submit question", type="primary", width="stretch") and user_query:
-            assistant_text = grounded_assistant_response(
+            st.markdown(f"**Assistant** _{current_utc_timestamp()}_")
+            assistant_args = (
                 user_query,
                 protocol_meta,
                 st.session_state.get("latest_comparison", ""),
                 comparison_metrics,
                 comparison_recommendations,
             )
+            stream_state = {}
+
+            def _assistant_tokens():
+                stream_state["complete"] = yield from stream_grounded_assistant_response(*assistant_args)
+
+            # Render tokens as they arrive; write_stream returns the full text.
+            # A stream that broke off mid-answer is replaced by a complete,
+            # non-streamed answer before it reaches the chat history or audit.
+            answer_slot = st.empty()
+            assistant_text = answer_slot.write_stream(_assistant_tokens())
+            if not stream_state.get("complete", True):
+                with st.spinner("The response was interrupted; requesting it again..."):
+                    assistant_text = grounded_assistant_response(*assistant_args)
+                answer_slot.write(assistant_text)
             st.session_state["chat_history"].append(
                 {"role": "user", "text": user_query, "timestamp": current_utc_timestamp()}
             )
@@ -1111,8 +1253,17 @@ def _render_analysis_stage():
             with st.spinner(
                 f"Fetching registry data for '{cond}' and running PICO design similarity scoring..."
             ):
-                _build_comparable_cohort(protocol_meta)
-            st.rerun()
+                built = _build_comparable_cohort(protocol_meta)
+            if built:
+                st.rerun()
+        st.checkbox(
+            "Include related conditions",
+            key="include_related_conditions",
+            help=(
+                "Also query synonyms and narrower conditions (e.g. Stroke → Ischemic Stroke) "
+                "concurrently and merge them into one de-duplicated trial pool"
+            ),
+        )
     with a2:
         pubmed_label = f"Fetch PubMed literature  ·  {protocol_meta.condition or DEFAULT_CONDITION}"
         if st.button(pubmed_label, width="stretch"):
@@ -1215,6 +1366,21 @@ def _render_report_stage():
         if not pubmed_articles:
             st.info("Tip: fetch PubMed evidence in the Analysis stage to include literature citations in the report.")
 
+        run_id = st.session_state.get("project_run_id")
+        saved_exports = get_project_store().list_artifacts(run_id) if run_id else []
+        if saved_exports:
+            st.caption("Previously exported for this run:")
+            for name in saved_exports:
+                payload = get_project_store().get_artifact(run_id, name)
+                if payload:
+                    st.download_button(
+                        f"Download saved {name}",
+                        data=payload,
+                        file_name=name,
+                        key=f"saved_artifact_{name}",
+                        width="stretch",
+                    )
+
         # ── PDF export ────────────────────────────────────────────────────────
         if st.button("Generate PDF report", type="primary", width="stretch"):
             with st.spinner("Generating detailed PDF report with charts and evidence..."):
@@ -1240,13 +1406,15 @@ def _render_report_stage():
                     pubmed_articles=pubmed_articles,
                 )
             with open(output_file, "rb") as f:
-                st.download_button(
-                    "Download PDF report",
-                    data=f.read(),
-                    file_name=output_file,
-                    mime="application/pdf",
-                    width="stretch",
-                )
+                report_bytes = f.read()
+            _store_export(output_file, report_bytes, "exported")
+            st.download_button(
+                "Download PDF report",
+                data=report_bytes,
+                file_name=output_file,
+                mime="application/pdf",
+                width="stretch",
+            )
 
         # ── PowerPoint export ─────────────────────────────────────────────────
         st.markdown("---")
@@ -1272,13 +1440,15 @@ def _render_report_stage():
                     pubmed_articles=pubmed_articles,
                 )
             with open(slides_file, "rb") as f:
-                st.download_button(
-                    "Download PowerPoint slides",
-                    data=f.read(),
-                    file_name=slides_file,
-                    mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                    width="stretch",
-                )
+                slides_bytes = f.read()
+            _store_export(slides_file, slides_bytes, "exported")
+            st.download_button(
+                "Download PowerPoint slides",
+                data=slides_bytes,
+                file_name=slides_file,
+                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                width="stretch",
+            )
 
     with audit_col:
         st.markdown("##### Cohort and Audit Preview")
@@ -2,12 +2,17 @@ import streamlit as st
 
 from trial_design_explorer.config import COMMON_CONDITIONS, DEFAULT_CONDITION, REGISTRY_TABS
 from trial_design_explorer.services.clinical_trials_service import (
+    RegistryFetchError,
+    concat_trial_frames,
     count_countries,
-    fetch_trials_by_condition,
+    iter_trial_frames,
+    iter_trial_pages,
+    load_trials_snapshot,
     median_trial_duration_months,
     most_common_primary_outcome,
-    parse_trials_to_df,
+    save_trials_snapshot,
 )
+from trial_design_explorer.ui.panel_cache import panel_fingerprint, panel_memo
 from trial_design_explorer.ui.panels.duration import show_duration_panel
 from trial_design_explorer.ui.panels.location import show_location_panel
 from trial_design_explorer.ui.panels.outcome import classify_outcome, show_outcome_panel
@@ -28,15 +33,37 @@ def render_registry_sidebar():
             index=COMMON_CONDITIONS.index(DEFAULT_CONDITION) if DEFAULT_CONDITION in COMMON_CONDITIONS else 0,
         )
         custom_condition = st.text_input("Custom condition", placeholder="Optional free-text condition")
+        force_refresh = st.checkbox(
+            "Check registry for updates",
+            help="Re-pull studies updated since the locally cached search, even if the cache is still fresh.",
+        )
         submitted = st.form_submit_button("Search trial registry", width="stretch")
 
     if submitted:
         condition = custom_condition.strip() or selected_condition
         with st.spinner("Retrieving ClinicalTrials.gov studies..."):
-            response = fetch_trials_by_condition(condition)
-            if response:
-                trials_df = parse_trials_to_df(response)
+            trials_df = None if force_refresh else load_trials_snapshot(condition)
+            interrupted = False
+            if trials_df is None:
+                progress = st.empty()
+                frames = []
+                try:
+                    for frame in iter_trial_frames(
+                        iter_trial_pages(condition, refresh="changed" if force_refresh else "auto")
+                    ):
+                        frames.append(frame)
+                        progress.caption(f"Retrieved {sum(len(f) for f in frames):,} studies so far...")
+                except RegistryFetchError:
+                    interrupted = True
+                progress.empty()
+                if frames and not interrupted:
+                    trials_df = concat_trial_frames(frames)
+                    save_trials_snapshot(condition, trials_df)
+            if interrupted:
+                st.error("The registry download was interrupted part-way; no partial cohort was loaded. Please retry.")
+            elif trials_df is not None and not trials_df.empty:
                 st.session_state["df_trials"] = trials_df
+                st.session_state["df_trials_fingerprint"] = panel_fingerprint(trials_df)
                 st.session_state["registry_tab"] = "Overview"
                 st.success(f"Retrieved {len(trials_df)} studies for {condition}.")
             else:
@@ -47,10 +74,14 @@ def render_registry_sidebar():
         st.metric("Loaded Studies", len(st.session_state["df_trials"]))
 
 
-def render_summary_cards(df):
-    countries = count_countries(df)
-    median_duration = median_trial_duration_months(df)
-    top_outcome = most_common_primary_outcome(df)
+def _summary_card_values(df):
+    return count_countries(df), median_trial_duration_months(df), most_common_primary_outcome(df)
+
+
+def render_summary_cards(df, fingerprint=None):
+    countries, median_duration, top_outcome = panel_memo(
+        fingerprint, "summary_cards", lambda: _summary_card_values(df)
+    )
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Countries Represented", f"{countries}")
@@ -73,7 +104,12 @@ def render_registry_workspace():
         st.warning("The last registry search returned no records.")
         return
 
-    render_summary_cards(df)
+    # Panels memoize their frames and figures per cohort, so reruns only re-render.
+    fingerprint = st.session_state.get("df_trials_fingerprint")
+    if fingerprint is None:
+        fingerprint = st.session_state["df_trials_fingerprint"] = panel_fingerprint(df)
+
+    render_summary_cards(df, fingerprint)
     selected_tab = st.segmented_control(
         "Registry analysis modules",
         REGISTRY_TABS,
@@ -85,16 +121,16 @@ def render_registry_workspace():
     st.caption("Switch modules to move between cohort overview, timing, geography, outcomes, sponsor activity, and operational history.")
 
     if st.session_state["registry_tab"] == "Overview":
-        show_overview_panel(df)
+        show_overview_panel(df, fingerprint)
     elif st.session_state["registry_tab"] == "Durations":
-        show_duration_panel(df)
+        show_duration_panel(df, fingerprint)
     elif st.session_state["registry_tab"] == "Locations":
-        show_location_panel(df)
+        show_location_panel(df, fingerprint)
     elif st.session_state["registry_tab"] == "Outcomes":
-        show_outcome_panel(df)
+        show_outcome_panel(df, fingerprint)
     elif st.session_state["registry_tab"] == "Summary":
-        show_summary_panel(df)
+        show_summary_panel(df, fingerprint)
     elif st.session_state["registry_tab"] == "Timeline":
-        show_timeline_panel(df)
+        show_timeline_panel(df, fingerprint)
     elif st.session_state["registry_tab"] == "Sponsors":
-        show_sponsor_panel(df)
+        show_sponsor_panel(df, fingerprint)
@@ -0,0 +1,77 @@
+"""
+Panel cache — registry explorer derived data, memoized per cohort.
+
+Every widget interaction reruns the Streamlit script, so the registry panels
+would otherwise rebuild their frames and figures from the full cohort on each
+tab switch.  Results are kept in a process-wide LRU keyed by the cohort
+fingerprint (computed once when the cohort is loaded) plus a panel key, so a
+rerun against the same cohort only re-renders.  The fingerprint covers a fixed
+list of scalar registry columns, so the same cohort keeps its fingerprint
+whether it was parsed from the API or read back from a parquet snapshot with
+a different column order.  Cached frames and figures are
+shared between reruns and sessions and must not be mutated by callers.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import TypeVar
+
+from trial_design_explorer.config import REGISTRY_PANEL_CACHE_SIZE
+from trial_design_explorer.services.clinical_trials_service import cohort_fingerprint
+
+T = TypeVar("T")
+
+# Trial identity plus the scalar columns the panels read; nested Locations is
+# represented by its site and country counts.
+PANEL_FINGERPRINT_COLUMNS = [
+    "NCT ID",
+    *sorted([
+        "Completion Date", "Conditions", "Country Count", "Enrollment", "Location Count",
+        "Phase", "Primary Outcome", "Sponsor", "Start Date", "Status", "Study Type", "Title",
+    ]),
+]
+
+
+class PanelCache:
+    """In-memory LRU of panel results keyed by (cohort fingerprint, panel key)."""
+
+    def __init__(self, max_entries: int = REGISTRY_PANEL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = compute()
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_PANEL_CACHE = PanelCache()
+
+
+def panel_fingerprint(trials_df) -> str:
+    """Panel cache key of a cohort: cohort_fingerprint over PANEL_FINGERPRINT_COLUMNS."""
+    return cohort_fingerprint(trials_df, PANEL_FINGERPRINT_COLUMNS)
+
+
+def panel_memo(fingerprint: str | None, key: Hashable, compute: Callable[[], T]) -> T:
+    """``compute()`` memoized for the cohort; computed uncached without a fingerprint."""
+    if fingerprint is None:
+        return compute()
+    return _PANEL_CACHE.get_or_compute((fingerprint, key), compute)
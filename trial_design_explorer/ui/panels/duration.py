@@ -1,56 +1,70 @@
-import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from trial_design_explorer.services.clinical_trials_service import trial_duration_months
+from trial_design_explorer.ui.panel_cache import panel_memo
+
 
 def compute_trial_durations(df):
     durations = df.copy()
-    start_dates = pd.to_datetime(durations["Start Date"], errors="coerce")
-    end_dates = pd.to_datetime(durations["Completion Date"], errors="coerce")
-    durations["Duration (months)"] = ((end_dates - start_dates).dt.days / 30).round(1)
+    durations["Duration (months)"] = trial_duration_months(df).round(1)
     return durations.dropna(subset=["Duration (months)"])
 
 
-def show_duration_panel(df):
+def _duration_views(df):
+    """(histogram, phase box plot or None, benchmark table), or None without duration data."""
     duration_df = compute_trial_durations(df)
     if duration_df.empty:
+        return None
+
+    histogram = px.histogram(
+        duration_df,
+        x="Duration (months)",
+        color="Status",
+        nbins=24,
+        title="Trial Duration Distribution",
+        color_discrete_sequence=px.colors.qualitative.Set2,
+        opacity=0.8,
+    )
+    histogram.update_layout(template="plotly_white", height=420, margin=dict(t=60, b=20, l=20, r=20))
+
+    phase_box = None
+    phase_df = duration_df[duration_df["Phase"].fillna("N/A") != "N/A"].copy()
+    if not phase_df.empty:
+        phase_box = px.box(
+            phase_df,
+            x="Phase",
+            y="Duration (months)",
+            color="Phase",
+            title="Duration Spread by Phase",
+            color_discrete_sequence=px.colors.qualitative.Bold,
+        )
+        phase_box.update_layout(template="plotly_white", height=420, margin=dict(t=60, b=20, l=20, r=20), showlegend=False)
+
+    summary = (
+        duration_df[["NCT ID", "Title", "Study Type", "Phase", "Status", "Duration (months)"]]
+        .sort_values("Duration (months)", ascending=False)
+        .reset_index(drop=True)
+    )
+    return histogram, phase_box, summary
+
+
+def show_duration_panel(df, fingerprint=None):
+    views = panel_memo(fingerprint, "durations", lambda: _duration_views(df))
+    if views is None:
         st.info("No trial duration data is available.")
         return
+    histogram, phase_box, summary = views
 
     col1, col2 = st.columns(2)
     with col1:
-        fig = px.histogram(
-            duration_df,
-            x="Duration (months)",
-            color="Status",
-            nbins=24,
-            title="Trial Duration Distribution",
-            color_discrete_sequence=px.colors.qualitative.Set2,
-            opacity=0.8,
-        )
-        fig.update_layout(template="plotly_white", height=420, margin=dict(t=60, b=20, l=20, r=20))
-        st.plotly_chart(fig, width="stretch")
+        st.plotly_chart(histogram, width="stretch")
 
     with col2:
-        phase_df = duration_df[duration_df["Phase"].fillna("N/A") != "N/A"].copy()
-        if phase_df.empty:
+        if phase_box is None:
             st.info("No phase-tagged duration data is available.")
         else:
-            fig = px.box(
-                phase_df,
-                x="Phase",
-                y="Duration (months)",
-                color="Phase",
-                title="Duration Spread by Phase",
-                color_discrete_sequence=px.colors.qualitative.Bold,
-            )
-            fig.update_layout(template="plotly_white", height=420, margin=dict(t=60, b=20, l=20, r=20), showlegend=False)
-            st.plotly_chart(fig, width="stretch")
+            st.plotly_chart(phase_box, width="stretch")
 
-    summary = (
-        duration_df[["NCT ID", "Title", "Study Type", "Phase", "Status", "Duration (months)"]]
-        .sort_values("Duration (months)", ascending=False)
-        .reset_index(drop=True)
-    )
     st.markdown("#### Duration Benchmark Table")
     st.dataframe(summary, width="stretch", height=450)
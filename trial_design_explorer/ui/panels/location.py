@@ -2,6 +2,9 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from trial_design_explorer.services.cohort_snapshot_service import locations_table, site_aggregates
+from trial_design_explorer.ui.panel_cache import panel_memo
+
 CONTINENT_REGIONS = {
     "Global": {},
     "Africa": {"scope": "africa"},
@@ -13,40 +16,32 @@ CONTINENT_REGIONS = {
 
 
 def extract_locations(df):
-    locations = []
-    for _, row in df.iterrows():
-        for location in row.get("Locations", []):
-            lat = location.get("lat")
-            lon = location.get("lon")
-            if lat is None or lon is None:
-                continue
-            locations.append(
-                {
-                    "NCT ID": row["NCT ID"],
-                    "Title": row["Title"],
-                    "Status": row.get("Status", "Unknown"),
-                    "City": location.get("city", ""),
-                    "Country": location.get("country", ""),
-                    "Latitude": lat,
-                    "Longitude": lon,
-                }
-            )
-    return pd.DataFrame(locations)
-
+    """One row per geocoded site, with its trial's title and status."""
+    sites = locations_table(df)
+    sites = sites[sites["lat"].notna() & sites["lon"].notna()]
+    if sites.empty:
+        return pd.DataFrame()
+    trials = df.drop_duplicates("NCT ID").set_index("NCT ID")
+    status = trials["Status"] if "Status" in trials.columns else pd.Series("Unknown", index=trials.index)
+    return pd.DataFrame({
+        "NCT ID": sites["NCT ID"].to_numpy(),
+        "Title": sites["NCT ID"].map(trials["Title"]).to_numpy(),
+        "Status": sites["NCT ID"].map(status).to_numpy(),
+        "City": sites["city"].to_numpy(),
+        "Country": sites["country"].to_numpy(),
+        "Latitude": sites["lat"].to_numpy(),
+        "Longitude": sites["lon"].to_numpy(),
+    })
 
-def show_location_panel(df):
-    if "Locations" not in df.columns:
-        st.info("No site location data is available.")
-        return
 
-    location_df = extract_locations(df)
-    if location_df.empty:
-        st.info("No geocoded trial sites are available in this cohort.")
-        return
+def _site_table(location_df):
+    sites = location_df.rename(columns={"City": "city", "Country": "country", "Latitude": "lat"})
+    aggregates = site_aggregates(sites).rename(columns={"Location Count": "Location_Count"})
+    trials = location_df.drop_duplicates("NCT ID").set_index("NCT ID")[["Title", "Status"]]
+    return trials.join(aggregates).sort_index().reset_index()
 
-    region = st.selectbox("Region Focus", options=list(CONTINENT_REGIONS.keys()), index=0)
-    region_config = CONTINENT_REGIONS[region]
 
+def _site_map(location_df, region):
     fig = px.scatter_geo(
         location_df,
         lat="Latitude",
@@ -65,23 +60,32 @@ def show_location_panel(df):
             showcountries=True,
             showcoastlines=True,
             projection_type="natural earth",
-            **region_config,
+            **CONTINENT_REGIONS[region],
         ),
         template="plotly_white",
         height=650,
         margin=dict(t=60, b=10, l=10, r=10),
         legend_title_text="Status",
     )
-    st.plotly_chart(fig, width="stretch")
+    return fig
+
 
-    grouped = (
-        location_df.groupby(["NCT ID", "Title", "Status"])
-        .agg(
-            Countries=("Country", lambda values: ", ".join(sorted(set(filter(None, values))))),
-            Cities=("City", lambda values: ", ".join(sorted(set(filter(None, values))))),
-            Location_Count=("Latitude", "count"),
-        )
-        .reset_index()
+def show_location_panel(df, fingerprint=None):
+    if "Locations" not in df.columns:
+        st.info("No site location data is available.")
+        return
+
+    location_df = panel_memo(fingerprint, "locations", lambda: extract_locations(df))
+    if location_df.empty:
+        st.info("No geocoded trial sites are available in this cohort.")
+        return
+
+    region = st.selectbox("Region Focus", options=list(CONTINENT_REGIONS.keys()), index=0)
+    st.plotly_chart(
+        panel_memo(fingerprint, ("location_map", region), lambda: _site_map(location_df, region)),
+        width="stretch",
     )
+
+    grouped = panel_memo(fingerprint, "location_table", lambda: _site_table(location_df))
     st.markdown("#### Site Distribution Table")
     st.dataframe(grouped, width="stretch", height=500)
@@ -4,6 +4,8 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from trial_design_explorer.ui.panel_cache import panel_memo
+
 
 def clean_outcome(text):
     return text.lower().strip()
@@ -80,18 +82,13 @@ def classify_outcome(outcome):
     return "Other"
 
 
-def show_outcome_panel(df):
-    if df.empty or "Primary Outcome" not in df.columns:
-        st.info("No primary outcome data is available.")
-        return
-
+def _outcome_figure(df):
     cleaned = []
     for entry in df["Primary Outcome"].dropna().astype(str):
         cleaned.extend(clean_outcome(item) for item in entry.split(",") if item.strip())
 
     if not cleaned:
-        st.info("No outcome descriptions are available.")
-        return
+        return None
 
     outcome_df = pd.DataFrame(Counter(cleaned).most_common(40), columns=["Outcome", "Count"])
     outcome_df["Type"] = outcome_df["Outcome"].apply(classify_outcome)
@@ -114,4 +111,16 @@ def show_outcome_panel(df):
         yaxis_title="Outcome",
         legend_title="Classification",
     )
+    return fig
+
+
+def show_outcome_panel(df, fingerprint=None):
+    if df.empty or "Primary Outcome" not in df.columns:
+        st.info("No primary outcome data is available.")
+        return
+
+    fig = panel_memo(fingerprint, "outcomes", lambda: _outcome_figure(df))
+    if fig is None:
+        st.info("No outcome descriptions are available.")
+        return
     st.plotly_chart(fig, width="stretch")
@@ -1,46 +1,40 @@
 import plotly.express as px
 import streamlit as st
 
+from trial_design_explorer.services.clinical_trials_service import enum_value_counts
+from trial_design_explorer.ui.panel_cache import panel_memo
 
-def show_overview_panel(df):
-    if df.empty:
-        st.warning("No data is available for overview analysis.")
-        return
 
-    study_type_counts = df["Study Type"].fillna("Unknown").value_counts().reset_index()
+def _overview_figures(df):
+    study_type_counts = enum_value_counts(df["Study Type"], "Unknown").reset_index()
     study_type_counts.columns = ["Study Type", "Count"]
-    phase_counts = df["Phase"].fillna("Unknown").value_counts().reset_index()
+    phase_counts = enum_value_counts(df["Phase"], "Unknown").reset_index()
     phase_counts.columns = ["Phase", "Count"]
-    status_counts = df["Status"].fillna("Unknown").value_counts().reset_index()
+    status_counts = enum_value_counts(df["Status"], "Unknown").reset_index()
     status_counts.columns = ["Status", "Count"]
 
-    col1, col2 = st.columns(2)
-    with col1:
-        fig = px.bar(
-            study_type_counts,
-            x="Count",
-            y="Study Type",
-            orientation="h",
-            title="Study Type Distribution",
-            color="Study Type",
-            color_discrete_sequence=px.colors.qualitative.Safe,
-        )
-        fig.update_layout(template="plotly_white", height=420, margin=dict(t=60, b=20, l=20, r=20), showlegend=False)
-        st.plotly_chart(fig, width="stretch")
+    study_type_fig = px.bar(
+        study_type_counts,
+        x="Count",
+        y="Study Type",
+        orientation="h",
+        title="Study Type Distribution",
+        color="Study Type",
+        color_discrete_sequence=px.colors.qualitative.Safe,
+    )
+    study_type_fig.update_layout(template="plotly_white", height=420, margin=dict(t=60, b=20, l=20, r=20), showlegend=False)
 
-    with col2:
-        fig = px.bar(
-            phase_counts,
-            x="Phase",
-            y="Count",
-            title="Phase Mix",
-            color="Phase",
-            color_discrete_sequence=px.colors.qualitative.Pastel,
-        )
-        fig.update_layout(template="plotly_white", height=420, margin=dict(t=60, b=20, l=20, r=20), showlegend=False)
-        st.plotly_chart(fig, width="stretch")
-
-    fig = px.bar(
+    phase_fig = px.bar(
+        phase_counts,
+        x="Phase",
+        y="Count",
+        title="Phase Mix",
+        color="Phase",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+    )
+    phase_fig.update_layout(template="plotly_white", height=420, margin=dict(t=60, b=20, l=20, r=20), showlegend=False)
+
+    status_fig = px.bar(
         status_counts,
         x="Count",
         y="Status",
@@ -49,5 +43,20 @@ def show_overview_panel(df):
         color="Status",
         color_discrete_sequence=px.colors.qualitative.Set2,
     )
-    fig.update_layout(template="plotly_white", height=450, margin=dict(t=60, b=20, l=20, r=20), showlegend=False)
-    st.plotly_chart(fig, width="stretch")
+    status_fig.update_layout(template="plotly_white", height=450, margin=dict(t=60, b=20, l=20, r=20), showlegend=False)
+    return study_type_fig, phase_fig, status_fig
+
+
+def show_overview_panel(df, fingerprint=None):
+    if df.empty:
+        st.warning("No data is available for overview analysis.")
+        return
+
+    study_type_fig, phase_fig, status_fig = panel_memo(fingerprint, "overview", lambda: _overview_figures(df))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(study_type_fig, width="stretch")
+    with col2:
+        st.plotly_chart(phase_fig, width="stretch")
+    st.plotly_chart(status_fig, width="stretch")
@@ -2,6 +2,9 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from trial_design_explorer.services.clinical_trials_service import trial_dates
+from trial_design_explorer.ui.panel_cache import panel_memo
+
 
 def classify_sponsor_type(name):
     if not isinstance(name, str):
@@ -12,24 +15,20 @@ def classify_sponsor_type(name):
     return "Academic" if any(keyword in name for keyword in academic_keywords) else "Industry"
 
 
-def show_sponsor_panel(df):
-    if "Sponsor" not in df.columns or "Status" not in df.columns:
-        st.info("Sponsor data is not available.")
-        return
-
+def _sponsor_views(df):
+    """(top sponsor bars, annual activity or None, sponsor summary), or None without sponsors."""
     sponsor_df = df[["Sponsor", "Status", "Start Date"]].copy()
     sponsor_df = sponsor_df.dropna(subset=["Sponsor"])
     sponsor_df = sponsor_df[sponsor_df["Sponsor"].astype(str).str.strip() != ""]
     if sponsor_df.empty:
-        st.info("Sponsor data is not available.")
-        return
+        return None
 
     sponsor_df["Sponsor Type"] = sponsor_df["Sponsor"].apply(classify_sponsor_type)
-    grouped = sponsor_df.groupby(["Sponsor", "Status"]).size().reset_index(name="Trial Count")
+    grouped = sponsor_df.groupby(["Sponsor", "Status"], observed=True).size().reset_index(name="Trial Count")
     top_sponsors = grouped.groupby("Sponsor")["Trial Count"].sum().sort_values(ascending=False).head(15).index
     filtered = grouped[grouped["Sponsor"].isin(top_sponsors)]
 
-    fig = px.bar(
+    status_fig = px.bar(
         filtered,
         x="Trial Count",
         y="Sponsor",
@@ -39,10 +38,9 @@ def show_sponsor_panel(df):
         color_discrete_sequence=px.colors.qualitative.Set2,
         height=620,
     )
-    fig.update_layout(template="plotly_white", yaxis={"categoryorder": "total ascending"}, margin=dict(t=60, b=20, l=20, r=20))
-    st.plotly_chart(fig, width="stretch")
+    status_fig.update_layout(template="plotly_white", yaxis={"categoryorder": "total ascending"}, margin=dict(t=60, b=20, l=20, r=20))
 
-    sponsor_df["Start Date"] = pd.to_datetime(sponsor_df["Start Date"], errors="coerce")
+    sponsor_df["Start Date"] = trial_dates(df, "Start Date")
     trend_df = (
         sponsor_df.dropna(subset=["Start Date"])
         .groupby([pd.Grouper(key="Start Date", freq="YE"), "Sponsor Type"])
@@ -50,8 +48,9 @@ def show_sponsor_panel(df):
         .reset_index(name="Trials Started")
     )
 
+    trend_fig = None
     if not trend_df.empty:
-        fig = px.line(
+        trend_fig = px.line(
             trend_df,
             x="Start Date",
             y="Trials Started",
@@ -61,8 +60,7 @@ def show_sponsor_panel(df):
             color_discrete_map={"Industry": "#355C7D", "Academic": "#C06C84", "Unknown": "#6C757D"},
             height=460,
         )
-        fig.update_layout(template="plotly_white", margin=dict(t=60, b=20, l=20, r=20))
-        st.plotly_chart(fig, width="stretch")
+        trend_fig.update_layout(template="plotly_white", margin=dict(t=60, b=20, l=20, r=20))
 
     summary = (
         sponsor_df.groupby(["Sponsor", "Sponsor Type"])
@@ -70,5 +68,23 @@ def show_sponsor_panel(df):
         .sort_values("Trials", ascending=False)
         .reset_index()
     )
+    return status_fig, trend_fig, summary
+
+
+def show_sponsor_panel(df, fingerprint=None):
+    if "Sponsor" not in df.columns or "Status" not in df.columns:
+        st.info("Sponsor data is not available.")
+        return
+
+    views = panel_memo(fingerprint, "sponsors", lambda: _sponsor_views(df))
+    if views is None:
+        st.info("Sponsor data is not available.")
+        return
+    status_fig, trend_fig, summary = views
+
+    st.plotly_chart(status_fig, width="stretch")
+    if trend_fig is not None:
+        st.plotly_chart(trend_fig, width="stretch")
+
     st.markdown("#### Sponsor Summary")
     st.dataframe(summary, width="stretch", height=420)
@@ -1,34 +1,21 @@
 import pandas as pd
 import streamlit as st
 
+from trial_design_explorer.services.clinical_trials_service import enum_value_counts
+from trial_design_explorer.ui.panel_cache import panel_memo
 
-def show_summary_panel(df):
-    if df.empty:
-        st.info("No trial summary is available.")
-        return
 
-    col1, col2 = st.columns(2)
-    with col1:
-        status_summary = (
-            df["Status"]
-            .fillna("Unknown")
-            .value_counts()
-            .rename_axis("Status")
-            .reset_index(name="Trial Count")
-        )
-        st.markdown("#### Status Summary")
-        st.dataframe(status_summary, width="stretch", height=260)
-
-    with col2:
-        phase_summary = (
-            df["Phase"]
-            .fillna("N/A")
-            .value_counts()
-            .rename_axis("Phase")
-            .reset_index(name="Trial Count")
-        )
-        st.markdown("#### Phase Summary")
-        st.dataframe(phase_summary, width="stretch", height=260)
+def _summary_tables(df):
+    status_summary = (
+        enum_value_counts(df["Status"], "Unknown")
+        .rename_axis("Status")
+        .reset_index(name="Trial Count")
+    )
+    phase_summary = (
+        enum_value_counts(df["Phase"], "N/A")
+        .rename_axis("Phase")
+        .reset_index(name="Trial Count")
+    )
 
     table_columns = [
         "NCT ID",
@@ -43,6 +30,24 @@ def show_summary_panel(df):
     ]
     preview = df[[column for column in table_columns if column in df.columns]].copy()
     preview["Enrollment"] = pd.to_numeric(preview.get("Enrollment"), errors="coerce")
+    return status_summary, phase_summary, preview
+
+
+def show_summary_panel(df, fingerprint=None):
+    if df.empty:
+        st.info("No trial summary is available.")
+        return
+
+    status_summary, phase_summary, preview = panel_memo(fingerprint, "summary", lambda: _summary_tables(df))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### Status Summary")
+        st.dataframe(status_summary, width="stretch", height=260)
+
+    with col2:
+        st.markdown("#### Phase Summary")
+        st.dataframe(phase_summary, width="stretch", height=260)
 
     st.markdown("#### Trial Detail Table")
     st.dataframe(preview, width="stretch", height=580)
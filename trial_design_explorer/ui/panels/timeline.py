@@ -4,18 +4,18 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from trial_design_explorer.services.clinical_trials_service import trial_dates
+from trial_design_explorer.ui.panel_cache import panel_memo
 
-def show_timeline_panel(df):
-    if "Start Date" not in df.columns:
-        st.info("Start date data is not available.")
-        return
 
+def _timeline_figures(df, current_year):
+    """(annual starts, phase activity or None, recent country trend or None)."""
     timeline_df = df.copy()
-    timeline_df["Start Year"] = pd.to_datetime(timeline_df["Start Date"], errors="coerce").dt.year
+    timeline_df["Start Year"] = trial_dates(df, "Start Date").dt.year
     annual_counts = timeline_df["Start Year"].value_counts().sort_index().reset_index()
     annual_counts.columns = ["Year", "Trials Started"]
 
-    fig = px.bar(
+    annual_fig = px.bar(
         annual_counts,
         x="Year",
         y="Trials Started",
@@ -23,14 +23,14 @@ def show_timeline_panel(df):
         color_continuous_scale="Blues",
         title="Trials Started by Year",
     )
-    fig.update_layout(template="plotly_white", margin=dict(t=60, b=20, l=20, r=20), height=420)
-    st.plotly_chart(fig, width="stretch")
+    annual_fig.update_layout(template="plotly_white", margin=dict(t=60, b=20, l=20, r=20), height=420)
 
+    phase_fig = None
     phase_df = timeline_df.dropna(subset=["Start Year"]).copy()
     phase_df["Phase"] = phase_df["Phase"].fillna("N/A")
-    phase_timeline = phase_df.groupby(["Start Year", "Phase"]).size().reset_index(name="Count")
+    phase_timeline = phase_df.groupby(["Start Year", "Phase"], observed=True).size().reset_index(name="Count")
     if not phase_timeline.empty:
-        fig = px.bar(
+        phase_fig = px.bar(
             phase_timeline,
             x="Start Year",
             y="Count",
@@ -39,32 +39,29 @@ def show_timeline_panel(df):
             color_discrete_sequence=px.colors.qualitative.Set2,
             height=500,
         )
-        fig.update_layout(template="plotly_white", barmode="stack", margin=dict(t=60, b=20, l=20, r=20))
-        st.plotly_chart(fig, width="stretch")
+        phase_fig.update_layout(template="plotly_white", barmode="stack", margin=dict(t=60, b=20, l=20, r=20))
 
     if "Locations" not in df.columns:
-        return
+        return annual_fig, phase_fig, None
 
     location_rows = []
-    current_year = datetime.now().year
-    for _, row in df.iterrows():
-        year = pd.to_datetime(row.get("Start Date"), errors="coerce")
-        if pd.isna(year):
+    for year, locations in zip(timeline_df["Start Year"], df["Locations"]):
+        if pd.isna(year) or year < current_year - 5:
             continue
-        for location in row.get("Locations", []):
+        for location in locations:
             country = location.get("country")
-            if country and year.year >= current_year - 5:
-                location_rows.append({"Start Year": year.year, "Country": country})
+            if country:
+                location_rows.append({"Start Year": int(year), "Country": country})
 
     location_df = pd.DataFrame(location_rows)
     if location_df.empty:
-        return
+        return annual_fig, phase_fig, None
 
     top_countries = location_df["Country"].value_counts().head(10).index
     filtered = location_df[location_df["Country"].isin(top_countries)]
     trend = filtered.groupby(["Start Year", "Country"]).size().reset_index(name="Trial Count")
 
-    fig = px.line(
+    trend_fig = px.line(
         trend,
         x="Start Year",
         y="Trial Count",
@@ -74,5 +71,17 @@ def show_timeline_panel(df):
         color_discrete_sequence=px.colors.qualitative.Set2,
         height=520,
     )
-    fig.update_layout(template="plotly_white", margin=dict(t=60, b=20, l=20, r=20))
-    st.plotly_chart(fig, width="stretch")
+    trend_fig.update_layout(template="plotly_white", margin=dict(t=60, b=20, l=20, r=20))
+    return annual_fig, phase_fig, trend_fig
+
+
+def show_timeline_panel(df, fingerprint=None):
+    if "Start Date" not in df.columns:
+        st.info("Start date data is not available.")
+        return
+
+    current_year = datetime.now().year
+    figures = panel_memo(fingerprint, ("timeline", current_year), lambda: _timeline_figures(df, current_year))
+    for fig in figures:
+        if fig is not None:
+            st.plotly_chart(fig, width="stretch")